@@ -0,0 +1,33 @@
+# libs
+from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db.backends.signals import connection_created
+
+
+__all__ = [
+    'AppManagerConfig',
+]
+
+
+class AppManagerConfig(AppConfig):
+    """
+    Configuration for the App Manager application
+    """
+    name = 'app_manager'
+
+    def ready(self):
+        """
+        Connect the database router to the request and connection signals, so that it can pin requests to the primary
+        database after they write, and wrap the tracer so that spans are tagged with the queries run inside them
+        """
+        from app_manager import db_router
+        from app_manager.utils.query_tracing import QueryTracer
+        request_started.connect(db_router.request_started, dispatch_uid='app_manager_router_request_started')
+        request_finished.connect(db_router.request_finished, dispatch_uid='app_manager_router_request_finished')
+        connection_created.connect(db_router.connection_created, dispatch_uid='app_manager_router_connection_created')
+
+        tracer = getattr(settings, 'TRACER', None)
+        if getattr(settings, 'APP_MANAGER_QUERY_TRACING', True) and tracer is not None:
+            if not isinstance(tracer, QueryTracer):
+                settings.TRACER = QueryTracer(tracer)
@@ -5,11 +5,13 @@ from .app import (
 )
 from .member_link import MemberLinkCreateController
 from .menu_item import (
+    MenuItemBulkController,
     MenuItemCreateController,
     MenuItemListController,
     MenuItemUpdateController,
 )
 from .menu_item_user_link import (
+    MenuItemUserLinkBulkController,
     MenuItemUserLinkListController,
     MenuItemUserLinkUpdateController,
 )
@@ -25,11 +27,13 @@ __all__ = [
     'MemberLinkCreateController',
 
     # Menu Item
+    'MenuItemBulkController',
     'MenuItemCreateController',
     'MenuItemListController',
     'MenuItemUpdateController',
 
     # Menu Item User Link
+    'MenuItemUserLinkBulkController',
     'MenuItemUserLinkListController',
     'MenuItemUserLinkUpdateController',
 ]
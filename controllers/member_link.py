@@ -2,9 +2,10 @@
 from typing import cast, Optional
 # libs
 from cloudcix_rest.controllers import ControllerBase
-from cloudcix.api.membership import Membership
+from rest_framework.request import Request
 # local
 from app_manager.models.member_link import MemberLink
+from app_manager.utils.membership import read_member
 
 
 __all__ = [
@@ -26,9 +27,27 @@ class MemberLinkCreateController(ControllerBase):
             'member_id',
         )
 
+    @staticmethod
+    def membership_lookup(request: Request) -> Optional[int]:
+        """
+        Get the id of the Member that validating the request will read from Membership, so that the lookup can be
+        started early
+        :param request: The request being handled
+        :return: The id of the Member, or None if validation will not read a Member
+        """
+        try:
+            member_id = int(cast(int, request.data.get('member_id')))
+        except (AttributeError, TypeError, ValueError):
+            return None
+        if request.user.id != 1 or member_id in (0, request.user.member['id']):
+            return None
+        return member_id
+
     def validate_member_id(self, member_id: Optional[int]) -> Optional[str]:
         """
-        description: The id of a Member that wants to use an App
+        description: |
+            The id of a Member that wants to use an App. Member 0 can be used by the superuser to make the App a
+            default App for every Member.
         type: integer
         """
         try:
@@ -39,11 +58,11 @@ class MemberLinkCreateController(ControllerBase):
         if member_id != self.request.user.member['id']:
             if self.request.user.id != 1:
                 return 'app_manager_member_link_create_102'
-            response = Membership.member.read(
-                token=self.request.user.token,
-                pk=member_id,
-            )
-            if response.status_code != 200:
+            if member_id == 0:
+                # Member 0 is not a real Member, a Member Link for it makes the App a default App for every Member
+                self.cleaned_data['member_id'] = member_id
+                return None
+            if read_member(self.request, member_id) is None:
                 return 'app_manager_member_link_create_103'
 
         self.cleaned_data['member_id'] = member_id
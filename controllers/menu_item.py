@@ -1,5 +1,6 @@
 # stdlib
-from typing import cast, Optional
+from collections import defaultdict
+from typing import Any, cast, Dict, List, Optional, Set
 # libs
 from cloudcix_rest.controllers import ControllerBase
 # local
@@ -7,6 +8,7 @@ from app_manager.models.menu_item import MenuItem
 
 
 __all__ = [
+    'MenuItemBulkController',
     'MenuItemListController',
     'MenuItemCreateController',
     'MenuItemUpdateController',
@@ -89,6 +91,8 @@ class MenuItemCreateController(ControllerBase):
         except MenuItem.DoesNotExist:
             return 'app_manager_menu_item_create_103'
         self.cleaned_data['predecessor'] = predecessor
+        self.cleaned_data['path'] = predecessor.subtree_path
+        self.cleaned_data['depth'] = predecessor.depth + 1
         return None
 
     def validate_sequence(self, sequence: Optional[int]) -> Optional[str]:
@@ -229,12 +233,14 @@ class MenuItemUpdateController(ControllerBase):
 
     def validate_predecessor_id(self, predecessor_id: Optional[int]) -> Optional[str]:
         """
-        description: Another Menu Item that this new Menu Item will exist under
+        description: Another Menu Item that this Menu Item will exist under, which cannot be one of its descendants
         type: integer
         required: false
         """
         if predecessor_id is None:
             self.cleaned_data['predecessor'] = None
+            self.cleaned_data['path'] = '/'
+            self.cleaned_data['depth'] = 1
             return None
         try:
             predecessor = MenuItem.objects.exclude(
@@ -247,7 +253,11 @@ class MenuItemUpdateController(ControllerBase):
             return 'app_manager_menu_item_update_102'
         except MenuItem.DoesNotExist:
             return 'app_manager_menu_item_update_103'
+        if predecessor.path.startswith(self._instance.subtree_path):
+            return 'app_manager_menu_item_update_112'
         self.cleaned_data['predecessor'] = predecessor
+        self.cleaned_data['path'] = predecessor.subtree_path
+        self.cleaned_data['depth'] = predecessor.depth + 1
         return None
 
     def validate_sequence(self, sequence: Optional[int]) -> Optional[str]:
@@ -354,3 +364,178 @@ class MenuItemUpdateController(ControllerBase):
             return 'app_manager_menu_item_update_111'
         self.cleaned_data['self_managed'] = self_managed
         return None
+
+
+class MenuItemBulkController(ControllerBase):
+    """
+    Validates User data used to create many Menu Item records, and renumber existing ones, in one request.
+    Every check runs in memory against one read of the App's Menu Items
+    """
+
+    class Meta(ControllerBase.Meta):
+        """
+        Override some of the ControllerBase.Meta fields to make them more specific for this Controller
+        """
+        model = MenuItem
+        validation_order = (
+            'sequences',
+            'menu_items',
+        )
+
+    # The most Menu Items that can be created in one request
+    MAX_MENU_ITEMS = 1000
+
+    def _siblings(self) -> Dict[Optional[int], Dict[str, Set]]:
+        """
+        Read the App's Menu Items once, and index their names and sequences by predecessor
+        """
+        if not hasattr(self, '_sibling_index'):
+            self._existing = {
+                item['id']: item
+                for item in MenuItem.objects.filter(
+                    app_id=self.kwargs['app_id'],
+                ).values(
+                    'id',
+                    'depth',
+                    'name',
+                    'path',
+                    'predecessor_id',
+                    'sequence',
+                )
+            }
+            self._sibling_index: Dict[Any, Dict[str, Set]] = defaultdict(lambda: {'names': set(), 'sequences': set()})
+            for item in self._existing.values():
+                self._sibling_index[item['predecessor_id']]['names'].add(item['name'])
+                self._sibling_index[item['predecessor_id']]['sequences'].add(item['sequence'])
+        return self._sibling_index
+
+    def validate_sequences(self, sequences: Optional[List[Dict[str, int]]]) -> Optional[str]:
+        """
+        description: |
+            New `sequence` values for existing Menu Items in the App, applied before the new Menu Items are created.
+            Every Menu Item keeps its predecessor, and the sequences of siblings must stay unique.
+        type: array
+        items:
+            type: object
+            properties:
+                id:
+                    type: integer
+                sequence:
+                    type: integer
+        required: false
+        """
+        if sequences is None:
+            sequences = list()
+        if not isinstance(sequences, list):
+            return 'app_manager_menu_item_bulk_101'
+
+        cleaned: Dict[int, int] = dict()
+        try:
+            for entry in sequences:
+                cleaned[int(entry['id'])] = int(entry['sequence'])
+        except (KeyError, TypeError, ValueError):
+            return 'app_manager_menu_item_bulk_101'
+
+        siblings = self._siblings()
+        if len(set(cleaned) - set(self._existing)) > 0:
+            return 'app_manager_menu_item_bulk_102'
+
+        # Rebuild the sequences of every predecessor with the renumbered Menu Items, which must not collide
+        for index in siblings.values():
+            index['sequences'] = set()
+        for pk, item in self._existing.items():
+            if pk not in cleaned:
+                siblings[item['predecessor_id']]['sequences'].add(item['sequence'])
+        for pk, sequence in sorted(cleaned.items()):
+            sibling_sequences = siblings[self._existing[pk]['predecessor_id']]['sequences']
+            if sequence in sibling_sequences:
+                return 'app_manager_menu_item_bulk_103'
+            sibling_sequences.add(sequence)
+
+        self.cleaned_data['sequences'] = cleaned
+        return None
+
+    def validate_menu_items(self, menu_items: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        """
+        description: |
+            The Menu Items to create. Each one is given a `temp_id` that is unique in the request, and is placed under
+            either an existing Menu Item with `predecessor_id`, or a Menu Item created earlier in the same list with
+            `predecessor_temp_id`. The other fields are the same as when creating a single Menu Item.
+        type: array
+        items:
+            type: object
+        required: false
+        """
+        if menu_items is None:
+            menu_items = list()
+        if not isinstance(menu_items, list) or len(menu_items) > self.MAX_MENU_ITEMS:
+            return 'app_manager_menu_item_bulk_104'
+        if 'sequences' in self.errors:
+            return None
+
+        siblings = self._siblings()
+        new: Dict[str, MenuItem] = dict()
+        parents: Dict[str, Optional[str]] = dict()
+        for data in menu_items:
+            if not isinstance(data, dict):
+                return 'app_manager_menu_item_bulk_104'
+            temp_id = str(data.get('temp_id', ''))
+            if len(temp_id) == 0 or temp_id in new:
+                return 'app_manager_menu_item_bulk_105'
+
+            item = MenuItem(app_id=self.kwargs['app_id'])
+            parent_temp_id = data.get('predecessor_temp_id')
+            if parent_temp_id is not None:
+                parent_temp_id = str(parent_temp_id)
+                if parent_temp_id not in new:
+                    # Predecessors must come earlier in the list, which also rules out cycles
+                    return 'app_manager_menu_item_bulk_106'
+                sibling_key: Any = ('temp', parent_temp_id)
+            elif data.get('predecessor_id') is not None:
+                try:
+                    predecessor = self._existing[int(data['predecessor_id'])]
+                except (KeyError, TypeError, ValueError):
+                    return 'app_manager_menu_item_bulk_107'
+                item.predecessor_id = predecessor['id']
+                item.path = f'{predecessor["path"]}{predecessor["id"]}/'
+                item.depth = predecessor['depth'] + 1
+                sibling_key = predecessor['id']
+            else:
+                item.path = '/'
+                item.depth = 1
+                sibling_key = None
+
+            try:
+                item.sequence = int(data['sequence'])
+            except (KeyError, TypeError, ValueError):
+                return 'app_manager_menu_item_bulk_108'
+            if item.sequence in siblings[sibling_key]['sequences']:
+                return 'app_manager_menu_item_bulk_109'
+
+            name = str(data.get('name') or '').strip()
+            if len(name) == 0 or len(name) > self.get_field('name').max_length:
+                return 'app_manager_menu_item_bulk_110'
+            if name in siblings[sibling_key]['names']:
+                return 'app_manager_menu_item_bulk_111'
+            item.name = name
+
+            action = str(data.get('action') or '').strip()
+            if len(action) > self.get_field('action').max_length:
+                return 'app_manager_menu_item_bulk_112'
+            item.action = action
+            item.help = data.get('help') or ''
+
+            for field, default in (('administrator_only', False), ('public', True), ('self_managed', True)):
+                value = data.get(field, default)
+                if not isinstance(value, bool):
+                    return 'app_manager_menu_item_bulk_113'
+                setattr(item, field, value)
+
+            siblings[sibling_key]['sequences'].add(item.sequence)
+            siblings[sibling_key]['names'].add(item.name)
+            new[temp_id] = item
+            parents[temp_id] = parent_temp_id
+
+        self.cleaned_data['menu_items'] = new
+        self.cleaned_data['predecessor_temp_ids'] = parents
+        return None
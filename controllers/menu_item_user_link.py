@@ -1,5 +1,5 @@
 # stdlib
-from typing import cast, List, Optional
+from typing import cast, Dict, List, Optional, Set
 # libs
 from cloudcix_rest.controllers import ControllerBase
 # local
@@ -11,6 +11,7 @@ from app_manager.models import (
 
 
 __all__ = [
+    'MenuItemUserLinkBulkController',
     'MenuItemUserLinkListController',
     'MenuItemUserLinkUpdateController',
 ]
@@ -70,7 +71,7 @@ class MenuItemUserLinkUpdateController(ControllerBase):
             return 'app_manager_menu_item_user_link_update_102'
 
         linked_apps = MemberLink.objects.filter(
-            member_id=self.request.user.member['id'],
+            member_id__in=[0, self.request.user.member['id']],
         ).values_list(
             'app_id',
             flat=True,
@@ -83,3 +84,104 @@ class MenuItemUserLinkUpdateController(ControllerBase):
             return 'app_manager_menu_item_user_link_update_103'
         self.cleaned_data['menu_item_ids'] = menu_item_ids
         return None
+
+
+class MenuItemUserLinkBulkController(ControllerBase):
+    """
+    Validates User data used to change the Menu Item User Links of many Users in one request.
+    The Menu Items are checked with one query. The Users are checked with batched Membership lookups by the permission
+    check
+    """
+
+    class Meta(ControllerBase.Meta):
+        """
+        Override some of the ControllerBase.Meta fields to make them more specific for this Controller
+        """
+        model = MenuItemUserLink
+        validation_order = (
+            'users',
+        )
+
+    # The most Users whose links can be changed in one request
+    MAX_USERS = 1000
+
+    def validate_users(self, users: Optional[Dict[str, Dict[str, List[int]]]]) -> Optional[str]:
+        """
+        description: |
+            A map of User ids to the changes to make to their links. Each User is either sent the exact
+            `menu_item_ids` they should be linked to, or lists of Menu Item ids to `add` and `remove`.
+        type: object
+        additionalProperties:
+            type: object
+            properties:
+                menu_item_ids:
+                    type: array
+                    items:
+                        type: integer
+                add:
+                    type: array
+                    items:
+                        type: integer
+                remove:
+                    type: array
+                    items:
+                        type: integer
+        """
+        if not isinstance(users, dict) or not 0 < len(users) <= self.MAX_USERS:
+            return 'app_manager_menu_item_user_link_bulk_101'
+
+        changes: Dict[str, Dict[int, List[int]]] = {'replace': dict(), 'add': dict(), 'remove': dict()}
+        seen: Set[int] = set()
+        for user_id, change in users.items():
+            try:
+                user_id = int(user_id)
+            except (TypeError, ValueError):
+                return 'app_manager_menu_item_user_link_bulk_102'
+            # Keys such as "5" and "05" are the same User, whose changes would otherwise be merged
+            if user_id in seen:
+                return 'app_manager_menu_item_user_link_bulk_102'
+            seen.add(user_id)
+
+            if not isinstance(change, dict) or len(change) == 0:
+                return 'app_manager_menu_item_user_link_bulk_103'
+            if 'menu_item_ids' in change:
+                # A User is either sent their exact links, or changes to their current links, never both
+                if len(change) != 1:
+                    return 'app_manager_menu_item_user_link_bulk_103'
+                fields = {'replace': change['menu_item_ids']}
+            elif set(change) <= {'add', 'remove'}:
+                fields = dict(change)
+            else:
+                return 'app_manager_menu_item_user_link_bulk_103'
+
+            for field, menu_item_ids in fields.items():
+                if not isinstance(menu_item_ids, list):
+                    return 'app_manager_menu_item_user_link_bulk_103'
+                try:
+                    changes[field][user_id] = [int(cast(int, menu_item)) for menu_item in menu_item_ids]
+                except (TypeError, ValueError):
+                    return 'app_manager_menu_item_user_link_bulk_104'
+
+        # Every Menu Item that is being linked must belong to an App the requesting User's Member is using
+        requested = {
+            menu_item
+            for field in ('replace', 'add')
+            for menu_item_ids in changes[field].values()
+            for menu_item in menu_item_ids
+        }
+        if len(requested) > 0:
+            linked_apps = MemberLink.objects.filter(
+                member_id__in=[0, self.request.user.member['id']],
+            ).values_list(
+                'app_id',
+                flat=True,
+            )
+            menu_items = MenuItem.objects.filter(
+                id__in=requested,
+                app_id__in=linked_apps,
+            )
+            if len(requested) != menu_items.count():
+                return 'app_manager_menu_item_user_link_bulk_105'
+
+        self.cleaned_data['users'] = changes
+        return None
@@ -13,14 +13,193 @@ This stuff could be used when it comes to sharding out the DBs too.
 """
 
 # stdlib
-from typing import Any, Dict, Optional, Type
+import hashlib
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Type
 # libs
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, DatabaseError
+from django.db.backends.base.base import BaseDatabaseWrapper
 from django.db.models import Model
 
 
+PRIMARY = 'app_manager'
+WRITE_METHODS = frozenset(('DELETE', 'PATCH', 'POST', 'PUT'))
+PIN_KEY = 'app_manager:router:pin:{}'
+# Statements that change data. Anything else run on the primary, e.g. SELECT, SET or SAVEPOINT, does not pin the
+# request. WITH is counted as a write as a data modifying CTE starts with it
+WRITE_STATEMENTS = ('COPY', 'DELETE', 'INSERT', 'MERGE', 'TRUNCATE', 'UPDATE', 'WITH')
+
+# Set when the current request has to read from the primary, i.e. it has written, or its User wrote recently
+_pinned: ContextVar[bool] = ContextVar('app_manager_router_pinned', default=False)
+# A hash of the current request's credentials, used to pin the User to the primary after a write
+_caller: ContextVar[Optional[str]] = ContextVar('app_manager_router_caller', default=None)
+# Alias -> monotonic time until which the replica is ejected
+_ejected: Dict[str, float] = dict()
+_health_lock = threading.Lock()
+# The thread that checks the health of the replicas, started by the first read routed to a replica in each process
+_prober: Optional[threading.Thread] = None
+
+
+def _replicas() -> Dict[str, int]:
+    """
+    The configured read replica aliases and their weights
+    """
+    return getattr(settings, 'APP_MANAGER_READ_REPLICAS', dict())
+
+
+def _pin_cache():
+    return caches[getattr(settings, 'APP_MANAGER_CACHE', 'default')]
+
+
+def _pin_seconds() -> int:
+    return getattr(settings, 'APP_MANAGER_PRIMARY_PIN_SECONDS', 5)
+
+
+def pin_to_primary():
+    """
+    Route every read for the rest of the current request to the primary, and remember the caller so that their reads
+    go to the primary for a short window after the request too
+    """
+    _pinned.set(True)
+    caller = _caller.get()
+    if caller is not None and len(_replicas()) > 0:
+        _pin_cache().set(PIN_KEY.format(caller), 1, _pin_seconds())
+
+
+def pin_after_write(execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    """
+    Database execute wrapper, installed on the primary connection, that pins the current request to the primary once a
+    statement that changes data has run
+    """
+    result = execute(sql, params, many, context)
+    statement = sql.lstrip()[:10].split(None, 1)
+    if not _pinned.get() and len(statement) > 0 and statement[0].upper() in WRITE_STATEMENTS:
+        pin_to_primary()
+    return result
+
+
+def connection_created(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any):
+    """
+    Install `pin_after_write` on the primary connection of every thread
+    """
+    if connection.alias == PRIMARY and pin_after_write not in connection.execute_wrappers:
+        connection.execute_wrappers.append(pin_after_write)
+
+
+def request_started(sender: Any, environ: Optional[Dict[str, Any]] = None, **kwargs: Any):
+    """
+    Reset the pin at the start of every request. Requests that write, and requests from a caller who wrote within the
+    last APP_MANAGER_PRIMARY_PIN_SECONDS, read from the primary
+    """
+    _pinned.set(False)
+    _caller.set(None)
+    if environ is None or len(_replicas()) == 0:
+        return
+    authorization = environ.get('HTTP_X_AUTH_TOKEN') or environ.get('HTTP_AUTHORIZATION')
+    if authorization:
+        _caller.set(hashlib.sha256(authorization.encode()).hexdigest())
+    if environ.get('REQUEST_METHOD', 'GET').upper() in WRITE_METHODS:
+        pin_to_primary()
+    elif _caller.get() is not None and _pin_cache().get(PIN_KEY.format(_caller.get())) is not None:
+        _pinned.set(True)
+
+
+def request_finished(sender: Any, **kwargs: Any):
+    """
+    Start the caller's pin window from the end of a request that wrote, rather than its start
+    """
+    if _pinned.get() and _caller.get() is not None and len(_replicas()) > 0:
+        _pin_cache().set(PIN_KEY.format(_caller.get()), 1, _pin_seconds())
+
+
+def eject(alias: str):
+    """
+    Stop reading from a replica for APP_MANAGER_REPLICA_EJECT_SECONDS, e.g. after a connection error
+    """
+    with _health_lock:
+        _ejected[alias] = time.monotonic() + getattr(settings, 'APP_MANAGER_REPLICA_EJECT_SECONDS', 30)
+
+
+def _healthy(alias: str) -> bool:
+    """
+    Check if a replica can be read from, i.e. it has not been ejected. The replicas are probed by a background thread,
+    so routing never waits on a connection attempt
+    """
+    return _ejected.get(alias, 0) <= time.monotonic()
+
+
+def _probe(alias: str):
+    """
+    Check that a replica can be connected to, ejecting it if not
+    """
+    connection = connections[alias]
+    try:
+        connection.ensure_connection()
+        healthy = connection.is_usable()
+    except DatabaseError:
+        healthy = False
+    if healthy:
+        return
+    try:
+        connection.close()
+    except DatabaseError:
+        pass
+    eject(alias)
+
+
+def _probe_replicas():
+    """
+    Probe every replica every APP_MANAGER_REPLICA_CHECK_SECONDS, for the life of the process
+    """
+    while True:
+        for alias in _replicas():
+            _probe(alias)
+        time.sleep(getattr(settings, 'APP_MANAGER_REPLICA_CHECK_SECONDS', 10))
+
+
+def _start_prober():
+    """
+    Start the thread that probes the replicas, if it is not already running in this process
+    """
+    global _prober
+    if _prober is not None and _prober.is_alive():
+        return
+    with _health_lock:
+        # Threads do not survive a fork, so a worker forked from a process that started one starts its own
+        if _prober is None or not _prober.is_alive():
+            _prober = threading.Thread(target=_probe_replicas, name='app_manager_replica_probe', daemon=True)
+            _prober.start()
+
+
+def _choose_replica() -> str:
+    """
+    Choose a healthy replica at random, weighted by the configured weights, falling back to the primary
+    """
+    _start_prober()
+    candidates: List[str] = list()
+    weights: List[int] = list()
+    for alias, weight in _replicas().items():
+        if weight > 0 and _healthy(alias):
+            candidates.append(alias)
+            weights.append(weight)
+    if len(candidates) == 0:
+        return PRIMARY
+    return random.choices(candidates, weights)[0]
+
+
 class AppManagerRouter:
     """
     This class controls Django's DB functionality to ensure that all app_manager models get routed to the app_manager DB
+
+    Reads are spread over the APP_MANAGER_READ_REPLICAS when any are configured, except in a request that has written,
+    within a transaction, or shortly after the same caller wrote, when they go to the primary so that the caller
+    always reads their own writes. A request is pinned by `pin_after_write` once a write has run, so choosing the
+    primary with `db_for_write` does not pin it by itself
     """
 
     def db_for_read(self, model: Type[Model], **hints: Dict[str, Any]) -> Optional[str]:
@@ -31,7 +210,9 @@ class AppManagerRouter:
         :return: The name of the DB to route reads to
         """
         if model._meta.app_label == 'app_manager':
-            return 'app_manager'
+            if len(_replicas()) == 0 or _pinned.get() or connections[PRIMARY].in_atomic_block:
+                return PRIMARY
+            return _choose_replica()
         # We don't read from any other DB during test so we can safely ignore this line from coverage
         return None  # pragma: no cover
 
@@ -43,7 +224,7 @@ class AppManagerRouter:
         :return: The name of the DB to route writes to
         """
         if model._meta.app_label == 'app_manager':
-            return 'app_manager'
+            return PRIMARY
         return None  # pragma: no cover
 
     def allow_relation(self, model1: Type[Model], model2: Type[Model], **hints: Dict[str, Any]) -> Optional[bool]:
@@ -65,4 +246,4 @@ class AppManagerRouter:
         :param hints: Any hints that can be given to help the decision
         :return: A flag that states whether the migration is allowed
         """
-        return True if app_label == 'app_manager' and db == 'app_manager' else None
+        return True if app_label == 'app_manager' and db == PRIMARY else None
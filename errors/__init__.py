@@ -1,4 +1,5 @@
 from .app import *
+from .export import *
 from .member_link import *
 from .menu_item import *
 from .menu_item_user_link import *
@@ -7,6 +7,13 @@ app_manager_app_list_001 = (
     'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
     'match the required patterns.'
 )
+app_manager_app_list_002 = (
+    'The "cursor" parameter is invalid. "cursor" must be empty or the "next_cursor" of a previous request with the '
+    'same "order", and cannot be used when ordering by a related field.'
+)
+app_manager_app_list_003 = (
+    'The "count" parameter is invalid. "count" must be one of "exact", "estimate" or "none".'
+)
 
 # Create
 app_manager_app_create_101 = 'The "action" parameter is invalid. "action" cannot be longer than 8000 characters.'
@@ -0,0 +1,8 @@
+"""
+Error Codes for all of the Methods in the Export Service
+"""
+
+# Read
+app_manager_export_read_201 = (
+    'You do not have permission to make this request. Only the superuser can export the catalog.'
+)
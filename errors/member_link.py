@@ -27,6 +27,7 @@ app_manager_member_link_create_203 = (
 app_manager_member_link_delete_001 = (
     'The "app_id" path parameter is invalid. There is no Link between your Member and the App specified by "app_id".'
 )
+app_manager_member_link_delete_101 = 'The "member_id" parameter is invalid. "member_id" must be an integer.'
 app_manager_member_link_delete_201 = (
     'You do not have permission to make this request. You must be an administrator to delete a Member Link.'
 )
@@ -7,6 +7,17 @@ app_manager_menu_item_list_001 = (
     'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
     'match the required patterns.'
 )
+app_manager_menu_item_list_002 = (
+    'The "cursor" parameter is invalid. "cursor" must be empty or the "next_cursor" of a previous request with the '
+    'same "order", and cannot be used when ordering by a related field.'
+)
+app_manager_menu_item_list_003 = (
+    'The "count" parameter is invalid. "count" must be one of "exact", "estimate" or "none".'
+)
+app_manager_menu_item_list_004 = (
+    'The "fields" parameter is invalid. "fields" must be a comma separated list of Menu Item field names.'
+)
+app_manager_menu_item_list_005 = 'The "include" parameter is invalid. "include" can only be "app".'
 
 # Create
 app_manager_menu_item_create_001 = (
@@ -37,6 +48,58 @@ app_manager_menu_item_create_201 = (
     'You do not have permission to make this request. Only the owners of this cloud can create Menu Items.'
 )
 
+# Bulk
+app_manager_menu_item_bulk_001 = (
+    'The "app_id" path parameter is invalid. "app_id" must belong to a valid App record.'
+)
+app_manager_menu_item_bulk_101 = (
+    'The "sequences" parameter is invalid. "sequences" must be a list of objects, each with an integer "id" and '
+    '"sequence".'
+)
+app_manager_menu_item_bulk_102 = (
+    'The "sequences" parameter is invalid. Each "id" in "sequences" must belong to a Menu Item in the App.'
+)
+app_manager_menu_item_bulk_103 = (
+    'The "sequences" parameter is invalid. The new "sequence" numbers would be used by more than one Menu Item with '
+    'the same "predecessor_id".'
+)
+app_manager_menu_item_bulk_104 = (
+    'The "menu_items" parameter is invalid. "menu_items" must be a list of at most 1000 objects.'
+)
+app_manager_menu_item_bulk_105 = (
+    'The "menu_items" parameter is invalid. Each Menu Item must have a "temp_id" that is unique in the request.'
+)
+app_manager_menu_item_bulk_106 = (
+    'The "menu_items" parameter is invalid. Each "predecessor_temp_id" must be the "temp_id" of a Menu Item earlier '
+    'in the list.'
+)
+app_manager_menu_item_bulk_107 = (
+    'The "menu_items" parameter is invalid. Each "predecessor_id" must belong to a Menu Item in the App.'
+)
+app_manager_menu_item_bulk_108 = (
+    'The "menu_items" parameter is invalid. Each Menu Item requires an integer "sequence".'
+)
+app_manager_menu_item_bulk_109 = (
+    'The "menu_items" parameter is invalid. Each "sequence" number must not be in use by another Menu Item with the '
+    'same predecessor.'
+)
+app_manager_menu_item_bulk_110 = (
+    'The "menu_items" parameter is invalid. Each Menu Item requires a "name" of at most 150 characters.'
+)
+app_manager_menu_item_bulk_111 = (
+    'The "menu_items" parameter is invalid. Each "name" must not be in use by another Menu Item with the same '
+    'predecessor.'
+)
+app_manager_menu_item_bulk_112 = (
+    'The "menu_items" parameter is invalid. "action" cannot be longer than 150 characters.'
+)
+app_manager_menu_item_bulk_113 = (
+    'The "menu_items" parameter is invalid. "administrator_only", "public" and "self_managed" must be booleans.'
+)
+app_manager_menu_item_bulk_201 = (
+    'You do not have permission to make this request. Only the owners of this cloud can create Menu Items.'
+)
+
 # Read
 app_manager_menu_item_read_001 = (
     'The "app_id" and/or "pk" path parameters are invalid. "app_id" must belong to a valid App record, and "pk" must '
@@ -75,6 +138,9 @@ app_manager_menu_item_update_110 = (
     '"predecessor_id".'
 )
 app_manager_menu_item_update_111 = 'The "self_managed" parameter is invalid. "self_managed" must be a boolean.'
+app_manager_menu_item_update_112 = (
+    'The "predecessor_id" parameter is invalid. A Menu Item cannot be moved under itself or one of its descendants.'
+)
 app_manager_menu_item_update_201 = (
     'You do not have permission to make this request. Only the owners of this cloud can update Menu Items.'
 )
@@ -7,6 +7,17 @@ app_manager_menu_item_user_link_list_001 = (
     'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
     'match the required patterns.'
 )
+app_manager_menu_item_user_link_list_002 = (
+    'The "cursor" parameter is invalid. "cursor" must be empty or the "next_cursor" of a previous request with the '
+    'same "order", and cannot be used when ordering by a related field.'
+)
+app_manager_menu_item_user_link_list_003 = (
+    'The "count" parameter is invalid. "count" must be one of "exact", "estimate" or "none".'
+)
+app_manager_menu_item_user_link_list_004 = (
+    'The "fields" parameter is invalid. "fields" must be a comma separated list of Menu Item field names.'
+)
+app_manager_menu_item_user_link_list_005 = 'The "include" parameter is invalid. "include" can only be "app".'
 app_manager_menu_item_user_link_list_201 = (
     'You do not have permission to make this request. There is no User in Membership with the given "user_id".'
 )
@@ -36,3 +47,34 @@ app_manager_menu_item_user_link_update_203 = (
     'You do not have permission to make this request. You cannot read the User record for the given "user_id" if it '
     'exists'
 )
+
+# Bulk
+app_manager_menu_item_user_link_bulk_101 = (
+    'The "users" parameter is invalid. "users" is required and must be an object mapping between 1 and 1000 User ids '
+    'to the changes to make to their links.'
+)
+app_manager_menu_item_user_link_bulk_102 = (
+    'The "users" parameter is invalid. Not every key in "users" is a User id, or a User id is sent more than once.'
+)
+app_manager_menu_item_user_link_bulk_103 = (
+    'The "users" parameter is invalid. The changes for each User must be an object containing either a '
+    '"menu_item_ids" list, or "add" and / or "remove" lists.'
+)
+app_manager_menu_item_user_link_bulk_104 = (
+    'The "users" parameter is invalid. Not every Menu Item id sent for the Users is an integer.'
+)
+app_manager_menu_item_user_link_bulk_105 = (
+    'The "users" parameter is invalid. Not all of the given ids belong to valid Menu Items, or they belong to Apps '
+    'that your Member is not using.'
+)
+app_manager_menu_item_user_link_bulk_201 = (
+    'You do not have permission to make this request. You must be an admin to update Menu Item User Links.'
+)
+app_manager_menu_item_user_link_bulk_202 = (
+    'You do not have permission to make this request. You must be in a self-managed Member to update Menu Item User '
+    'Links.'
+)
+app_manager_menu_item_user_link_bulk_203 = (
+    'You do not have permission to make this request. You cannot read the User record for one or more of the given '
+    'User ids if they exist.'
+)
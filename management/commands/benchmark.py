@@ -0,0 +1,418 @@
+"""
+Benchmark every endpoint against a synthetic data set, as several kinds of User
+"""
+
+# stdlib
+import json
+import statistics
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional, Tuple
+# libs
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections, DatabaseError, router, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+# local
+from app_manager import views
+from app_manager.models import App, MenuItem, MenuItemUserLink
+from app_manager.utils import membership
+from app_manager.utils.tenant_generator import generate
+
+
+# A sequence that no generated Menu Item uses, for the Menu Items that the benchmark creates
+BENCHMARK_SEQUENCE = 1000000
+# A request to time, as (method, path, view, view kwargs, body, expected status)
+Endpoint = Tuple[str, str, Callable, Dict[str, Any], Optional[Dict[str, Any]], int]
+
+
+class Rollback(Exception):
+    """
+    Raised to roll back the generated data once the benchmark has run, and each request once it has been timed
+    """
+    pass
+
+
+class BenchmarkUser:
+    """
+    A stand in for the authenticated User that the CloudCIX authentication sets on requests
+    """
+    is_authenticated = True
+
+    def __init__(self, id: int, member: Dict[str, Any], administrator: bool):
+        self.id = id
+        self.member = member
+        self.administrator = administrator
+        self.token = f'benchmark-{id}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic data set and time every endpoint as a superuser, an administrator, a User and a User in '
+        'a Member that is not self managed. Each request runs in a savepoint that is rolled back, and the generated '
+        'data is rolled back afterwards. The run fails if an endpoint returns anything other than its success status '
+        'or a 403. The JSON report has sorted keys and rounded values, so reports from different commits can be '
+        'diffed. Needs PostgreSQL.'
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--apps', type=int, default=20, help='The number of Apps')
+        parser.add_argument('--menu-items', type=int, default=100, help='The number of Menu Items in each App')
+        parser.add_argument('--depth', type=int, default=3, help='The depth of the Menu Item tree of each App')
+        parser.add_argument('--members', type=int, default=50, help='The number of Members')
+        parser.add_argument('--users', type=int, default=200, help='The number of Users')
+        parser.add_argument('--links-per-user', type=int, default=20, help='The Menu Item User Links of each User')
+        parser.add_argument('--requests', type=int, default=30, help='The number of timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='The number of untimed requests per endpoint')
+        parser.add_argument('--seed', type=int, default=0, help='The seed for the generated data')
+        parser.add_argument(
+            '--cold-membership',
+            action='store_true',
+            help=(
+                'Clear the Membership lookup cache before every request, so that each one calls Membership. Run the '
+                'membership_stub command with --delay to see how much of its latency each request pays.'
+            ),
+        )
+        parser.add_argument('--output', default=None, help='A file to write the JSON report to, instead of stdout')
+
+    def _personas(self, data: Dict[str, Any]) -> Dict[str, BenchmarkUser]:
+        """
+        Choose a User of each kind from the generated data
+        """
+        def first(check: Callable[[Dict[str, Any]], bool]) -> Optional[BenchmarkUser]:
+            for user in data['users']:
+                if check(user):
+                    return BenchmarkUser(user['id'], user['member'], user['administrator'])
+            return None
+
+        personas = {
+            'superuser': BenchmarkUser(1, {'id': 1, 'self_managed': True}, True),
+            'administrator': first(lambda u: u['administrator'] and u['member']['self_managed']),
+            'user': first(lambda u: not u['administrator'] and u['member']['self_managed']),
+            'not_self_managed': first(lambda u: not u['administrator'] and not u['member']['self_managed']),
+        }
+        return {name: persona for name, persona in personas.items() if persona is not None}
+
+    def _endpoints(
+            self,
+            data: Dict[str, Any],
+            persona: BenchmarkUser,
+    ) -> Dict[str, Endpoint]:
+        """
+        The requests to time for a persona. Requests that write are rolled back once they have been timed, so every
+        request sees the generated data. Personas that are not allowed to make a request are timed getting a 403
+        """
+        member_apps = data['member_apps'].get(persona.member['id']) or data['apps']
+        app_id = member_apps[0]
+        # An App that the persona's Member is not linked to yet, to link it to
+        linked_ids = set(data['member_apps'].get(persona.member['id'], list()))
+        unlinked_id = next((pk for pk in data['apps'] if pk not in linked_ids), None)
+        # A Member Link to delete. The superuser's Member has none, so they delete one of a generated Member
+        member_link_delete: Optional[Tuple[str, int]] = None
+        if persona.id == 1:
+            linked = next(((m, apps[0]) for m, apps in sorted(data['member_apps'].items()) if len(apps) > 0), None)
+            if linked is not None:
+                member_link_delete = (f'/app/{linked[1]}/member/?member_id={linked[0]}', linked[1])
+        elif len(linked_ids) > 0:
+            member_link_delete = (f'/app/{app_id}/member/', app_id)
+        item = MenuItem.objects.filter(app_id=app_id).order_by('id').first()
+        app = App.objects.get(pk=app_id)
+        # Sending the User's current links makes the update repeatable
+        user_links = list(MenuItemUserLink.objects.filter(user_id=persona.id).values_list('menu_item_id', flat=True))
+        # Reading another User's links in the same Member needs a Membership lookup for the permission check
+        other_id = next(
+            (u['id'] for u in data['users'] if u['member']['id'] == persona.member['id'] and u['id'] != persona.id),
+            None,
+        )
+        endpoints: Dict[str, Endpoint] = {
+            'app_create': (
+                'post',
+                '/app/',
+                views.AppCollection.as_view(),
+                dict(),
+                {'name': 'Benchmark App', 'icon_url': '/icons/benchmark.png', 'online': True},
+                201,
+            ),
+            'app_delete': ('delete', f'/app/{app_id}/', views.AppResource.as_view(), {'pk': app_id}, None, 204),
+            'app_list': ('get', '/app/', views.AppCollection.as_view(), dict(), None, 200),
+            'app_read': ('get', f'/app/{app_id}/', views.AppResource.as_view(), {'pk': app_id}, None, 200),
+            'app_update': (
+                'put',
+                f'/app/{app_id}/',
+                views.AppResource.as_view(),
+                {'pk': app_id},
+                {'name': app.name, 'icon_url': app.icon_url, 'online': app.online},
+                200,
+            ),
+            'export': ('get', '/export/', views.ExportResource.as_view(), dict(), None, 200),
+            'menu_item_bulk': (
+                'post',
+                f'/app/{app_id}/menu_item/bulk/',
+                views.MenuItemBulkCollection.as_view(),
+                {'app_id': app_id},
+                {
+                    'menu_items': [
+                        {'temp_id': 'root', 'name': 'Benchmark Item', 'sequence': BENCHMARK_SEQUENCE},
+                        {'temp_id': 'child', 'predecessor_temp_id': 'root', 'name': 'Benchmark Item', 'sequence': 1},
+                    ],
+                },
+                201,
+            ),
+            'menu_item_create': (
+                'post',
+                f'/app/{app_id}/menu_item/',
+                views.MenuItemCollection.as_view(),
+                {'app_id': app_id},
+                {'name': 'Benchmark Item', 'sequence': BENCHMARK_SEQUENCE},
+                201,
+            ),
+            'menu_item_delete': (
+                'delete',
+                f'/app/{app_id}/menu_item/{item.pk}/',
+                views.MenuItemResource.as_view(),
+                {'app_id': app_id, 'pk': item.pk},
+                None,
+                204,
+            ),
+            'menu_item_list': (
+                'get',
+                f'/app/{app_id}/menu_item/',
+                views.MenuItemCollection.as_view(),
+                {'app_id': app_id},
+                None,
+                200,
+            ),
+            'menu_item_list_include_app': (
+                'get',
+                f'/app/{app_id}/menu_item/?include=app&fields=id,name,sequence,predecessor_id,app_id',
+                views.MenuItemCollection.as_view(),
+                {'app_id': app_id},
+                None,
+                200,
+            ),
+            'menu_item_read': (
+                'get',
+                f'/app/{app_id}/menu_item/{item.pk}/',
+                views.MenuItemResource.as_view(),
+                {'app_id': app_id, 'pk': item.pk},
+                None,
+                200,
+            ),
+            'menu_item_update': (
+                'put',
+                f'/app/{app_id}/menu_item/{item.pk}/',
+                views.MenuItemResource.as_view(),
+                {'app_id': app_id, 'pk': item.pk},
+                {
+                    'administrator_only': item.administrator_only,
+                    'name': item.name,
+                    'predecessor_id': item.predecessor_id,
+                    'public': item.public,
+                    'self_managed': item.self_managed,
+                    'sequence': item.sequence,
+                },
+                200,
+            ),
+            'navigation': ('get', '/navigation/', views.NavigationResource.as_view(), dict(), None, 200),
+            'menu_tree': (
+                'get',
+                f'/app/{app_id}/menu_tree/',
+                views.MenuTreeResource.as_view(),
+                {'app_id': app_id},
+                None,
+                200,
+            ),
+            'menu_item_user_link_list': (
+                'get',
+                f'/menu_item/user/{persona.id}/',
+                views.MenuItemUserLinkCollection.as_view(),
+                {'user_id': persona.id},
+                None,
+                200,
+            ),
+            'menu_item_user_link_update': (
+                'put',
+                f'/menu_item/user/{persona.id}/',
+                views.MenuItemUserLinkCollection.as_view(),
+                {'user_id': persona.id},
+                {'menu_item_ids': user_links},
+                200,
+            ),
+            'menu_item_user_link_bulk': (
+                'put',
+                '/menu_item/user/',
+                views.MenuItemUserLinkBulkCollection.as_view(),
+                dict(),
+                {'users': {str(persona.id): {'menu_item_ids': user_links}}},
+                200,
+            ),
+        }
+        if member_link_delete is not None:
+            endpoints['member_link_delete'] = (
+                'delete',
+                member_link_delete[0],
+                views.MemberLinkCollection.as_view(),
+                {'app_id': member_link_delete[1]},
+                None,
+                204,
+            )
+        if unlinked_id is not None:
+            endpoints['member_link_create'] = (
+                'post',
+                f'/app/{unlinked_id}/member/',
+                views.MemberLinkCollection.as_view(),
+                {'app_id': unlinked_id},
+                {'member_id': persona.member['id']},
+                201,
+            )
+        if other_id is not None:
+            endpoints['menu_item_user_link_list_other'] = (
+                'get',
+                f'/menu_item/user/{other_id}/',
+                views.MenuItemUserLinkCollection.as_view(),
+                {'user_id': other_id},
+                None,
+                200,
+            )
+        return endpoints
+
+    def _request(
+            self,
+            factory: APIRequestFactory,
+            persona: BenchmarkUser,
+            endpoint: Endpoint,
+            cold_membership: bool = False,
+    ) -> Tuple[float, int, int, int]:
+        """
+        Make one request in a savepoint that is rolled back afterwards, returning its time in milliseconds, the number
+        of queries, the size of the response body and its status code. A database error is reported as a 500
+        """
+        method, path, view, kwargs, body = endpoint[:5]
+        if body is not None:
+            request = getattr(factory, method)(path, body, format='json')
+        else:
+            request = getattr(factory, method)(path)
+        force_authenticate(request, user=persona)
+        if cold_membership:
+            membership.clear()
+        result: Tuple[float, int, int, int] = (0.0, 0, 0, 500)
+        try:
+            with transaction.atomic(using=router.db_for_write(App)):
+                captures = [CaptureQueriesContext(connection) for connection in connections.all()]
+                for capture in captures:
+                    capture.__enter__()
+                try:
+                    with settings.TRACER.start_span('benchmark') as span:
+                        request.span = span
+                        start = perf_counter()
+                        response = view(request, **kwargs)
+                        if response.streaming:
+                            content = b''.join(response.streaming_content)
+                        else:
+                            if hasattr(response, 'render'):
+                                response.render()
+                            content = response.content or b''
+                        elapsed = (perf_counter() - start) * 1000
+                finally:
+                    for capture in captures:
+                        capture.__exit__(None, None, None)
+                queries = sum(len(capture.captured_queries) for capture in captures)
+                result = (elapsed, queries, len(content), response.status_code)
+                raise Rollback()
+        except Rollback:
+            pass
+        except DatabaseError as e:
+            self.stderr.write(f'{method.upper()} {path}: {e}')
+        return result
+
+    def _time(
+            self,
+            factory: APIRequestFactory,
+            persona: BenchmarkUser,
+            endpoint: Endpoint,
+            warmup: int,
+            requests: int,
+            cold_membership: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Time an endpoint, reporting the median and 95th percentile latency and the queries and bytes per request
+        """
+        for _ in range(warmup):
+            self._request(factory, persona, endpoint, cold_membership)
+        results = [self._request(factory, persona, endpoint, cold_membership) for _ in range(requests)]
+        unexpected = sorted({result[3] for result in results} - {endpoint[5], 403})
+        if len(unexpected) > 0:
+            raise CommandError(
+                f'{endpoint[0].upper()} {endpoint[1]} returned {unexpected} as User {persona.id}, expected '
+                f'{endpoint[5]} or 403',
+            )
+        times = sorted(result[0] for result in results)
+        return {
+            'bytes': max(result[2] for result in results),
+            'p50_ms': round(statistics.median(times), 2),
+            'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))], 2),
+            'queries': max(result[1] for result in results),
+            'status': sorted({result[3] for result in results}),
+        }
+
+    def handle(self, *args: Any, **options: Any):
+        if options['apps'] < 1 or options['members'] < 1 or options['requests'] < 1:
+            raise CommandError('--apps, --members and --requests must be at least 1')
+        if connections[router.db_for_write(App)].vendor != 'postgresql':
+            raise CommandError('The benchmark can only be run on PostgreSQL')
+
+        report: Dict[str, Any] = {
+            'parameters': {
+                name: options[name]
+                for name in (
+                    'apps',
+                    'cold_membership',
+                    'depth',
+                    'links_per_user',
+                    'members',
+                    'menu_items',
+                    'requests',
+                    'seed',
+                    'users',
+                )
+            },
+            'results': dict(),
+        }
+        factory = APIRequestFactory()
+        try:
+            # Everything runs in one transaction that is rolled back, so the database is left as it was. Each request
+            # also runs in its own savepoint, so that writes and errors do not affect the requests after it
+            with transaction.atomic(using=router.db_for_write(App)):
+                data = generate(
+                    options['apps'],
+                    options['menu_items'],
+                    options['depth'],
+                    options['members'],
+                    options['users'],
+                    options['links_per_user'],
+                    options['seed'],
+                )
+                for name, persona in sorted(self._personas(data).items()):
+                    results: Dict[str, Any] = dict()
+                    for endpoint_name, endpoint in sorted(self._endpoints(data, persona).items()):
+                        results[endpoint_name] = self._time(
+                            factory,
+                            persona,
+                            endpoint,
+                            options['warmup'],
+                            options['requests'],
+                            options['cold_membership'],
+                        )
+                        self.stderr.write(f'{name} {endpoint_name}: {results[endpoint_name]}')
+                    report['results'][name] = results
+                raise Rollback()
+        except Rollback:
+            pass
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output'] is None:
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w') as f:
+                f.write(f'{output}\n')
+            self.stdout.write(self.style.SUCCESS(f'Wrote the report to {options["output"]}'))
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark of serializing Menu Items with precompiled URL templates compared to reversing every `uri`
+"""
+
+# stdlib
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Callable, List
+from unittest import mock
+# libs
+from django.core.management.base import BaseCommand, CommandParser
+from django.urls import reverse
+# local
+from app_manager.models import App, MenuItem
+from app_manager.serializers import MenuItemSerializer
+
+
+def _reverse_app_url(self: App) -> str:
+    """
+    The previous implementation of App.get_absolute_url
+    """
+    return reverse('app_resource', kwargs={'pk': self.pk})
+
+
+def _reverse_menu_item_url(self: MenuItem) -> str:
+    """
+    The previous implementation of MenuItem.get_absolute_url
+    """
+    return reverse('menu_item_resource', kwargs={'app_id': self.app_id, 'pk': self.id})
+
+
+class Command(BaseCommand):
+    help = 'Time the serialization of Menu Items with URL templates and with reverse(), without using the database'
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--rows', type=int, default=1000, help='The number of Menu Items to serialize per run')
+        parser.add_argument('--runs', type=int, default=20, help='The number of runs to take the best time from')
+
+    def _best(self, runs: int, func: Callable[[], Any]) -> float:
+        """
+        Get the fastest of several runs of a function, in milliseconds
+        """
+        times = list()
+        for _ in range(runs):
+            start = perf_counter()
+            func()
+            times.append((perf_counter() - start) * 1000)
+        return min(times)
+
+    def handle(self, *args: Any, **options: Any):
+        rows = options['rows']
+        now = datetime.utcnow()
+        app = App(id=1, name='Benchmark', icon_url='', created=now, updated=now, extra={})
+        items: List[MenuItem] = [
+            MenuItem(id=i, app=app, name=f'Item {i}', sequence=i, created=now, updated=now, extra={})
+            for i in range(1, rows + 1)
+        ]
+
+        def serialize():
+            return MenuItemSerializer(instance=items, many=True).data
+
+        template_ms = self._best(options['runs'], serialize)
+        with mock.patch.object(App, 'get_absolute_url', _reverse_app_url), \
+                mock.patch.object(MenuItem, 'get_absolute_url', _reverse_menu_item_url):
+            reverse_ms = self._best(options['runs'], serialize)
+
+        per_thousand = 1000 / rows
+        self.stdout.write(f'Serializing {rows} Menu Items, best of {options["runs"]} runs')
+        self.stdout.write(f'  reverse():     {reverse_ms:.2f}ms ({reverse_ms * per_thousand:.2f}ms per 1000 rows)')
+        self.stdout.write(f'  URL templates: {template_ms:.2f}ms ({template_ms * per_thousand:.2f}ms per 1000 rows)')
+        self.stdout.write(self.style.SUCCESS(
+            f'  Saved:         {(reverse_ms - template_ms) * per_thousand:.2f}ms per 1000 rows',
+        ))
@@ -0,0 +1,236 @@
+"""
+Check that the hot queries of the views, controllers and permissions are served by the indexes meant for them
+"""
+
+# stdlib
+import json
+from typing import Any, Dict, Iterator, List, Set, Tuple
+# libs
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections, router, transaction
+from django.db.models import Exists, Q, QuerySet
+# local
+from app_manager.models import App, MemberLink, MenuItem, MenuItemAccess, MenuItemUserLink
+from app_manager.utils.tenant_generator import generate
+
+
+# A query to explain, the table whose index should serve it, and the leading columns that index must have
+HotQuery = Tuple[QuerySet, str, Tuple[str, ...]]
+
+# The table and key columns of every index in the current schema
+INDEX_COLUMNS_SQL = '''
+SELECT index_class.relname, table_class.relname, array_agg(attribute.attname ORDER BY index_key.ordinal)
+FROM pg_index index_info
+JOIN pg_class index_class ON index_class.oid = index_info.indexrelid
+JOIN pg_class table_class ON table_class.oid = index_info.indrelid
+CROSS JOIN LATERAL unnest(index_info.indkey) WITH ORDINALITY AS index_key(attnum, ordinal)
+JOIN pg_attribute attribute ON attribute.attrelid = index_info.indrelid AND attribute.attnum = index_key.attnum
+WHERE table_class.relnamespace = current_schema()::regnamespace
+GROUP BY index_class.relname, table_class.relname
+'''
+
+
+class Rollback(Exception):
+    """
+    Raised to roll back the generated data once the plans have been checked
+    """
+    pass
+
+
+def _nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Walk every node of an EXPLAIN (FORMAT JSON) plan
+    """
+    yield plan
+    for child in plan.get('Plans', list()):
+        yield from _nodes(child)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic data set, EXPLAIN each hot query with sequential scans disabled, and fail if any of them '
+        'still has to scan a whole table, or is not served by an index with the leading columns meant for it. The '
+        'data is rolled back afterwards. PostgreSQL only.'
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--apps', type=int, default=20, help='The number of Apps to seed')
+        parser.add_argument('--menu-items', type=int, default=200, help='The number of Menu Items in each App')
+        parser.add_argument('--members', type=int, default=100, help='The number of Members to seed')
+        parser.add_argument('--users', type=int, default=500, help='The number of Users to seed')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the plan of every query')
+
+    def _queries(self, data: Dict[str, Any]) -> Dict[str, HotQuery]:
+        """
+        The hot queries, in the same shape as the views, controllers and permissions build them, including the
+        filters and ordering of the list views
+        """
+        user = next(u for u in data['users'] if not u['administrator'])
+        member_id = user['member']['id']
+        app_id = data['apps'][0]
+        item = MenuItem.objects.filter(app_id=app_id, predecessor__isnull=False).order_by('id').first()
+        access = MenuItemAccess.objects.filter(
+            user_id=user['id'],
+            app_id=app_id,
+            administrator_only=False,
+            self_managed=False,
+        ).values_list('menu_item_id', flat=True)
+        linked = Exists(MemberLink.objects.filter(app_id=app_id, member_id__in=[0, member_id]))
+        link_ids = set(MenuItemUserLink.objects.filter(user_id=user['id']).values_list('menu_item_id', flat=True))
+        return {
+            'entitlement_member_apps': (
+                MemberLink.objects.filter(
+                    member_id__in=[0, member_id],
+                    deleted__isnull=True,
+                ).values_list('app_id', flat=True),
+                'member_link',
+                ('member_id',),
+            ),
+            'entitlement_user_apps': (
+                MenuItemAccess.objects.filter(user_id=user['id']).values_list('app_id', flat=True).distinct(),
+                'menu_item_access',
+                ('user_id',),
+            ),
+            'entitlement_public_apps': (
+                MenuItem.objects.filter(public=True).values_list('app_id', flat=True),
+                'menu_item',
+                ('app_id',),
+            ),
+            'member_link_for_app': (
+                MemberLink.objects.filter(app_id=app_id, member_id__in=[0, member_id]),
+                'member_link',
+                ('member_id', 'app_id'),
+            ),
+            # The Menu Item list as an administrator, in its default order
+            'menu_item_list_administrator': (
+                MenuItem.objects.filter(
+                    Q(public=True, app_id=app_id) | Q(linked, app_id=app_id),
+                ).order_by('id').distinct(),
+                'menu_item',
+                ('app_id',),
+            ),
+            # The Menu Item list as a User in a Member that is not self managed, ordered by name
+            'menu_item_list_user': (
+                MenuItem.objects.filter(
+                    Q(public=True, app_id=app_id) | Q(linked, app_id=app_id, id__in=access),
+                ).order_by('name').distinct(),
+                'menu_item_access',
+                ('user_id', 'app_id'),
+            ),
+            'menu_item_navigation': (
+                MenuItem.objects.filter(app_id__in=data['apps'][:5]).order_by('app_id', 'depth', 'sequence', 'id'),
+                'menu_item',
+                ('app_id',),
+            ),
+            'menu_item_subtree': (
+                MenuItem.objects.filter(app_id=app_id, path__startswith=item.subtree_path),
+                'menu_item',
+                ('app_id', 'path'),
+            ),
+            'menu_item_sibling_name': (
+                MenuItem.objects.filter(app_id=app_id, name=item.name, predecessor_id=item.predecessor_id),
+                'menu_item',
+                ('app_id', 'predecessor_id', 'name'),
+            ),
+            'menu_item_sibling_sequence': (
+                MenuItem.objects.filter(app_id=app_id, predecessor_id=item.predecessor_id, sequence=item.sequence),
+                'menu_item',
+                ('app_id', 'predecessor_id', 'sequence'),
+            ),
+            'menu_item_root_sibling_sequence': (
+                MenuItem.objects.filter(app_id=app_id, predecessor__isnull=True, sequence=1),
+                'menu_item',
+                ('app_id', 'predecessor_id', 'sequence'),
+            ),
+            'menu_item_access_for_app': (
+                MenuItemAccess.objects.filter(user_id=user['id'], app_id=app_id),
+                'menu_item_access',
+                ('user_id', 'app_id'),
+            ),
+            'menu_item_access_for_item': (
+                MenuItemAccess.objects.filter(user_id=user['id'], menu_item=item),
+                'menu_item_access',
+                ('user_id', 'menu_item_id'),
+            ),
+            'menu_item_user_link_list': (
+                MenuItemUserLink.objects.filter(user_id=user['id']),
+                'menu_item_user_link',
+                ('user_id',),
+            ),
+            # The Menu Items of a User's links in the Apps of their Member, in the default order
+            'menu_item_user_link_items': (
+                MenuItem.objects.filter(
+                    id__in=link_ids,
+                    app_id__in=MemberLink.objects.filter(member_id__in=[0, member_id]).values_list('app_id', flat=True),
+                ).order_by('id'),
+                'menu_item',
+                ('id',),
+            ),
+        }
+
+    @staticmethod
+    def _used_indexes(plan: Dict[str, Any]) -> Set[str]:
+        """
+        The names of the indexes read anywhere in a plan, including those of bitmap scans and sub plans
+        """
+        return {node['Index Name'] for node in _nodes(plan) if 'Index Name' in node}
+
+    def handle(self, *args: Any, **options: Any):
+        db = router.db_for_write(App)
+        if connections[db].vendor != 'postgresql':
+            raise CommandError('Query plans can only be checked on PostgreSQL')
+
+        failures: List[str] = list()
+        try:
+            with transaction.atomic(using=db):
+                data = generate(
+                    options['apps'],
+                    options['menu_items'],
+                    3,
+                    options['members'],
+                    options['users'],
+                    10,
+                )
+                with connections[db].cursor() as cursor:
+                    cursor.execute('ANALYZE member_link, menu_item, menu_item_user_link, menu_item_access, app')
+                    # Any sequential scan left in a plan is then one that no index could replace
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+                    cursor.execute(INDEX_COLUMNS_SQL)
+                    indexes = {name: (table, tuple(columns)) for name, table, columns in cursor.fetchall()}
+
+                for name, (objs, table, columns) in sorted(self._queries(data).items()):
+                    plan = json.loads(objs.explain(format='json'))[0]['Plan']
+                    if options['verbose_plans']:
+                        self.stdout.write(objs.explain())
+                    scans = sorted({
+                        node['Relation Name']
+                        for node in _nodes(plan)
+                        if node['Node Type'] == 'Seq Scan'
+                    })
+                    used = sorted(self._used_indexes(plan))
+                    # The index meant for the query must be read, with sequential scans off the primary key index can
+                    # otherwise serve any query on a table while ignoring its filters
+                    expected = [
+                        index for index in used
+                        if index in indexes
+                        and indexes[index][0] == table
+                        and indexes[index][1][:len(columns)] == columns
+                    ]
+                    if len(scans) > 0:
+                        failure = f'{name}: sequential scan on {", ".join(scans)}'
+                    elif len(expected) == 0:
+                        failure = (
+                            f'{name}: no index on {table} ({", ".join(columns)}, ...) was used, only '
+                            f'{", ".join(used) or "none"}'
+                        )
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f'{name}: {", ".join(expected)}'))
+                        continue
+                    failures.append(failure)
+                    self.stdout.write(self.style.ERROR(failure))
+                raise Rollback()
+        except Rollback:
+            pass
+
+        if len(failures) > 0:
+            raise CommandError(f'{len(failures)} hot queries are not served by the indexes meant for them')
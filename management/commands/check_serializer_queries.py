@@ -0,0 +1,67 @@
+"""
+Check that serializing a page of Menu Items takes a fixed number of queries, however many of them have a predecessor
+"""
+
+# stdlib
+from typing import Any, List
+# libs
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections, router, transaction
+from django.test.utils import CaptureQueriesContext
+# local
+from app_manager.models import App, MenuItem
+from app_manager.serializers import MenuItemSerializer
+from app_manager.utils.tenant_generator import generate
+
+
+class Rollback(Exception):
+    """
+    Raised to roll back the generated data once the queries have been counted
+    """
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic App, read a page of its Menu Items that have predecessors the same way the list views do, '
+        'and fail unless serializing the page loads every predecessor in one query. The data is rolled back '
+        'afterwards.'
+    )
+
+    # Serializing a page of Menu Items reads their predecessors, with their Apps, in one query
+    EXPECTED_QUERIES = 1
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--menu-items', type=int, default=200, help='The number of Menu Items in the App')
+        parser.add_argument('--page', type=int, default=50, help='The number of Menu Items to serialize')
+
+    def handle(self, *args: Any, **options: Any):
+        if options['menu_items'] < 2 or options['page'] < 2:
+            raise CommandError('--menu-items and --page must be at least 2')
+
+        db = router.db_for_write(App)
+        try:
+            with transaction.atomic(using=db):
+                data = generate(1, options['menu_items'], 3, 1, 1, 0)
+                # The list views read Menu Items with their App, through the default manager
+                page: List[MenuItem] = list(MenuItem.objects.using(db).filter(
+                    app_id=data['apps'][0],
+                    predecessor__isnull=False,
+                ).order_by(
+                    'id',
+                )[:options['page']])
+                predecessors = len({obj.predecessor_id for obj in page})
+
+                with CaptureQueriesContext(connections[db]) as captured:
+                    MenuItemSerializer(instance=page, many=True).data
+                queries = len(captured.captured_queries)
+                raise Rollback()
+        except Rollback:
+            pass
+
+        message = f'Serialized {len(page)} Menu Items with {predecessors} distinct predecessors in {queries} queries'
+        if queries != self.EXPECTED_QUERIES:
+            for query in captured.captured_queries:
+                self.stdout.write(query['sql'])
+            raise CommandError(f'{message}, expected {self.EXPECTED_QUERIES}')
+        self.stdout.write(self.style.SUCCESS(message))
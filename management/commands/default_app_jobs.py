@@ -0,0 +1,33 @@
+"""
+Resume or inspect the Default App Jobs that provision default Apps for every Member
+"""
+
+# stdlib
+from typing import Any
+# libs
+from django.core.management.base import BaseCommand, CommandParser
+# local
+from app_manager.models import DefaultAppJob
+from app_manager.utils.default_apps import resume
+
+
+class Command(BaseCommand):
+    help = 'Run every unfinished Default App Job, resuming each one from the last Member it processed'
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--batch-size', type=int, default=None, help='The number of Members to process per batch')
+        parser.add_argument('--status', action='store_true', help='Show the progress of recent jobs and exit')
+
+    def handle(self, *args: Any, **options: Any):
+        if options['status']:
+            for job in DefaultAppJob.objects.order_by('-id')[:20]:
+                self.stdout.write(
+                    f'#{job.pk} {job.action} App #{job.app_id}: {job.status}, '
+                    f'{job.processed}/{job.total if job.total is not None else "?"} Members',
+                )
+            return
+
+        for job in resume(options['batch_size']):
+            self.stdout.write(self.style.SUCCESS(
+                f'#{job.pk} {job.action} App #{job.app_id}: processed {job.processed} Members',
+            ))
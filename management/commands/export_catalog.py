@@ -0,0 +1,45 @@
+"""
+Export the whole catalog as NDJSON, in constant memory
+"""
+
+# stdlib
+import sys
+from typing import Any
+# libs
+from django.core.management.base import BaseCommand, CommandParser
+# local
+from app_manager.utils.export import chunks, gzip_chunks, records
+
+
+class Command(BaseCommand):
+    help = (
+        'Write every App, Member Link, Menu Item and Menu Item User Link as NDJSON, the same as the export endpoint. '
+        'Records are read through server side cursors, so catalogs of any size are exported in constant memory.'
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--output', default='-', help='The file to write the export to, or - for stdout')
+        parser.add_argument('--gzip', action='store_true', help='Compress the export with gzip')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='The number of rows to fetch from the database at a time',
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        stream = chunks(records(options['chunk_size']))
+        if options['gzip']:
+            stream = gzip_chunks(stream)
+
+        if options['output'] == '-':
+            for chunk in stream:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            written = 0
+            with open(options['output'], 'wb') as f:
+                for chunk in stream:
+                    f.write(chunk)
+                    written += len(chunk)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {written} bytes to {options["output"]}'))
@@ -0,0 +1,56 @@
+"""
+Import a bundle of Apps, Menu Item trees and default Member Links through PostgreSQL COPY
+"""
+
+# stdlib
+import json
+import os
+from time import perf_counter
+from typing import Any
+# libs
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+# local
+from app_manager.utils.catalog_import import BundleError, import_bundle
+
+
+class Command(BaseCommand):
+    help = (
+        'Import a catalog bundle, either an NDJSON file in the format written by export_catalog (optionally gzipped) '
+        'or a directory of app.csv, menu_item.csv and member_link.csv files. The records are loaded into staging '
+        'tables with COPY, checked with set based queries and merged in one transaction, so nothing is imported if '
+        'any record is invalid. Only the default Member Links, i.e. those for Member 0, are imported unless '
+        '--all-member-links is given, and Menu Item User Links are never imported. PostgreSQL only.'
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('bundle', help='The NDJSON file or CSV directory to import')
+        parser.add_argument(
+            '--skip-existing',
+            action='store_true',
+            help='Leave out Apps whose name is already used, and their Menu Items and Member Links, instead of failing',
+        )
+        parser.add_argument(
+            '--all-member-links',
+            action='store_true',
+            help='Import the Member Links of every Member, not only the default Member Links',
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        if not os.path.exists(options['bundle']):
+            raise CommandError(f'{options["bundle"]} does not exist')
+
+        start = perf_counter()
+        try:
+            summary = import_bundle(
+                options['bundle'],
+                skip_existing=options['skip_existing'],
+                all_member_links=options['all_member_links'],
+            )
+        except BundleError as e:
+            for problem in e.problems:
+                self.stderr.write(problem)
+            raise CommandError(str(e))
+
+        summary['seconds'] = round(perf_counter() - start, 3)
+        self.stdout.write(json.dumps(summary, indent=2, sort_keys=True))
+        self.stdout.write(self.style.SUCCESS(f'Imported {summary["apps_imported"]} Apps'))
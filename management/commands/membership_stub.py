@@ -0,0 +1,101 @@
+"""
+Run a local stub of the Membership API's User and Member read endpoints and User list endpoint, for tests and
+benchmarks
+"""
+
+# stdlib
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import parse_qs
+# libs
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+
+PATH = re.compile(r'/(?P<kind>user|member)/(?P<pk>\d+)/?$')
+LIST_PATH = re.compile(r'/user/?$')
+
+
+def _handler(records: Dict[str, Dict[str, Any]], delay: float):
+    """
+    Build a request handler that serves the given Users and Members after the given delay
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            time.sleep(delay)
+            path, _, query = self.path.partition('?')
+            match = PATH.search(path)
+            if match is not None:
+                record = records[match['kind']].get(match['pk'])
+                if record is None:
+                    body = {'error_code': f'membership_{match["kind"]}_read_001'}
+                    status = 404
+                else:
+                    body = {'content': record}
+                    status = 200
+            elif LIST_PATH.search(path) is not None:
+                # Only the id__in search used by App Manager is supported, as repeated or comma separated values
+                params = parse_qs(query)
+                ids = [pk for value in params.get('search[id__in]', list()) for pk in value.split(',')]
+                content = [records['user'][pk] for pk in ids if pk in records['user']]
+                body = {'content': content, '_metadata': {'total_records': len(content)}}
+                status = 200
+            else:
+                self.send_error(404)
+                return
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args: Any):
+            pass
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = (
+        'Serve Users and Members from a JSON file at /user/<id>/ and /member/<id>/, and lists of Users at '
+        '/user/?search[id__in]=<ids>, the same as the Membership API. '
+        'Point the cloudcix client settings at this server to run App Manager without Membership.'
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument(
+            '--users',
+            required=True,
+            help='A JSON file mapping User ids to Users, each with a `member` containing at least its `id`',
+        )
+        parser.add_argument('--port', type=int, default=8900, help='The port to listen on')
+        parser.add_argument('--delay', type=float, default=0, help='Milliseconds to wait before each response')
+
+    def handle(self, *args: Any, **options: Any):
+        try:
+            with open(options['users']) as f:
+                users = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {options["users"]}: {e}')
+
+        records: Dict[str, Dict[str, Any]] = {'user': dict(), 'member': dict()}
+        for pk, user in users.items():
+            records['user'][str(pk)] = dict(user, id=int(pk))
+            records['member'][str(user['member']['id'])] = user['member']
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), _handler(records, options['delay'] / 1000))
+        self.stdout.write(
+            f'Serving {len(records["user"])} Users in {len(records["member"])} Members on '
+            f'http://127.0.0.1:{options["port"]}/',
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,40 @@
+"""
+Repair the Menu Item Access table from the Menu Item User Links and Menu Items it is derived from
+"""
+
+# stdlib
+from typing import Any
+# libs
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections, router
+# local
+from app_manager.models import MenuItemAccess
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the menu_item_access table to the live Menu Item User Links and Menu Items, and rebuild it in one '
+        'transaction. The table is kept in step by database triggers, so this is only needed to repair it, e.g. after '
+        'the triggers were disabled for a restore. PostgreSQL only.'
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report the rows that are missing or should not be there, and fail if there are any',
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        if connections[router.db_for_write(MenuItemAccess)].vendor != 'postgresql':
+            raise CommandError('The Menu Item Access table can only be rebuilt on PostgreSQL')
+
+        missing, extra = MenuItemAccess.objects.drift()
+        self.stdout.write(f'{missing} rows are missing and {extra} rows should not be in the table')
+        if options['check']:
+            if missing > 0 or extra > 0:
+                raise CommandError('The Menu Item Access table is out of step with the Menu Item User Links')
+            return
+
+        rows = MenuItemAccess.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the Menu Item Access table with {rows} rows'))
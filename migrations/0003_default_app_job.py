@@ -0,0 +1,39 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_manager', '0002_django5'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DefaultAppJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('deleted', models.DateTimeField(null=True)),
+                ('extra', models.JSONField(default=dict)),
+                ('action', models.CharField(max_length=10)),
+                ('last_member_id', models.IntegerField(default=0)),
+                ('processed', models.IntegerField(default=0)),
+                ('status', models.CharField(default='pending', max_length=10)),
+                ('total', models.IntegerField(null=True)),
+                ('app', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='default_app_jobs',
+                    to='app_manager.app',
+                )),
+            ],
+            options={
+                'db_table': 'default_app_job',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='defaultappjob',
+            index=models.Index(fields=['status'], name='default_app_job_status'),
+        ),
+    ]
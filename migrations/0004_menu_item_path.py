@@ -0,0 +1,54 @@
+from django.db import migrations, models
+
+
+# Set the path and depth of every existing Menu Item by walking down from the root Menu Items
+BACKFILL_SQL = '''
+WITH RECURSIVE tree AS (
+    SELECT id, '/'::text AS path, 1 AS depth
+    FROM menu_item
+    WHERE predecessor_id IS NULL
+    UNION ALL
+    SELECT mi.id, (t.path || t.id || '/')::text, t.depth + 1
+    FROM menu_item mi
+    JOIN tree t ON mi.predecessor_id = t.id
+    -- Guard against cycles in the predecessor chain
+    WHERE t.depth < 100
+)
+UPDATE menu_item
+SET path = tree.path, depth = tree.depth
+FROM tree
+WHERE menu_item.id = tree.id
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_manager', '0003_default_app_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='depth',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='path',
+            field=models.CharField(default='/', max_length=2000),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(
+                fields=['app', 'path'],
+                name='menu_item_app_path',
+                opclasses=['int8_ops', 'varchar_pattern_ops'],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['app', 'depth', 'sequence'], name='menu_item_app_depth_sequence'),
+        ),
+    ]
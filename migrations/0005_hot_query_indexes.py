@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_manager', '0004_menu_item_path'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='memberlink',
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True),
+                fields=['member_id', 'app'],
+                name='member_link_member_app_live',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True),
+                fields=['app', 'predecessor', 'sequence'],
+                name='menu_item_siblings_sequence',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True),
+                fields=['app', 'predecessor', 'name'],
+                name='menu_item_siblings_name',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(
+                condition=models.Q(deleted__isnull=True, public=True),
+                fields=['app'],
+                name='menu_item_public_app',
+            ),
+        ),
+    ]
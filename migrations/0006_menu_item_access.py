@@ -0,0 +1,130 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Keep menu_item_access in step with menu_item_user_link. The triggers run once per statement over the changed rows,
+# so the set based inserts and deletes of links cost one statement here too. The linked Menu Items are locked FOR SHARE,
+# so a concurrent soft delete of one of them either waits for the links and then removes their rows, or commits first
+# and is seen when the lock is taken
+LINK_TRIGGERS_SQL = '''
+CREATE FUNCTION menu_item_access_sync_links() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM menu_item_access access
+        USING old_rows
+        WHERE access.user_id = old_rows.user_id AND access.menu_item_id = old_rows.menu_item_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO menu_item_access (user_id, menu_item_id, app_id, administrator_only, self_managed)
+        SELECT new_rows.user_id, new_rows.menu_item_id, item.app_id, item.administrator_only, item.self_managed
+        FROM new_rows
+        JOIN menu_item item ON item.id = new_rows.menu_item_id
+        WHERE new_rows.deleted IS NULL AND item.deleted IS NULL
+        FOR SHARE OF item
+        ON CONFLICT (user_id, menu_item_id) DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER menu_item_access_link_insert
+AFTER INSERT ON menu_item_user_link
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION menu_item_access_sync_links();
+
+CREATE TRIGGER menu_item_access_link_update
+AFTER UPDATE ON menu_item_user_link
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION menu_item_access_sync_links();
+
+CREATE TRIGGER menu_item_access_link_delete
+AFTER DELETE ON menu_item_user_link
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION menu_item_access_sync_links();
+'''
+
+# Keep menu_item_access in step with the fields of menu_item that it copies. Only the Menu Items whose copied fields
+# changed are refreshed, so renumbering Menu Items does not touch the table
+ITEM_TRIGGERS_SQL = '''
+CREATE FUNCTION menu_item_access_sync_items() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM menu_item_access access
+    USING new_rows
+    JOIN old_rows ON old_rows.id = new_rows.id
+    WHERE access.menu_item_id = new_rows.id
+      AND (old_rows.deleted IS NULL, old_rows.app_id, old_rows.administrator_only, old_rows.self_managed)
+        IS DISTINCT FROM
+        (new_rows.deleted IS NULL, new_rows.app_id, new_rows.administrator_only, new_rows.self_managed);
+
+    INSERT INTO menu_item_access (user_id, menu_item_id, app_id, administrator_only, self_managed)
+    SELECT link.user_id, new_rows.id, new_rows.app_id, new_rows.administrator_only, new_rows.self_managed
+    FROM new_rows
+    JOIN old_rows ON old_rows.id = new_rows.id
+    JOIN menu_item_user_link link ON link.menu_item_id = new_rows.id
+    WHERE new_rows.deleted IS NULL AND link.deleted IS NULL
+      AND (old_rows.deleted IS NULL, old_rows.app_id, old_rows.administrator_only, old_rows.self_managed)
+        IS DISTINCT FROM
+        (new_rows.deleted IS NULL, new_rows.app_id, new_rows.administrator_only, new_rows.self_managed)
+    ON CONFLICT (user_id, menu_item_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER menu_item_access_item_update
+AFTER UPDATE ON menu_item
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION menu_item_access_sync_items();
+'''
+
+DROP_TRIGGERS_SQL = '''
+DROP TRIGGER IF EXISTS menu_item_access_item_update ON menu_item;
+DROP FUNCTION IF EXISTS menu_item_access_sync_items();
+DROP TRIGGER IF EXISTS menu_item_access_link_delete ON menu_item_user_link;
+DROP TRIGGER IF EXISTS menu_item_access_link_update ON menu_item_user_link;
+DROP TRIGGER IF EXISTS menu_item_access_link_insert ON menu_item_user_link;
+DROP FUNCTION IF EXISTS menu_item_access_sync_links();
+'''
+
+# Fill the table from the existing links
+BACKFILL_SQL = '''
+INSERT INTO menu_item_access (user_id, menu_item_id, app_id, administrator_only, self_managed)
+SELECT link.user_id, link.menu_item_id, item.app_id, item.administrator_only, item.self_managed
+FROM menu_item_user_link link
+JOIN menu_item item ON item.id = link.menu_item_id
+WHERE link.deleted IS NULL AND item.deleted IS NULL
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_manager', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuItemAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('app_id', models.BigIntegerField()),
+                ('administrator_only', models.BooleanField()),
+                ('self_managed', models.BooleanField()),
+                ('menu_item', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='access',
+                    to='app_manager.menuitem',
+                )),
+            ],
+            options={
+                'db_table': 'menu_item_access',
+                'unique_together': {('user_id', 'menu_item')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='menuitemaccess',
+            index=models.Index(fields=['user_id', 'app_id'], name='menu_item_access_user_app'),
+        ),
+        migrations.RunSQL(LINK_TRIGGERS_SQL + ITEM_TRIGGERS_SQL, reverse_sql=DROP_TRIGGERS_SQL),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
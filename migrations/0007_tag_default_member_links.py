@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+# Member Links that AppCollection.get created for default Apps before Default App Jobs existed carry no marker, so a
+# revoke job would leave them in place. They cannot be told apart from links the Members created themselves, so a live
+# link is taken to be one of them when it was created no earlier than the live Member 0 link of its App, as every Member
+# that listed its Apps after an App became a default App was given a link straight away. They are tagged with a job id
+# of 0, which no Default App Job has
+TAG_SQL = '''
+UPDATE member_link link
+SET extra = coalesce(link.extra, '{}'::jsonb) || '{"default_app_job": 0}'::jsonb
+FROM member_link default_link
+WHERE default_link.app_id = link.app_id
+  AND default_link.member_id = 0
+  AND default_link.deleted IS NULL
+  AND link.member_id <> 0
+  AND link.deleted IS NULL
+  AND link.created >= default_link.created
+  AND NOT coalesce(link.extra ? 'default_app_job', false)
+'''
+
+UNTAG_SQL = '''
+UPDATE member_link
+SET extra = extra - 'default_app_job'
+WHERE extra -> 'default_app_job' = '0'::jsonb
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_manager', '0006_menu_item_access'),
+    ]
+
+    operations = [
+        migrations.RunSQL(TAG_SQL, reverse_sql=UNTAG_SQL),
+    ]
@@ -1,6 +1,8 @@
 from .app import App
+from .default_app_job import DefaultAppJob
 from .member_link import MemberLink
 from .menu_item import MenuItem
+from .menu_item_access import MenuItemAccess
 from .menu_item_user_link import MenuItemUserLink
 
 
@@ -8,12 +10,18 @@ __all__ = [
     # App
     'App',
 
+    # Default App Job
+    'DefaultAppJob',
+
     # Member Link
     'MemberLink',
 
     # Menu Item
     'MenuItem',
 
+    # Menu Item Access
+    'MenuItemAccess',
+
     # Menu Item User Link
     'MenuItemUserLink',
 ]
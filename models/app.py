@@ -1,9 +1,12 @@
 # stdlib
 from datetime import datetime
+from typing import Any, Dict
 # libs
 from cloudcix_rest.models import BaseModel
-from django.db import models
-from django.urls import reverse
+from django.conf import settings
+from django.db import models, router, transaction
+# local
+from app_manager.utils.urls import app_uri
 
 
 __all__ = [
@@ -45,16 +48,44 @@ class App(BaseModel):
         Generates the absolute URL that corresponds to the AppResource view for this App record
         :return: A URL that corresponds to the views for this App record
         """
-        return reverse('app_resource', kwargs={'pk': self.pk})
+        return app_uri(self.pk)
 
-    def set_deleted(self):
+    def set_deleted(self, span: Any = None) -> Dict[str, int]:
         """
-        Set the deleted field for the App and its Menu Items
+        Set the deleted field for the App, its Menu Items, their User Links and its Member Links, with one UPDATE each
+        in a single transaction. Unfinished Default App Jobs for the App are cancelled too
+        :param span: The tracer span to create a child span for each stage under
+        :return: The number of records deleted at each stage
         """
+        # Imported here as these models import this one
+        from app_manager.models.default_app_job import DefaultAppJob
+        from app_manager.models.member_link import MemberLink
+        from app_manager.models.menu_item import MenuItem
+        from app_manager.models.menu_item_user_link import MenuItemUserLink
+
+        tracer = settings.TRACER
         deleted = datetime.utcnow()
+        stages = (
+            ('menu_item_user_links', MenuItemUserLink._base_manager.filter(menu_item__app_id=self.pk)),
+            ('menu_items', MenuItem._base_manager.filter(app_id=self.pk)),
+            ('member_links', MemberLink._base_manager.filter(app_id=self.pk)),
+            ('app', App._base_manager.filter(pk=self.pk)),
+        )
+        counts: Dict[str, int] = dict()
+        with transaction.atomic(using=router.db_for_write(App)):
+            with tracer.start_span('cancelling_default_app_jobs', child_of=span) as child:
+                counts['default_app_jobs'] = DefaultAppJob.objects.filter(
+                    app_id=self.pk,
+                    status__in=[DefaultAppJob.STATUS_PENDING, DefaultAppJob.STATUS_RUNNING],
+                ).update(
+                    status=DefaultAppJob.STATUS_CANCELLED,
+                    updated=deleted,
+                )
+                child.set_tag('num_objects', counts['default_app_jobs'])
+            for name, objs in stages:
+                with tracer.start_span(f'deleting_{name}', child_of=span) as child:
+                    counts[name] = objs.filter(deleted__isnull=True).update(deleted=deleted, updated=deleted)
+                    child.set_tag('num_objects', counts[name])
         self.deleted = deleted
-        self.save()
-        for m in self.menu_items.all():
-            m.deleted = deleted
-            m.save()
-        return self
+        self.updated = deleted
+        return counts
@@ -0,0 +1,40 @@
+# libs
+from cloudcix_rest.models import BaseModel
+from django.db import models
+# local
+from app_manager.models.app import App
+
+
+__all__ = [
+    'DefaultAppJob',
+]
+
+
+class DefaultAppJob(BaseModel):
+    """
+    A Default App Job provisions or revokes the Member Links of a default App, i.e. an App with a Member Link for
+    Member 0, for every Member. Members are processed in batches ordered by id so that an interrupted job can be resumed
+    """
+    ACTION_PROVISION = 'provision'
+    ACTION_REVOKE = 'revoke'
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETE = 'complete'
+    STATUS_CANCELLED = 'cancelled'
+
+    action = models.CharField(max_length=10)
+    app = models.ForeignKey(App, on_delete=models.CASCADE, related_name='default_app_jobs')
+    last_member_id = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    status = models.CharField(max_length=10, default=STATUS_PENDING)
+    total = models.IntegerField(null=True)
+
+    class Meta:
+        """
+        Metadata about the model for django to use in whatever way it sees fit
+        """
+        db_table = 'default_app_job'
+        indexes = [
+            models.Index(fields=['status'], name='default_app_job_status'),
+        ]
@@ -39,3 +39,11 @@ class MemberLink(BaseModel):
         Metadata about the model for django to use in whatever way it sees fit
         """
         db_table = 'member_link'
+        indexes = [
+            # Member Links of a Member, including Member 0, e.g. `member_id IN (0, m) AND app_id = a`
+            models.Index(
+                fields=['member_id', 'app'],
+                name='member_link_member_app_live',
+                condition=models.Q(deleted__isnull=True),
+            ),
+        ]
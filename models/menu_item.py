@@ -1,9 +1,12 @@
+# stdlib
+from typing import Dict, List, Optional
 # libs
 from cloudcix_rest.models import BaseManager, BaseModel
 from django.db import models
-from django.urls import reverse
+from django.db.models.functions import Concat, Substr
 # local
 from app_manager.models.app import App
+from app_manager.utils.urls import menu_item_uri
 
 
 __all__ = [
@@ -25,16 +28,79 @@ class MenuItemManager(BaseManager):
             'app',
         )
 
+    def ancestors(self, item: 'MenuItem') -> models.QuerySet:
+        """
+        Get the ancestors of a Menu Item from the root down, i.e. its breadcrumbs
+        :param item: The Menu Item to get the ancestors of
+        :return: A queryset of the Menu Items above the given one, ordered by depth
+        """
+        return self.get_queryset().filter(
+            id__in=item.ancestor_ids,
+        ).order_by(
+            'depth',
+        )
+
+    def descendants(self, item: 'MenuItem') -> models.QuerySet:
+        """
+        Get every Menu Item below a Menu Item, at any depth
+        :param item: The Menu Item to get the descendants of
+        :return: A queryset of the Menu Items in the subtree of the given one, ordered by depth then sequence
+        """
+        return self.get_queryset().filter(
+            app_id=item.app_id,
+            path__startswith=item.subtree_path,
+        ).order_by(
+            'depth',
+            'sequence',
+        )
+
+    def bulk_create_tree(
+            self,
+            items: Dict[str, 'MenuItem'],
+            predecessor_temp_ids: Dict[str, Optional[str]],
+    ) -> Dict[str, 'MenuItem']:
+        """
+        Insert new Menu Items, some of which are placed under others in the same batch, with one INSERT per level.
+        Items whose predecessor is another new item get its id, path and depth once it has been inserted
+        :param items: The unsaved Menu Items, by a temporary id
+        :param predecessor_temp_ids: The temporary id of the predecessor of each item, if it is one of the new items
+        :return: The inserted Menu Items, by temporary id
+        """
+        remaining = dict(items)
+        while len(remaining) > 0:
+            level = {
+                temp_id: item
+                for temp_id, item in remaining.items()
+                if predecessor_temp_ids[temp_id] not in remaining
+            }
+            for temp_id, item in level.items():
+                parent_temp_id = predecessor_temp_ids[temp_id]
+                if parent_temp_id is not None:
+                    parent = items[parent_temp_id]
+                    item.predecessor_id = parent.pk
+                    item.path = parent.subtree_path
+                    item.depth = parent.depth + 1
+            self.bulk_create(level.values())
+            for temp_id in level:
+                del remaining[temp_id]
+        return items
+
 
 class MenuItem(BaseModel):
     """
     Menu Items are used for organising, and navigating through, the structure of an App
+
+    The position of a Menu Item in the tree is also stored in `path`, which lists the ids of its ancestors from the
+    root down, e.g. `/4/17/`, and `depth`, which starts at 1 for Menu Items without a predecessor. Both are set by the
+    Menu Item controllers so that subtrees, breadcrumbs and depth ordering are single indexed queries.
     """
     action = models.CharField(max_length=150, null=True)
     administrator_only = models.BooleanField(default=False)
     app = models.ForeignKey(App, on_delete=models.CASCADE, related_name='menu_items')
+    depth = models.IntegerField(default=1)
     help = models.TextField(default='No help for this menu item', null=True)
     name = models.CharField(max_length=150)
+    path = models.CharField(max_length=2000, default='/')
     predecessor = models.ForeignKey('self', on_delete=models.DO_NOTHING, null=True, related_name='children')
     public = models.BooleanField(default=False)
     self_managed = models.BooleanField(default=True)
@@ -47,10 +113,65 @@ class MenuItem(BaseModel):
         Metadata about the model for django to use in whatever way it sees fit
         """
         db_table = 'menu_item'
+        indexes = [
+            # Prefix searches on path for subtrees
+            models.Index(
+                fields=['app', 'path'],
+                name='menu_item_app_path',
+                opclasses=['int8_ops', 'varchar_pattern_ops'],
+            ),
+            models.Index(fields=['app', 'depth', 'sequence'], name='menu_item_app_depth_sequence'),
+            # Sibling uniqueness checks in the controllers
+            models.Index(
+                fields=['app', 'predecessor', 'sequence'],
+                name='menu_item_siblings_sequence',
+                condition=models.Q(deleted__isnull=True),
+            ),
+            models.Index(
+                fields=['app', 'predecessor', 'name'],
+                name='menu_item_siblings_name',
+                condition=models.Q(deleted__isnull=True),
+            ),
+            # The Apps that contain public Menu Items
+            models.Index(
+                fields=['app'],
+                name='menu_item_public_app',
+                condition=models.Q(deleted__isnull=True, public=True),
+            ),
+        ]
+
+    @property
+    def ancestor_ids(self) -> List[int]:
+        """
+        The ids of the ancestors of this Menu Item, from the root down
+        """
+        return [int(pk) for pk in self.path.strip('/').split('/') if pk]
+
+    @property
+    def subtree_path(self) -> str:
+        """
+        The path that every descendant of this Menu Item starts with
+        """
+        return f'{self.path}{self.pk}/'
+
+    def move_descendants(self, old_subtree_path: str, old_depth: int) -> int:
+        """
+        Update the path and depth of every descendant of this Menu Item after it has been moved, in one UPDATE
+        :param old_subtree_path: The `subtree_path` of this Menu Item before it was moved
+        :param old_depth: The depth of this Menu Item before it was moved
+        :return: The number of descendants that were updated
+        """
+        return MenuItem._base_manager.filter(
+            app_id=self.app_id,
+            path__startswith=old_subtree_path,
+        ).update(
+            path=Concat(models.Value(self.subtree_path), Substr('path', len(old_subtree_path) + 1)),
+            depth=models.F('depth') + (self.depth - old_depth),
+        )
 
     def get_absolute_url(self) -> str:
         """
         Generates the absolute URL that corresponds to the MenuItemResource view for this Menu Item record
         :return: A URL that corresponds to the views for this Menu Item record
         """
-        return reverse('menu_item_resource', kwargs={'app_id': self.app_id, 'pk': self.id})
+        return menu_item_uri(self.app_id, self.id)
@@ -0,0 +1,93 @@
+# stdlib
+from typing import Tuple
+# libs
+from django.db import connections, models, router, transaction
+# local
+from app_manager.models.menu_item import MenuItem
+
+
+__all__ = [
+    'MenuItemAccess',
+]
+
+# Every live Menu Item User Link on a live Menu Item, with the fields of the Menu Item that access is decided by
+ACCESS_SQL = '''
+SELECT link.user_id, link.menu_item_id, item.app_id, item.administrator_only, item.self_managed
+FROM menu_item_user_link link
+JOIN menu_item item ON item.id = link.menu_item_id
+WHERE link.deleted IS NULL AND item.deleted IS NULL
+'''
+
+DRIFT_SQL = f'''
+WITH expected AS ({ACCESS_SQL}),
+actual AS (
+    SELECT user_id, menu_item_id, app_id, administrator_only, self_managed
+    FROM menu_item_access
+)
+SELECT
+    (SELECT count(*) FROM (SELECT * FROM expected EXCEPT SELECT * FROM actual) AS missing),
+    (SELECT count(*) FROM (SELECT * FROM actual EXCEPT SELECT * FROM expected) AS extra)
+'''
+
+REBUILD_SQL = f'''
+INSERT INTO menu_item_access (user_id, menu_item_id, app_id, administrator_only, self_managed)
+{ACCESS_SQL}
+'''
+
+
+class MenuItemAccessManager(models.Manager):
+    """
+    Manager for Menu Item Access rows, which can repair the table from the rows it is derived from
+    """
+
+    def drift(self) -> Tuple[int, int]:
+        """
+        Compare the table to the rows it is derived from, without changing it
+        :return: The number of rows that are missing from the table, and the number that should not be in it
+        """
+        with connections[router.db_for_read(self.model)].cursor() as cursor:
+            cursor.execute(DRIFT_SQL)
+            return cursor.fetchone()
+
+    def rebuild(self) -> int:
+        """
+        Replace every row of the table with rows derived from the Menu Item User Links and Menu Items, in one
+        transaction. The table is locked against writes until the transaction ends, so that triggers cannot add rows
+        that would conflict with the rebuilt ones
+        :return: The number of rows in the rebuilt table
+        """
+        db = router.db_for_write(self.model)
+        with transaction.atomic(using=db), connections[db].cursor() as cursor:
+            cursor.execute('LOCK TABLE menu_item_access IN EXCLUSIVE MODE')
+            cursor.execute('DELETE FROM menu_item_access')
+            cursor.execute(REBUILD_SQL)
+            return cursor.rowcount
+
+
+class MenuItemAccess(models.Model):
+    """
+    A Menu Item Access row says that a User has a live Menu Item User Link to a live Menu Item, and copies the fields
+    of the Menu Item that decide whether the User can see it. Rows are maintained by database triggers on the
+    menu_item_user_link and menu_item tables, so they follow every write including the set based ones, and are only
+    read by the application. The lists filter on the copied fields, so a User's visible Menu Items in an App are read
+    from one indexed lookup. Member Links are not included, as the Member of a User is only known from Membership at
+    request time, and the lists check them in the same query as a subquery
+    """
+    user_id = models.IntegerField()
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='access')
+    app_id = models.BigIntegerField()
+    administrator_only = models.BooleanField()
+    self_managed = models.BooleanField()
+
+    objects = MenuItemAccessManager()
+
+    class Meta:
+        """
+        Metadata about the model for django to use in whatever way it sees fit
+        """
+        db_table = 'menu_item_access'
+        unique_together = ('user_id', 'menu_item')
+        indexes = [
+            # The Menu Items that a User can see in an App
+            models.Index(fields=['user_id', 'app_id'], name='menu_item_access_user_app'),
+        ]
@@ -1,6 +1,8 @@
+# stdlib
+from typing import Dict, Iterable, List, Optional, Tuple
 # libs
 from cloudcix_rest.models import BaseManager, BaseModel
-from django.db import models
+from django.db import connections, models, router, transaction
 # local
 from app_manager.models.menu_item import MenuItem
 
@@ -9,6 +11,54 @@ __all__ = [
     'MenuItemUserLink',
 ]
 
+# Links of the replaced Users that are not in the wanted (user_id, menu_item_id) pairs
+REPLACE_SQL = '''
+WITH removed AS (
+    DELETE FROM menu_item_user_link link
+    WHERE link.user_id = ANY(%s::integer[])
+      AND NOT EXISTS (
+        SELECT 1
+        FROM unnest(%s::integer[], %s::bigint[]) AS wanted(user_id, menu_item_id)
+        WHERE wanted.user_id = link.user_id AND wanted.menu_item_id = link.menu_item_id
+      )
+    RETURNING link.deleted
+)
+SELECT count(*) FILTER (WHERE deleted IS NULL) FROM removed
+'''
+
+REMOVE_SQL = '''
+WITH removed AS (
+    DELETE FROM menu_item_user_link link
+    USING unnest(%s::integer[], %s::bigint[]) AS unwanted(user_id, menu_item_id)
+    WHERE link.user_id = unwanted.user_id AND link.menu_item_id = unwanted.menu_item_id
+    RETURNING link.deleted
+)
+SELECT count(*) FILTER (WHERE deleted IS NULL) FROM removed
+'''
+
+# Links that already exist are left alone, and soft deleted links are restored rather than conflicting
+ADD_SQL = '''
+WITH added AS (
+    INSERT INTO menu_item_user_link (created, updated, deleted, extra, user_id, menu_item_id)
+    SELECT now(), now(), NULL, '{}'::jsonb, requested.user_id, requested.menu_item_id
+    FROM unnest(%s::integer[], %s::bigint[]) AS requested(user_id, menu_item_id)
+    ORDER BY requested.user_id, requested.menu_item_id
+    ON CONFLICT (user_id, menu_item_id) DO UPDATE
+    SET deleted = NULL, updated = EXCLUDED.updated
+    WHERE menu_item_user_link.deleted IS NOT NULL
+    RETURNING 1
+)
+SELECT count(*) FROM added
+'''
+
+
+def _pairs(links: Dict[int, Iterable[int]]) -> Tuple[List[int], List[int]]:
+    """
+    Flatten a map of User ids to Menu Item ids into sorted, distinct parallel arrays for unnest
+    """
+    pairs = sorted({(user_id, menu_item_id) for user_id, ids in links.items() for menu_item_id in ids})
+    return [pair[0] for pair in pairs], [pair[1] for pair in pairs]
+
 
 class MenuItemUserLinkManager(BaseManager):
     """
@@ -25,6 +75,54 @@ class MenuItemUserLinkManager(BaseManager):
             'menu_item__app',
         )
 
+    def replace_for_user(self, user_id: int, menu_item_ids: Iterable[int]) -> Tuple[int, int]:
+        """
+        Set the Menu Items that a User is linked to, in one transaction without loading any rows
+        :param user_id: The id of the User
+        :param menu_item_ids: The ids of every Menu Item that the User should be linked to
+        :return: The number of links that were added and removed
+        """
+        return self.apply_links(replace={user_id: menu_item_ids})
+
+    def apply_links(
+            self,
+            replace: Optional[Dict[int, Iterable[int]]] = None,
+            add: Optional[Dict[int, Iterable[int]]] = None,
+            remove: Optional[Dict[int, Iterable[int]]] = None,
+    ) -> Tuple[int, int]:
+        """
+        Change the Menu Item User Links of many Users with one statement per kind of change, in one transaction and
+        without loading any rows. Removals are applied before additions.
+        Concurrent calls cannot raise an IntegrityError, as existing links are skipped on conflict, and rows are
+        locked in (user_id, menu_item_id) order so that they cannot deadlock on each other's inserts
+        :param replace: The exact Menu Items that each of these Users should be linked to
+        :param add: Menu Items to link each of these Users to, on top of their current links
+        :param remove: Menu Items to unlink each of these Users from
+        :return: The number of links that were added and removed
+        """
+        replace = replace or dict()
+        add = add or dict()
+        remove = remove or dict()
+        added = removed = 0
+        db = router.db_for_write(self.model)
+        with transaction.atomic(using=db), connections[db].cursor() as cursor:
+            if len(replace) > 0:
+                cursor.execute(REPLACE_SQL, [sorted(replace), *_pairs(replace)])
+                removed += cursor.fetchone()[0]
+            if len(remove) > 0:
+                cursor.execute(REMOVE_SQL, _pairs(remove))
+                removed += cursor.fetchone()[0]
+            # A User can be in both maps, so their Menu Items are merged rather than one map's replacing the other's
+            wanted = {
+                user_id: [*replace.get(user_id, ()), *add.get(user_id, ())]
+                for user_id in replace.keys() | add.keys()
+            }
+            user_ids, menu_item_ids = _pairs(wanted)
+            if len(user_ids) > 0:
+                cursor.execute(ADD_SQL, [user_ids, menu_item_ids])
+                added = cursor.fetchone()[0]
+        return added, removed
+
 
 class MenuItemUserLink(BaseModel):
     user_id = models.IntegerField()
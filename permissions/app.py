@@ -1,7 +1,8 @@
 # stdlib
-from typing import Optional
+from typing import Dict, Optional
 # libs
 from cloudcix_rest.exceptions import Http403
+from django.db.models import Exists, OuterRef
 from rest_framework.request import Request
 # local
 from app_manager.models.app import App
@@ -26,21 +27,39 @@ class Permissions:
             return Http403(error_code='app_manager_app_create_201')
         return None
 
+    @staticmethod
+    def read_annotations(request: Request) -> Dict[str, Exists]:
+        """
+        The subqueries that `read` needs, to annotate onto the query that retrieves the App so that the App and its
+        permission check are read in one query
+        """
+        if request.user.member['id'] == 1:
+            return dict()
+        return {
+            'member_linked': Exists(MemberLink.objects.filter(
+                app_id=OuterRef('pk'),
+                member_id__in=[0, request.user.member['id']],
+            )),
+        }
+
     @staticmethod
     def read(request: Request, obj: App):
         """
         The request to read an App is valid if:
         - The requesting User's Member is member 1
-        - The requesting User's Member has a Member Link for the App
+        - The requesting User's Member, or Member 0 for default Apps, has a Member Link for the App
+        The Member Link check uses the `member_linked` annotation from `read_annotations` when it is there
         """
         if request.user.member['id'] == 1:
             return None
 
-        link = MemberLink.objects.filter(
-            app=obj,
-            member_id=request.user.member['id'],
-        )
-        if not link.exists():
+        linked = getattr(obj, 'member_linked', None)
+        if linked is None:
+            linked = MemberLink.objects.filter(
+                app=obj,
+                member_id__in=[0, request.user.member['id']],
+            ).exists()
+        if not linked:
             return Http403(error_code='app_manager_app_read_201')
 
         return None
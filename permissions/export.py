@@ -0,0 +1,24 @@
+# stdlib
+from typing import Optional
+# libs
+from cloudcix_rest.exceptions import Http403
+from rest_framework.request import Request
+
+
+__all__ = [
+    'Permissions',
+]
+
+
+class Permissions:
+
+    @staticmethod
+    def read(request: Request) -> Optional[Http403]:
+        """
+        The request to export the catalog is valid if;
+        - The requesting User is the superuser
+        """
+        # The requesting User is the superuser
+        if request.user.id != 1:
+            return Http403(error_code='app_manager_export_read_201')
+        return None
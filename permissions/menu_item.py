@@ -1,12 +1,13 @@
 # stdlib
-from typing import Optional
+from typing import Dict, Optional
 # libs
 from cloudcix_rest.exceptions import Http403
+from django.db.models import Exists, OuterRef
 from rest_framework.request import Request
 # local
 from app_manager.models.member_link import MemberLink
 from app_manager.models.menu_item import MenuItem
-from app_manager.models.menu_item_user_link import MenuItemUserLink
+from app_manager.models.menu_item_access import MenuItemAccess
 
 
 __all__ = [
@@ -27,6 +28,39 @@ class Permissions:
             return Http403(error_code='app_manager_menu_item_create_201')
         return None
 
+    @staticmethod
+    def bulk(request: Request) -> Optional[Http403]:
+        """
+        The request to create and renumber Menu Items in bulk is valid if;
+        - The requesting User's Member is Member 1
+        """
+        # The requesting User's Member is Member 1
+        if request.user.member['id'] != 1:
+            return Http403(error_code='app_manager_menu_item_bulk_201')
+        return None
+
+    @staticmethod
+    def read_annotations(request: Request) -> Dict[str, Exists]:
+        """
+        The subqueries that `read` needs, to annotate onto the query that retrieves the Menu Item so that the Menu Item
+        and its permission check are read in one query
+        """
+        if request.user.member['id'] == 1:
+            return dict()
+        if request.user.administrator:
+            return {
+                'member_linked': Exists(MemberLink.objects.filter(
+                    app_id=OuterRef('app_id'),
+                    member_id__in=[0, request.user.member['id']],
+                )),
+            }
+        return {
+            'user_linked': Exists(MenuItemAccess.objects.filter(
+                user_id=request.user.id,
+                menu_item_id=OuterRef('pk'),
+            )),
+        }
+
     @staticmethod
     def read(request: Request, obj: MenuItem):
         """
@@ -34,6 +68,7 @@ class Permissions:
         - The Menu Item is public or the requesting user is from member 1
         - The requesting user is an admin whose Member has a Link for the App
         - The requesting user has a Menu Item User Link set up
+        The link checks use the annotations from `read_annotations` when they are there
         """
         # The Menu Item is public or the requesting user is from Member 1
         if not obj.public and request.user.member['id'] != 1:
@@ -41,20 +76,24 @@ class Permissions:
             # The requesting user is an admin whose Member has a Link for the App
             if request.user.administrator:
                 # Check Member Link
-                link = MemberLink.objects.filter(
-                    app=obj.app,
-                    member_id=request.user.member['id'],
-                )
-                if not link.exists():
+                linked = getattr(obj, 'member_linked', None)
+                if linked is None:
+                    linked = MemberLink.objects.filter(
+                        app=obj.app,
+                        member_id__in=[0, request.user.member['id']],
+                    ).exists()
+                if not linked:
                     return Http403(error_code='app_manager_menu_item_read_201')
             # The requesting user has a Menu Item User Link set up
             else:
                 # Check User Link
-                link = MenuItemUserLink.objects.filter(
-                    user_id=request.user.id,
-                    menu_item=obj,
-                )
-                if not link.exists():
+                linked = getattr(obj, 'user_linked', None)
+                if linked is None:
+                    linked = MenuItemAccess.objects.filter(
+                        user_id=request.user.id,
+                        menu_item=obj,
+                    ).exists()
+                if not linked:
                     return Http403(error_code='app_manager_menu_item_read_202')
 
         return None
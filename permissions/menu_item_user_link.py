@@ -1,9 +1,11 @@
 # stdlib
-from typing import Optional
+from typing import Any, Optional
 # libs
-from cloudcix.api.membership import Membership
 from cloudcix_rest.exceptions import Http403
 from rest_framework.request import Request
+# local
+from app_manager.controllers.menu_item_user_link import MenuItemUserLinkBulkController
+from app_manager.utils.membership import read_user, read_users
 
 
 __all__ = [
@@ -14,7 +16,39 @@ __all__ = [
 class Permissions:
 
     @staticmethod
-    def list(request: Request, user_id: int) -> Optional[Http403]:
+    def bulk(request: Request, span: Any = None) -> Optional[Http403]:
+        """
+        The request to update the Menu Item Links of many Users is valid if;
+        - The requesting User is an administrator
+        - The requesting User's Member is self-managed
+        - The requesting User can read every other User's details from Membership, checked in batches
+        Keys of `users` that are not User ids, and requests with too many Users, are left for the Controller to reject
+        """
+        # The requesting User is an administrator
+        if not request.user.administrator:
+            return Http403(error_code='app_manager_menu_item_user_link_bulk_201')
+
+        # The requesting User's Member is self-managed
+        if not request.user.member['self_managed']:
+            return Http403(error_code='app_manager_menu_item_user_link_bulk_202')
+
+        # The requesting User can read every other User's details from Membership
+        users = request.data.get('users') if isinstance(request.data, dict) else None
+        if isinstance(users, dict) and len(users) <= MenuItemUserLinkBulkController.MAX_USERS:
+            user_ids = set()
+            for user_id in users:
+                try:
+                    user_ids.add(int(user_id))
+                except (TypeError, ValueError):
+                    continue
+            user_ids.discard(request.user.id)
+            if any(user is None for user in read_users(request, user_ids, span).values()):
+                return Http403(error_code='app_manager_menu_item_user_link_bulk_203')
+
+        return None
+
+    @staticmethod
+    def list(request: Request, user_id: int, span: Any = None) -> Optional[Http403]:
         """
         The request to list a User's Menu Item Links is valid if;
         - The requesting User is reading their own links
@@ -25,22 +59,18 @@ class Permissions:
         if request.user.id != user_id:
 
             # The requesting User can read the other User's data from Membership
-            response = Membership.user.read(
-                token=request.user.token,
-                pk=user_id,
-            )
-            if response.status_code != 200:
+            user = read_user(request, user_id, span)
+            if user is None:
                 return Http403(error_code='app_manager_menu_item_user_link_list_201')
 
             # The requesting User is reading the Links of a User in the same Member
-            user = response.json()['content']
             if user['member']['id'] != request.user.member['id']:
                 return Http403(error_code='app_manager_menu_item_user_link_list_202')
 
         return None
 
     @staticmethod
-    def update(request: Request, user_id: int) -> Optional[Http403]:
+    def update(request: Request, user_id: int, span: Any = None) -> Optional[Http403]:
         """
         The request to list a User's Menu Item Links is valid if;
         - The requesting User is an administrator
@@ -56,12 +86,7 @@ class Permissions:
             return Http403(error_code='app_manager_menu_item_user_link_update_202')
 
         # The requesting User can read the User's details from Membership
-        if request.user.id != user_id:
-            response = Membership.user.read(
-                token=request.user.token,
-                pk=user_id,
-            )
-            if response.status_code != 200:
-                return Http403(error_code='app_manager_menu_item_user_link_update_203')
+        if request.user.id != user_id and read_user(request, user_id, span) is None:
+            return Http403(error_code='app_manager_menu_item_user_link_update_203')
 
         return None
@@ -1,6 +1,8 @@
 from .app import AppSerializer
 from .member_link import MemberLinkSerializer
 from .menu_item import MenuItemSerializer
+from .menu_tree import MenuTreeSerializer
+from .navigation import NavigationSerializer
 
 
 __all__ = [
@@ -12,4 +14,10 @@ __all__ = [
 
     # Menu Item
     'MenuItemSerializer',
+
+    # Menu Tree
+    'MenuTreeSerializer',
+
+    # Navigation
+    'NavigationSerializer',
 ]
@@ -1,5 +1,6 @@
 # stdlib
 from copy import copy
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 # libs
 import serpy
 # local
@@ -22,6 +23,9 @@ class MenuItemSerializer(serpy.Serializer):
         type: boolean
     app:
         $ref: '#/components/schemas/App'
+    app_id:
+        description: The id of the App, only sent when the Apps are side-loaded with `include=app`
+        type: integer
     created:
         description: The date that the Menu Item was created
         type: string
@@ -59,6 +63,7 @@ class MenuItemSerializer(serpy.Serializer):
     action = serpy.Field()
     administrator_only = serpy.Field()
     app = AppSerializer()
+    app_id = serpy.Field()
     created = serpy.Field(attr='created.isoformat', call=True)
     help = serpy.Field()
     id = serpy.Field()
@@ -71,10 +76,66 @@ class MenuItemSerializer(serpy.Serializer):
     updated = serpy.Field(attr='updated.isoformat', call=True)
     uri = serpy.Field(attr='get_absolute_url', call=True)
 
+    # Cache of the compiled fields for each projection, see `_project`
+    _projections: Dict[Tuple[Optional[FrozenSet[str]], bool], tuple] = dict()
+
     def __init__(self, *args, **kwargs):
         super(MenuItemSerializer, self).__init__(*args, **kwargs)
         self.context = kwargs.get('context', dict())
         self.context.setdefault('initial', True)
+        self.context.setdefault('fields', None)
+        self.context.setdefault('include_app', False)
+        self._compiled_fields = self._project(self.context['fields'], self.context['include_app'])
+
+    @classmethod
+    def field_names(cls) -> List[str]:
+        """
+        The names of the fields that can be requested with the `fields` parameter
+        """
+        return [field[0] for field in cls._compiled_fields]
+
+    @classmethod
+    def _project(cls, fields: Optional[FrozenSet[str]], include_app: bool) -> tuple:
+        """
+        Limit the compiled fields of the serializer to the requested ones, so that fields that were not requested are
+        never computed.
+        By default the nested `app` is sent and `app_id` is not, and when the Apps are side-loaded it is the opposite
+        :param fields: The names of the fields to send, or None to send the default fields
+        :param include_app: A flag stating if the Apps are being side-loaded
+        :return: The compiled fields to serialize with
+        """
+        key = (fields, include_app)
+        if key not in cls._projections:
+            if fields is None:
+                fields = frozenset(cls.field_names()) - {'app' if include_app else 'app_id'}
+            elif include_app:
+                fields = fields - {'app'}
+            cls._projections[key] = tuple(field for field in cls._compiled_fields if field[0] in fields)
+        return cls._projections[key]
+
+    @staticmethod
+    def _load_predecessors(instances: List[MenuItem]) -> Dict[int, MenuItem]:
+        """
+        Load the predecessors of every Menu Item in a list in one query.
+        Deleted predecessors are included, the same as when reading `obj.predecessor`
+        :param instances: The Menu Items being serialized
+        :return: A map of the predecessors by id
+        """
+        predecessor_ids = {obj.predecessor_id for obj in instances if obj.predecessor_id is not None}
+        if len(predecessor_ids) == 0:
+            return dict()
+        return MenuItem._base_manager.select_related('app').in_bulk(predecessor_ids)
+
+    def to_value(self, instance: Iterable[MenuItem]):
+        """
+        When serializing a list of Menu Items, load all of their predecessors up front so that serializing a page of
+        Menu Items takes a fixed number of queries. Nothing is loaded when `predecessor` was not requested
+        """
+        requested = any(field[0] == 'predecessor' for field in self._compiled_fields)
+        if self.many and self.context['initial'] and requested and 'predecessors' not in self.context:
+            instance = list(instance)
+            self.context['predecessors'] = self._load_predecessors(instance)
+        return super(MenuItemSerializer, self).to_value(instance)
 
     def get_predecessor(self, obj: MenuItem):
         """
@@ -82,8 +143,14 @@ class MenuItemSerializer(serpy.Serializer):
         :param obj: The Menu Item being serialized
         :return: The preceeding Menu Item
         """
-        if self.context['initial'] and obj.predecessor is not None:  # pragma: no cover
+        if self.context['initial'] and obj.predecessor_id is not None:
+            if 'predecessors' in self.context:
+                predecessor = self.context['predecessors'].get(obj.predecessor_id)
+            else:
+                predecessor = obj.predecessor
+            if predecessor is None:
+                return None
             context = copy(self.context)
             context['initial'] = False
-            return MenuItemSerializer(instance=obj.predecessor, context=context).data
+            return MenuItemSerializer(instance=predecessor, context=context).data
         return None
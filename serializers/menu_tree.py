@@ -0,0 +1,80 @@
+# libs
+import serpy
+# local
+from app_manager.models.menu_item import MenuItem
+
+
+__all__ = [
+    'MenuTreeSerializer',
+]
+
+
+class MenuTreeSerializer(serpy.Serializer):
+    """
+    action:
+        description: A url that a the Menu Item will redirect to
+        type: string
+    administrator_only:
+        description: A flag stating if only Admins have access to this Menu Item
+        type: boolean
+    children:
+        description: The Menu Items that have this Menu Item as their predecessor, ordered by sequence
+        type: array
+        items:
+            $ref: '#/components/schemas/MenuTree'
+    created:
+        description: The date that the Menu Item was created
+        type: string
+    depth:
+        description: The level of the Menu Item in the tree, starting at 1 for Menu Items without a predecessor
+        type: integer
+    help:
+        description: Help text describing what the Menu Item is used for
+        type: string
+    id:
+        description: The id of the Menu Item
+        type: int
+    name:
+        description: The name of the Menu Item
+        type: string
+    predecessor_id:
+        description: The id of the parent Menu Item
+        type: int
+    public:
+        description: A flag stating if every User should have access to this Menu Item
+        type: bool
+    self_managed:
+        description: A flag stating if User's must be in self-managed members in order to view the Menu Item
+        type: bool
+    sequence:
+        description: The position of this Menu Item in relation to other Menu Items in the current level
+        type: integer
+    updated:
+        description: The date that the Menu Item was last updated
+        type: string
+    uri:
+        description: The absolute URL of the Menu Item that can be used to perform `Read` and `Update` operations on it
+        type: string
+    """
+    action = serpy.Field()
+    administrator_only = serpy.Field()
+    children = serpy.MethodField()
+    created = serpy.Field(attr='created.isoformat', call=True)
+    depth = serpy.Field()
+    help = serpy.Field()
+    id = serpy.Field()
+    name = serpy.Field()
+    predecessor_id = serpy.Field()
+    public = serpy.Field()
+    self_managed = serpy.Field()
+    sequence = serpy.Field()
+    updated = serpy.Field(attr='updated.isoformat', call=True)
+    uri = serpy.Field(attr='get_absolute_url', call=True)
+
+    def get_children(self, obj: MenuItem):
+        """
+        Serialize the children of the Menu Item, as nested by `app_manager.utils.menu_tree.build_tree`
+        :param obj: The Menu Item being serialized
+        :return: The serialized children of the Menu Item
+        """
+        return MenuTreeSerializer(instance=obj.tree_children, many=True).data
@@ -0,0 +1,69 @@
+# libs
+import serpy
+# local
+from .app import AppSerializer
+from .menu_tree import MenuTreeSerializer
+from app_manager.models.app import App
+
+
+__all__ = [
+    'NavigationSerializer',
+]
+
+
+class NavigationSerializer(AppSerializer):
+    """
+    action:
+        description: What the App does when used in a UI
+        type: string
+    created:
+        description: The date that the record was created
+        type: string
+    description:
+        description: A short explanation of the App
+        type: string
+    extra:
+        description: Any other miscellaneous about the App
+        type: json
+    icon_url:
+        description: The url where the icon for the app can be found
+        type: string
+    id:
+        description: The unique id of the App record
+        type: integer
+    in_app_store:
+        description: A flag stating if this App can be installed through the CloudCIX app store
+        type: boolean
+    maintenance:
+        description: A flag stating if this App is unavailable due to maintenance
+        type: boolean
+    menu_tree:
+        description: The root Menu Items of the App that the User can see, each with their children nested in them
+        type: array
+        items:
+            $ref: '#/components/schemas/MenuTree'
+    name:
+        description: The name of the App
+        type: string
+    online:
+        description: A flag stating if this App is accessible
+        type: boolean
+    private:
+        description: A flag stating if this App is private and only available to select Members
+        type: boolean
+    updated:
+        description: The date that the record was last updated
+        type: string
+    uri:
+        description: The absolute URL of the App that can be used to perform `Read` and `Update` operations on it
+        type: string
+    """
+    menu_tree = serpy.MethodField()
+
+    def get_menu_tree(self, obj: App):
+        """
+        Serialize the Menu Item tree of the App, as built by `app_manager.utils.navigation.build_navigation`
+        :param obj: The App being serialized
+        :return: The serialized root Menu Items of the App
+        """
+        return MenuTreeSerializer(instance=obj.menu_tree, many=True).data
@@ -36,6 +36,21 @@ DATABASES = {
     },
 }
 
+# Read replicas of the app_manager database, as a comma separated list of host[:weight], e.g. `replica1:2,replica2`.
+# Reads are spread over the replicas by weight, and go to the primary for requests that write and for
+# APP_MANAGER_PRIMARY_PIN_SECONDS after a caller writes. A background thread probes the replicas every
+# APP_MANAGER_REPLICA_CHECK_SECONDS, and replicas that cannot be connected to are ejected for
+# APP_MANAGER_REPLICA_EJECT_SECONDS. In tests the replicas mirror the primary, so two local databases can stand in.
+APP_MANAGER_READ_REPLICAS = dict()
+for index, replica in enumerate(filter(None, os.getenv('APP_MANAGER_READ_REPLICA_HOSTS', '').split(','))):
+    host, _, weight = replica.strip().partition(':')
+    alias = f'app_manager_replica_{index}'
+    DATABASES[alias] = dict(DATABASES['app_manager'], HOST=host, TEST={'MIRROR': 'app_manager'})
+    APP_MANAGER_READ_REPLICAS[alias] = int(weight or 1)
+APP_MANAGER_PRIMARY_PIN_SECONDS = int(os.getenv('APP_MANAGER_PRIMARY_PIN_SECONDS', '5'))
+APP_MANAGER_REPLICA_CHECK_SECONDS = int(os.getenv('APP_MANAGER_REPLICA_CHECK_SECONDS', '10'))
+APP_MANAGER_REPLICA_EJECT_SECONDS = int(os.getenv('APP_MANAGER_REPLICA_EJECT_SECONDS', '30'))
+
 DATABASE_ROUTERS = [
     'app_manager.db_router.AppManagerRouter',
 ]
@@ -51,6 +66,36 @@ USE_L10N = False
 ORG = ORGANIZATION_URL.split('.')[0]
 APPLICATION_NAME = os.getenv('APPLICATION_NAME', f'{POD_NAME}_{ORG}_app_manager')
 
+# Caching
+# The cache alias used by app_manager, and the number of seconds that a User's visible App ids are cached for
+APP_MANAGER_CACHE = os.getenv('APP_MANAGER_CACHE', 'default')
+APP_MANAGER_ENTITLEMENT_CACHE_TTL = int(os.getenv('APP_MANAGER_ENTITLEMENT_CACHE_TTL', '60'))
+# The number of seconds that a User's serialized navigation is cached for
+APP_MANAGER_NAVIGATION_CACHE_TTL = int(os.getenv('APP_MANAGER_NAVIGATION_CACHE_TTL', '60'))
+
+# Default Apps
+# Default App Jobs run in a background thread of the worker that created them unless disabled, in which case the
+# `default_app_jobs` management command must be run to process them. It also resumes interrupted jobs.
+APP_MANAGER_DEFAULT_APP_JOBS_IN_PROCESS = os.getenv('APP_MANAGER_DEFAULT_APP_JOBS_IN_PROCESS', 'true') == 'true'
+APP_MANAGER_DEFAULT_APP_JOB_BATCH_SIZE = int(os.getenv('APP_MANAGER_DEFAULT_APP_JOB_BATCH_SIZE', '500'))
+
+# Membership
+# Lookups of Users and Members in the Membership API are cached per caller token for the given number of seconds, with
+# a shorter time for failed lookups
+APP_MANAGER_MEMBERSHIP_CACHE_SIZE = int(os.getenv('APP_MANAGER_MEMBERSHIP_CACHE_SIZE', '10000'))
+APP_MANAGER_MEMBERSHIP_CACHE_TTL = int(os.getenv('APP_MANAGER_MEMBERSHIP_CACHE_TTL', '60'))
+APP_MANAGER_MEMBERSHIP_CACHE_NEGATIVE_TTL = int(os.getenv('APP_MANAGER_MEMBERSHIP_CACHE_NEGATIVE_TTL', '5'))
+# Threads per process that run Membership lookups started early, so that they overlap the request's database queries
+APP_MANAGER_MEMBERSHIP_WORKERS = int(os.getenv('APP_MANAGER_MEMBERSHIP_WORKERS', '8'))
+
+# Query tracing
+# Tracer spans are tagged with the number, total time and slowest of the SQL queries run inside them. When a slow query
+# threshold in milliseconds is set, the EXPLAIN output of the slowest SELECT over it is tagged too.
+APP_MANAGER_QUERY_TRACING = os.getenv('APP_MANAGER_QUERY_TRACING', 'true') == 'true'
+APP_MANAGER_SLOW_QUERY_MS = os.getenv('APP_MANAGER_SLOW_QUERY_MS')
+if APP_MANAGER_SLOW_QUERY_MS is not None:
+    APP_MANAGER_SLOW_QUERY_MS = float(APP_MANAGER_SLOW_QUERY_MS)
+
 CLOUDCIX_INFLUX_TAGS = {
     'service_name': APPLICATION_NAME,
 }
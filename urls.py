@@ -19,6 +19,13 @@ urlpatterns: List[path] = [
         name='app_resource',
     ),
 
+    # Export
+    path(
+        'export/',
+        views.ExportResource.as_view(),
+        name='export_resource',
+    ),
+
     # Member Link
     path(
         'app/<int:app_id>/member/',
@@ -32,16 +39,40 @@ urlpatterns: List[path] = [
         views.MenuItemCollection.as_view(),
         name='menu_item_collection',
     ),
+    path(
+        'app/<int:app_id>/menu_item/bulk/',
+        views.MenuItemBulkCollection.as_view(),
+        name='menu_item_bulk_collection',
+    ),
     path(
         'app/<int:app_id>/menu_item/<int:pk>/',
         views.MenuItemResource.as_view(),
         name='menu_item_resource',
     ),
 
+    # Menu Tree
+    path(
+        'app/<int:app_id>/menu_tree/',
+        views.MenuTreeResource.as_view(),
+        name='menu_tree_resource',
+    ),
+
     # Menu Item User Link
+    path(
+        'menu_item/user/',
+        views.MenuItemUserLinkBulkCollection.as_view(),
+        name='menu_item_user_link_bulk_collection',
+    ),
     path(
         'menu_item/user/<int:user_id>/',
         views.MenuItemUserLinkCollection.as_view(),
         name='menu_item_user_link_collection',
     ),
+
+    # Navigation
+    path(
+        'navigation/',
+        views.NavigationResource.as_view(),
+        name='navigation_resource',
+    ),
 ]
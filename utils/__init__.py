@@ -0,0 +1,5 @@
+"""
+Helpers shared by the views, controllers and permissions of the App Manager application
+
+The modules in this package are imported directly rather than re-exported here, as some of them depend on the models.
+"""
@@ -0,0 +1,466 @@
+"""
+Importing a catalog bundle through staging tables and PostgreSQL COPY
+
+A bundle is either an NDJSON file in the format written by the export, optionally gzipped, or a directory containing
+`app.csv`, `menu_item.csv` and `member_link.csv` files (or `.csv.gz`) with a header row of the same field names. Empty
+CSV cells are read as NULL. The `id`, `app_id` and `predecessor_id` fields are ids within the bundle, and every
+imported record is given a new id.
+
+Each kind of record is streamed into a temporary staging table with COPY, checked with set based queries, and merged
+into the real tables with one INSERT ... SELECT per table, all in one transaction. Nothing is imported if any check
+fails.
+"""
+
+# stdlib
+import csv
+import gzip
+import io
+import json
+import os
+from typing import Any, Dict, IO, Iterable, Iterator, List, Tuple
+# libs
+from django.db import connections, DataError, router, transaction
+# local
+from app_manager.models import App, DefaultAppJob
+from app_manager.utils.default_apps import DEFAULT_MEMBER_ID, enqueue
+from app_manager.utils.entitlements import invalidate_all
+
+
+__all__ = [
+    'BundleError',
+    'import_bundle',
+]
+
+# The fields read for each kind of record, which are also the columns of its staging table
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'app': (
+        'id',
+        'action',
+        'description',
+        'icon_url',
+        'in_app_store',
+        'maintenance',
+        'name',
+        'online',
+        'private',
+    ),
+    'menu_item': (
+        'id',
+        'action',
+        'administrator_only',
+        'app_id',
+        'help',
+        'name',
+        'predecessor_id',
+        'public',
+        'self_managed',
+        'sequence',
+    ),
+    'member_link': (
+        'id',
+        'app_id',
+        'member_id',
+    ),
+}
+
+# Rows written to COPY at a time
+COPY_BATCH = 1000
+# The most problems reported by each check
+MAX_PROBLEMS = 20
+
+STAGING_SQL = '''
+CREATE TEMPORARY TABLE import_app (
+    id bigint,
+    action text,
+    description text,
+    icon_url text,
+    in_app_store boolean,
+    maintenance boolean,
+    name text,
+    online boolean,
+    private boolean,
+    new_id bigint
+) ON COMMIT DROP;
+
+CREATE TEMPORARY TABLE import_menu_item (
+    id bigint,
+    action text,
+    administrator_only boolean,
+    app_id bigint,
+    help text,
+    name text,
+    predecessor_id bigint,
+    public boolean,
+    self_managed boolean,
+    sequence integer,
+    new_id bigint,
+    path text,
+    depth integer
+) ON COMMIT DROP;
+
+CREATE TEMPORARY TABLE import_member_link (
+    id bigint,
+    app_id bigint,
+    member_id integer
+) ON COMMIT DROP;
+'''
+
+TRIM_SQL = '''
+UPDATE import_app SET name = trim(name);
+UPDATE import_menu_item SET name = trim(name);
+'''
+
+# Apps that already exist are dropped from the bundle with their Menu Items and Member Links
+SKIP_EXISTING_SQL = '''
+WITH skipped AS (
+    DELETE FROM import_app
+    USING app
+    WHERE lower(app.name) = lower(import_app.name) AND app.deleted IS NULL
+    RETURNING import_app.id
+),
+skipped_items AS (
+    DELETE FROM import_menu_item WHERE app_id IN (SELECT id FROM skipped)
+),
+skipped_links AS (
+    DELETE FROM import_member_link WHERE app_id IN (SELECT id FROM skipped)
+)
+SELECT count(*) FROM skipped
+'''
+
+SKIP_MEMBER_LINKS_SQL = '''
+WITH skipped AS (
+    DELETE FROM import_member_link WHERE member_id IS DISTINCT FROM %s RETURNING 1
+)
+SELECT count(*) FROM skipped
+'''
+
+# Each check returns a description of every problem it finds
+CHECKS = (
+    # Apps
+    "SELECT 'Every App must have an id' FROM import_app WHERE id IS NULL",
+    "SELECT format('App %s is in the bundle %s times', id, count(*)) FROM import_app GROUP BY id HAVING count(*) > 1",
+    "SELECT format('App %s must have a name', id) FROM import_app WHERE coalesce(name, '') = ''",
+    "SELECT format('App %s has a name longer than 50 characters', id) FROM import_app WHERE length(name) > 50",
+    '''
+    SELECT format('The App name "%s" is used %s times', min(name), count(*))
+    FROM import_app
+    GROUP BY lower(name)
+    HAVING count(*) > 1
+    ''',
+    '''
+    SELECT format('App %s is named "%s", which is the name of an existing App', import_app.id, import_app.name)
+    FROM import_app
+    JOIN app ON lower(app.name) = lower(import_app.name) AND app.deleted IS NULL
+    ''',
+
+    # Menu Items
+    "SELECT 'Every Menu Item must have an id' FROM import_menu_item WHERE id IS NULL",
+    '''
+    SELECT format('Menu Item %s is in the bundle %s times', id, count(*))
+    FROM import_menu_item
+    GROUP BY id
+    HAVING count(*) > 1
+    ''',
+    "SELECT format('Menu Item %s must have a name', id) FROM import_menu_item WHERE coalesce(name, '') = ''",
+    '''
+    SELECT format('Menu Item %s has a name longer than 150 characters', id)
+    FROM import_menu_item
+    WHERE length(name) > 150
+    ''',
+    "SELECT format('Menu Item %s has an action longer than 150 characters', id) FROM import_menu_item "
+    "WHERE length(action) > 150",
+    "SELECT format('Menu Item %s must have a sequence', id) FROM import_menu_item WHERE sequence IS NULL",
+    '''
+    SELECT format('Menu Item %s belongs to App %s, which is not in the bundle', item.id, item.app_id)
+    FROM import_menu_item item
+    LEFT JOIN import_app app ON app.id = item.app_id
+    WHERE app.id IS NULL
+    ''',
+    '''
+    SELECT format('Menu Item %s is under Menu Item %s, which is not in the same App in the bundle', item.id,
+        item.predecessor_id)
+    FROM import_menu_item item
+    LEFT JOIN import_menu_item predecessor ON predecessor.id = item.predecessor_id AND predecessor.app_id = item.app_id
+    WHERE item.predecessor_id IS NOT NULL AND predecessor.id IS NULL
+    ''',
+    '''
+    SELECT format('The Menu Item name "%s" is used %s times under the same predecessor in App %s', name, count(*),
+        app_id)
+    FROM import_menu_item
+    GROUP BY app_id, predecessor_id, name
+    HAVING count(*) > 1
+    ''',
+    '''
+    SELECT format('The Menu Item sequence %s is used %s times under the same predecessor in App %s', sequence,
+        count(*), app_id)
+    FROM import_menu_item
+    GROUP BY app_id, predecessor_id, sequence
+    HAVING count(*) > 1
+    ''',
+
+    # Member Links
+    "SELECT format('Member Link %s must have a member_id', id) FROM import_member_link WHERE member_id IS NULL",
+    '''
+    SELECT format('Member Link %s belongs to App %s, which is not in the bundle', link.id, link.app_id)
+    FROM import_member_link link
+    LEFT JOIN import_app app ON app.id = link.app_id
+    WHERE app.id IS NULL
+    ''',
+    '''
+    SELECT format('Member %s is linked to App %s %s times', member_id, app_id, count(*))
+    FROM import_member_link
+    GROUP BY app_id, member_id
+    HAVING count(*) > 1
+    ''',
+)
+
+# Give every new record its id up front, so the Menu Items can refer to their App and predecessor by it
+ALLOCATE_IDS_SQL = '''
+UPDATE import_app SET new_id = nextval(pg_get_serial_sequence('app', 'id'));
+UPDATE import_menu_item SET new_id = nextval(pg_get_serial_sequence('menu_item', 'id'));
+'''
+
+# Set the path and depth of every Menu Item by walking down from the root Menu Items of each App
+PATH_SQL = '''
+WITH RECURSIVE tree AS (
+    SELECT id, new_id, '/'::text AS path, 1 AS depth
+    FROM import_menu_item
+    WHERE predecessor_id IS NULL
+    UNION ALL
+    SELECT item.id, item.new_id, tree.path || tree.new_id || '/', tree.depth + 1
+    FROM import_menu_item item
+    JOIN tree ON item.predecessor_id = tree.id
+    -- Guard against cycles in the predecessor chain
+    WHERE tree.depth < 100
+)
+UPDATE import_menu_item
+SET path = tree.path, depth = tree.depth
+FROM tree
+WHERE import_menu_item.id = tree.id
+'''
+
+# Menu Items that are not reached from a root Menu Item are in a cycle
+CYCLE_CHECK = "SELECT format('Menu Item %s is in a cycle of predecessors', id) FROM import_menu_item WHERE path IS NULL"
+
+# Missing fields get the same defaults as when the records are created through the API
+MERGE_SQL = '''
+INSERT INTO app (
+    id, created, updated, deleted, extra, action, description, icon_url, in_app_store, maintenance, name, online,
+    private
+)
+SELECT
+    new_id, now(), now(), NULL, '{}'::jsonb, action, description, icon_url, coalesce(in_app_store, false),
+    coalesce(maintenance, false), name, coalesce(online, false), coalesce(private, false)
+FROM import_app
+ORDER BY new_id;
+
+INSERT INTO menu_item (
+    id, created, updated, deleted, extra, action, administrator_only, app_id, depth, help, name, path, predecessor_id,
+    public, self_managed, sequence
+)
+SELECT
+    item.new_id, now(), now(), NULL, '{}'::jsonb, coalesce(item.action, ''), coalesce(item.administrator_only, false),
+    app.new_id, item.depth, coalesce(item.help, ''), item.name, item.path, predecessor.new_id,
+    coalesce(item.public, true), coalesce(item.self_managed, true), item.sequence
+FROM import_menu_item item
+JOIN import_app app ON app.id = item.app_id
+LEFT JOIN import_menu_item predecessor ON predecessor.id = item.predecessor_id
+ORDER BY item.new_id;
+
+INSERT INTO member_link (created, updated, deleted, extra, app_id, member_id)
+SELECT now(), now(), NULL, '{}'::jsonb, app.new_id, link.member_id
+FROM import_member_link link
+JOIN import_app app ON app.id = link.app_id
+ORDER BY app.new_id, link.member_id;
+'''
+
+DEFAULT_APPS_SQL = '''
+SELECT DISTINCT app.new_id
+FROM import_member_link link
+JOIN import_app app ON app.id = link.app_id
+WHERE link.member_id = %s
+'''
+
+
+class BundleError(Exception):
+    """
+    Raised when a bundle cannot be imported, with a description of every problem found
+    """
+
+    def __init__(self, problems: List[str]):
+        super().__init__(f'The bundle cannot be imported: {len(problems)} problems were found')
+        self.problems = problems
+
+
+class _ChunkFile:
+    """
+    A read only file over an iterator of strings, for psycopg2's copy_expert
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buffer = ''
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    readline = read
+
+
+def _open(path: str) -> IO[str]:
+    """
+    Open a bundle file as text, decompressing it if it is gzipped
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', newline='')
+    return open(path, newline='')
+
+
+def _records(bundle: str, kind: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of one kind from a bundle, one at a time
+    """
+    if os.path.isdir(bundle):
+        for name in (f'{kind}.csv', f'{kind}.csv.gz'):
+            path = os.path.join(bundle, name)
+            if os.path.exists(path):
+                with _open(path) as f:
+                    for row in csv.DictReader(f):
+                        yield {field: (value if value != '' else None) for field, value in row.items()}
+                return
+        return
+
+    with _open(bundle) as f:
+        for number, line in enumerate(f, 1):
+            if line.strip() == '':
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise BundleError([f'Line {number} is not valid JSON'])
+            if not isinstance(record, dict):
+                raise BundleError([f'Line {number} is not a JSON object'])
+            if record.get('type') == kind:
+                yield record
+
+
+def _csv(columns: Tuple[str, ...], records: Iterable[Dict[str, Any]], counts: Dict[str, int], kind: str):
+    """
+    Encode records as CSV for COPY, with NULL written as \\N so that it differs from an empty string
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for index, record in enumerate(records, 1):
+        writer.writerow(['\\N' if record.get(column) is None else record[column] for column in columns])
+        counts[kind] = index
+        if index % COPY_BATCH == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _copy(db: str, cursor: Any, kind: str, records: Iterable[Dict[str, Any]], counts: Dict[str, int]):
+    """
+    Stream records into their staging table with COPY, using whichever of psycopg 3 or psycopg2 is installed
+    """
+    columns = COLUMNS[kind]
+    sql = f"COPY import_{kind} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    chunks = _csv(columns, records, counts, kind)
+    raw = cursor.cursor
+    # COPY is run on the driver's cursor, so its errors are converted to Django's here
+    with connections[db].wrap_database_errors:
+        if hasattr(raw, 'copy'):
+            with raw.copy(sql) as copy:
+                for chunk in chunks:
+                    copy.write(chunk)
+        else:
+            raw.copy_expert(sql, _ChunkFile(chunks))
+
+
+def _problems(cursor: Any, checks: Iterable[str]) -> List[str]:
+    """
+    Run checks against the staging tables, returning every problem they find
+    """
+    problems: List[str] = list()
+    for check in checks:
+        cursor.execute(f'SELECT * FROM ({check}) AS problems LIMIT {MAX_PROBLEMS}')
+        problems.extend(row[0] for row in cursor.fetchall())
+    return problems
+
+
+def import_bundle(bundle: str, skip_existing: bool = False, all_member_links: bool = False) -> Dict[str, int]:
+    """
+    Import the Apps, Menu Item trees and Member Links of a bundle in one transaction
+    :param bundle: The path of an NDJSON file, or of a directory of CSV files
+    :param skip_existing: Leave out Apps whose name is already used, with their Menu Items and Member Links, instead of
+                          failing
+    :param all_member_links: Import the Member Links of every Member, instead of only the default Member Links
+    :return: The number of records of each kind that were read, imported and skipped
+    :raises BundleError: If the bundle cannot be imported, in which case nothing is imported
+    """
+    db = router.db_for_write(App)
+    if connections[db].vendor != 'postgresql':
+        raise BundleError(['Bundles can only be imported into PostgreSQL'])
+
+    counts: Dict[str, int] = {'app': 0, 'menu_item': 0, 'member_link': 0}
+    with transaction.atomic(using=db), connections[db].cursor() as cursor:
+        cursor.execute(STAGING_SQL)
+        for kind in COLUMNS:
+            try:
+                _copy(db, cursor, kind, _records(bundle, kind), counts)
+            except DataError as e:
+                raise BundleError([f'The {kind} records could not be read: {e}'])
+        cursor.execute(TRIM_SQL)
+
+        skipped_apps = 0
+        if skip_existing:
+            cursor.execute(SKIP_EXISTING_SQL)
+            skipped_apps = cursor.fetchone()[0]
+        skipped_member_links = 0
+        if not all_member_links:
+            cursor.execute(SKIP_MEMBER_LINKS_SQL, [DEFAULT_MEMBER_ID])
+            skipped_member_links = cursor.fetchone()[0]
+
+        problems = _problems(cursor, CHECKS)
+        if len(problems) > 0:
+            raise BundleError(problems)
+
+        cursor.execute(ALLOCATE_IDS_SQL)
+        cursor.execute(PATH_SQL)
+        problems = _problems(cursor, [CYCLE_CHECK])
+        if len(problems) > 0:
+            raise BundleError(problems)
+
+        cursor.execute(MERGE_SQL)
+        cursor.execute('SELECT count(*) FROM import_app')
+        apps = cursor.fetchone()[0]
+        cursor.execute('SELECT count(*) FROM import_menu_item')
+        menu_items = cursor.fetchone()[0]
+        cursor.execute('SELECT count(*) FROM import_member_link')
+        member_links = cursor.fetchone()[0]
+
+        # Default Apps are linked to every Member by a Default App Job, as when a default Member Link is created
+        cursor.execute(DEFAULT_APPS_SQL, [DEFAULT_MEMBER_ID])
+        for (app_id,) in cursor.fetchall():
+            enqueue(app_id, DefaultAppJob.ACTION_PROVISION)
+        transaction.on_commit(invalidate_all, using=db)
+
+    return {
+        'apps_read': counts['app'],
+        'apps_imported': apps,
+        'apps_skipped': skipped_apps,
+        'member_links_read': counts['member_link'],
+        'member_links_imported': member_links,
+        'member_links_skipped': skipped_member_links,
+        'menu_items_read': counts['menu_item'],
+        'menu_items_imported': menu_items,
+    }
@@ -0,0 +1,205 @@
+"""
+Provisioning and revoking the Member Links of default Apps for every Member
+
+A Member Link with `member_id=0` marks an App as a default App that every Member is linked to. The read path treats
+these links as belonging to every Member, and a Default App Job materialises (or revokes) the per Member links in the
+background, in batches of Members ordered by id so that the job can be resumed from `last_member_id`.
+
+App Manager only knows a Member once it has had a Member Link, so a job does not create links for Members that have
+never had one. Those Members still see the default Apps, as the read path treats Member 0 links as their own, but
+they have no Member Link of their own to a default App until one is created for them.
+"""
+
+# stdlib
+import logging
+import threading
+from datetime import datetime
+from typing import List, Optional
+# libs
+from django.conf import settings
+from django.db import connections, router, transaction
+# local
+from app_manager.models import DefaultAppJob, MemberLink
+from app_manager.utils.entitlements import invalidate_all
+
+
+__all__ = [
+    'DEFAULT_MEMBER_ID',
+    'enqueue',
+    'resume',
+    'run',
+]
+
+DEFAULT_MEMBER_ID = 0
+
+# Key set in the `extra` field of Member Links created by a Default App Job, so that only those links are revoked.
+# Links created for default Apps before the jobs existed are tagged with a job id of 0 by migration 0007
+JOB_KEY = 'default_app_job'
+
+logger = logging.getLogger('app_manager.default_apps')
+
+
+def _db() -> str:
+    """
+    The database that Default App Jobs and Member Links are written to
+    """
+    return router.db_for_write(DefaultAppJob)
+
+
+def enqueue(app_id: int, action: str) -> DefaultAppJob:
+    """
+    Create a Default App Job for an App, cancelling any unfinished job for the same App as the new job supersedes it.
+    The job is started in a background thread once the current transaction commits, unless that has been disabled with
+    the APP_MANAGER_DEFAULT_APP_JOBS_IN_PROCESS setting, in which case the `default_app_jobs` command must be run
+    :param app_id: The id of the App whose default Member Link was created or deleted
+    :param action: Either DefaultAppJob.ACTION_PROVISION or DefaultAppJob.ACTION_REVOKE
+    :return: The created job
+    """
+    db = _db()
+    with transaction.atomic(using=db):
+        DefaultAppJob.objects.filter(
+            app_id=app_id,
+            status__in=[DefaultAppJob.STATUS_PENDING, DefaultAppJob.STATUS_RUNNING],
+        ).update(
+            status=DefaultAppJob.STATUS_CANCELLED,
+            updated=datetime.utcnow(),
+        )
+        job = DefaultAppJob.objects.create(app_id=app_id, action=action)
+
+    if getattr(settings, 'APP_MANAGER_DEFAULT_APP_JOBS_IN_PROCESS', True):
+        transaction.on_commit(lambda: _start(job.pk), using=db)
+    return job
+
+
+def _start(job_id: int):
+    """
+    Run a job in a daemon thread, closing the thread's database connections when it finishes
+    """
+    def target():
+        try:
+            run(job_id)
+        except Exception:  # pragma: no cover
+            # The job keeps its progress and can be resumed with the `default_app_jobs` command
+            logger.exception(f'Default App Job #{job_id} failed')
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=target, name=f'default_app_job_{job_id}', daemon=True).start()
+
+
+def _member_ids():
+    """
+    All of the Members known to App Manager, i.e. every Member that has ever had a Member Link, ordered by id.
+    Members are not read from Membership, so Members that have never had a Member Link are not included
+    """
+    return MemberLink._base_manager.exclude(
+        member_id=DEFAULT_MEMBER_ID,
+    ).order_by(
+        'member_id',
+    ).values_list(
+        'member_id',
+        flat=True,
+    ).distinct()
+
+
+def _provision(job: DefaultAppJob, member_ids: List[int]):
+    """
+    Create Member Links to the job's App for the given Members, where they do not have one already
+    """
+    existing = set(MemberLink.objects.filter(
+        app_id=job.app_id,
+        member_id__in=member_ids,
+    ).values_list(
+        'member_id',
+        flat=True,
+    ))
+    MemberLink.objects.bulk_create([
+        MemberLink(app_id=job.app_id, member_id=member_id, extra={JOB_KEY: job.pk})
+        for member_id in member_ids
+        if member_id not in existing
+    ])
+
+
+def _revoke(job: DefaultAppJob, member_ids: List[int]):
+    """
+    Delete the Member Links to the job's App that were created by a Default App Job for the given Members.
+    Member Links that the Members created themselves are left in place
+    """
+    deleted = datetime.utcnow()
+    MemberLink.objects.filter(
+        app_id=job.app_id,
+        member_id__in=member_ids,
+        extra__has_key=JOB_KEY,
+    ).update(
+        deleted=deleted,
+        updated=deleted,
+    )
+
+
+def run(job_id: int, batch_size: Optional[int] = None) -> Optional[DefaultAppJob]:
+    """
+    Process a Default App Job one batch of Members at a time, until it is complete.
+    Each batch runs in its own transaction that locks the job row, so progress is saved after every batch and two
+    workers never process the same job at the same time
+    :param job_id: The id of the job to run
+    :param batch_size: The number of Members to process in each batch
+    :return: The completed job, or None if it was finished, cancelled or is being run elsewhere
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'APP_MANAGER_DEFAULT_APP_JOB_BATCH_SIZE', 500)
+
+    while True:
+        with transaction.atomic(using=_db()):
+            try:
+                job = DefaultAppJob.objects.select_for_update(skip_locked=True).get(
+                    pk=job_id,
+                    status__in=[DefaultAppJob.STATUS_PENDING, DefaultAppJob.STATUS_RUNNING],
+                )
+            except DefaultAppJob.DoesNotExist:
+                # Finished, cancelled by a newer job, or locked by another worker
+                return None
+
+            if job.status == DefaultAppJob.STATUS_PENDING:
+                job.status = DefaultAppJob.STATUS_RUNNING
+                job.total = _member_ids().count()
+
+            member_ids = list(_member_ids().filter(member_id__gt=job.last_member_id)[:batch_size])
+            if len(member_ids) > 0:
+                if job.action == DefaultAppJob.ACTION_PROVISION:
+                    _provision(job, member_ids)
+                else:
+                    _revoke(job, member_ids)
+                job.last_member_id = member_ids[-1]
+                job.processed += len(member_ids)
+
+            if len(member_ids) < batch_size:
+                job.status = DefaultAppJob.STATUS_COMPLETE
+            job.save()
+
+        if job.action == DefaultAppJob.ACTION_REVOKE and len(member_ids) > 0:
+            invalidate_all()
+        if job.status == DefaultAppJob.STATUS_COMPLETE:
+            logger.info(f'Default App Job #{job.pk} for App #{job.app_id} processed {job.processed} Members')
+            return job
+
+
+def resume(batch_size: Optional[int] = None) -> List[DefaultAppJob]:
+    """
+    Run every unfinished Default App Job in the order they were created
+    :param batch_size: The number of Members to process in each batch
+    :return: The jobs that were run to completion
+    """
+    job_ids = DefaultAppJob.objects.filter(
+        status__in=[DefaultAppJob.STATUS_PENDING, DefaultAppJob.STATUS_RUNNING],
+    ).order_by(
+        'id',
+    ).values_list(
+        'id',
+        flat=True,
+    )
+    completed = list()
+    for job_id in list(job_ids):
+        job = run(job_id, batch_size)
+        if job is not None:
+            completed.append(job)
+    return completed
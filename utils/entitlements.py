@@ -0,0 +1,200 @@
+"""
+Cache of the App ids that a User is entitled to see in the App list
+
+The set of visible Apps only depends on the User's Member Links, Menu Item User Links and the public Menu Items, all of
+which change far less often than the App list is read. The sets are cached per (member_id, user_id, administrator) and
+are invalidated through generation counters that are bumped whenever one of those inputs changes.
+"""
+
+# stdlib
+from typing import Any, Dict, Iterable, Optional, Set
+# libs
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import router
+from rest_framework.request import Request
+# local
+from app_manager.models import MemberLink, MenuItem, MenuItemAccess
+
+
+__all__ = [
+    'entitlement_key',
+    'get_entitlement',
+    'invalidate_all',
+    'invalidate_member',
+    'invalidate_user',
+    'invalidate_users',
+    'stats',
+]
+
+GLOBAL_GENERATION_KEY = 'app_manager:entitlement:generation'
+MEMBER_GENERATION_KEY = 'app_manager:entitlement:generation:member:{}'
+USER_GENERATION_KEY = 'app_manager:entitlement:generation:user:{}'
+ENTITLEMENT_KEY = 'app_manager:entitlement:{member_id}:{user_id}:{administrator}:{generations}'
+
+# Process wide hit / miss counters, tagged on the tracer spans of the requests that use the cache
+stats = {
+    'hits': 0,
+    'misses': 0,
+}
+
+
+def _cache() -> BaseCache:
+    """
+    Get the cache that entitlements are stored in
+    """
+    return caches[getattr(settings, 'APP_MANAGER_CACHE', 'default')]
+
+
+def _bump(key: str):
+    """
+    Increment a generation counter, creating it if it does not exist yet.
+    Generation counters never expire, so that a stale entitlement can never become valid again
+    """
+    cache = _cache()
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:  # pragma: no cover
+        # The key was evicted between the add and the incr
+        cache.set(key, 1, None)
+
+
+def invalidate_all():
+    """
+    Invalidate every cached entitlement, used when public Menu Items or the default Apps change
+    """
+    _bump(GLOBAL_GENERATION_KEY)
+
+
+def invalidate_member(member_id: int):
+    """
+    Invalidate the cached entitlements of every User in a Member, used when the Member's Member Links change
+    :param member_id: The id of the Member whose Member Links have changed
+    """
+    if member_id == 0:
+        # Member Links for Member 0 are the default Apps for every Member
+        invalidate_all()
+    else:
+        _bump(MEMBER_GENERATION_KEY.format(member_id))
+
+
+def invalidate_user(user_id: int):
+    """
+    Invalidate the cached entitlements of a User, used when the User's Menu Item User Links change
+    :param user_id: The id of the User whose Menu Item User Links have changed
+    """
+    _bump(USER_GENERATION_KEY.format(user_id))
+
+
+def invalidate_users(user_ids: Iterable[int]):
+    """
+    Invalidate the cached entitlements of many Users, with one read and one write of their generation counters
+    :param user_ids: The ids of the Users whose Menu Item User Links have changed
+    """
+    keys = [USER_GENERATION_KEY.format(user_id) for user_id in sorted(set(user_ids))]
+    if len(keys) == 0:
+        return
+    cache = _cache()
+    # Racing bumps can write the same value, but every counter still moves past the value it was read at
+    generations = cache.get_many(keys)
+    cache.set_many({key: generations.get(key, 0) + 1 for key in keys}, None)
+
+
+def _build(request: Request) -> Dict[str, Any]:
+    """
+    Gather the App ids that the requesting User is entitled to see from the database.
+    The sets are read from the primary, as they are cached under the current generations, which a lagging read replica
+    may not have caught up with yet
+    :param request: The request being handled
+    :return: A dictionary containing the sets of App ids for the requesting User
+    """
+    db = router.db_for_write(MemberLink)
+    member_app_ids: Optional[Set[int]] = None
+    user_app_ids: Optional[Set[int]] = None
+
+    if request.user.id != 1:
+        # Limit the Apps to those that the User's Member is linked to, including the default Apps linked to Member 0
+        member_app_ids = set(MemberLink.objects.using(db).filter(
+            member_id__in=[0, request.user.member['id']],
+            deleted__isnull=True,
+        ).values_list(
+            'app_id',
+            flat=True,
+        ))
+
+    if not request.user.administrator:
+        # Limit the user to apps that they have a UserLink with
+        user_app_ids = set(MenuItemAccess.objects.using(db).filter(
+            user_id=request.user.id,
+        ).values_list(
+            'app_id',
+            flat=True,
+        ).distinct())
+
+    public_app_ids = set(MenuItem.objects.using(db).filter(
+        public=True,
+    ).values_list(
+        'app_id',
+        flat=True,
+    ))
+
+    return {
+        'member_app_ids': member_app_ids,
+        'user_app_ids': user_app_ids,
+        'public_app_ids': public_app_ids,
+    }
+
+
+def entitlement_key(request: Request) -> str:
+    """
+    Get the cache key of the requesting User's entitlement.
+    The key changes whenever anything that the entitlement depends on changes, so it can also be used to version
+    responses that depend on what the User can see
+    :param request: The request being handled
+    :return: The cache key for the entitlement of the requesting User
+    """
+    member_id = request.user.member['id']
+    generation_keys = [
+        GLOBAL_GENERATION_KEY,
+        MEMBER_GENERATION_KEY.format(member_id),
+        USER_GENERATION_KEY.format(request.user.id),
+    ]
+    generations = _cache().get_many(generation_keys)
+    return ENTITLEMENT_KEY.format(
+        member_id=member_id,
+        user_id=request.user.id,
+        administrator=int(bool(request.user.administrator)),
+        generations='.'.join(str(generations.get(k, 0)) for k in generation_keys),
+    )
+
+
+def get_entitlement(request: Request, span: Any = None) -> Dict[str, Any]:
+    """
+    Retrieve the App ids that the requesting User is entitled to see, from the cache if possible.
+    The returned dictionary contains;
+    - member_app_ids: The Apps the User's Member is linked to, or None if the User is not restricted by Member Links
+    - user_app_ids: The Apps the User has a Menu Item User Link in, or None if the User is an administrator
+    - public_app_ids: The Apps that contain at least one public Menu Item
+    - key: The cache key of the entitlement, see `entitlement_key`
+    :param request: The request being handled
+    :param span: The tracer span to tag the cache hit / miss counters on
+    :return: The entitlement of the requesting User
+    """
+    cache = _cache()
+    key = entitlement_key(request)
+
+    entitlement = cache.get(key)
+    hit = entitlement is not None
+    if hit:
+        stats['hits'] += 1
+    else:
+        stats['misses'] += 1
+        entitlement = _build(request)
+        cache.set(key, entitlement, getattr(settings, 'APP_MANAGER_ENTITLEMENT_CACHE_TTL', 60))
+
+    if span is not None:
+        span.set_tag('entitlement_cache', 'hit' if hit else 'miss')
+        span.set_tag('entitlement_cache_hits', stats['hits'])
+        span.set_tag('entitlement_cache_misses', stats['misses'])
+    return dict(entitlement, key=key)
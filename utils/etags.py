@@ -0,0 +1,82 @@
+"""
+Strong ETags for conditional GET requests
+
+Clients re-read the App and Menu Item lists far more often than they change. Each read and list response carries an
+ETag built from a cheap validator of the records it would contain, i.e. the number of records and their latest
+`updated` time, along with anything else the response depends on. When the client sends the same ETag back in
+`If-None-Match`, a 304 is returned without paginating or serializing anything.
+"""
+
+# stdlib
+import hashlib
+from datetime import datetime
+from typing import Any, Optional, Tuple
+# libs
+from django.db.models import Count, Max, QuerySet
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+# local
+from app_manager.models import App
+
+
+__all__ = [
+    'app_validator',
+    'make_etag',
+    'not_modified',
+    'queryset_validator',
+]
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the parts that a response depends on
+    :param parts: Values whose `str` changes whenever the response would change
+    :return: A quoted ETag, ready to be sent in the `ETag` header
+    """
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def queryset_validator(objs: QuerySet) -> Tuple[int, Optional[datetime]]:
+    """
+    Get the number of records in a queryset and the latest time any of them was updated, in one query.
+    Records are soft deleted, so a deletion changes the count even when it does not change the latest update
+    :param objs: The filtered queryset of a list view, before pagination
+    :return: The count and latest updated time of the records
+    """
+    validator = objs.order_by().aggregate(count=Count('id'), updated=Max('updated'))
+    return validator['count'], validator['updated']
+
+
+def app_validator(app_id: int) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Get the latest time an App or any of its Menu Items was updated, in one query.
+    Serialized Menu Items embed their App and predecessor, so this changes whenever either of them does
+    :param app_id: The id of the App
+    :return: The updated time of the App, and the latest updated time of its Menu Items
+    """
+    validator = App._base_manager.filter(
+        id=app_id,
+    ).aggregate(
+        app_updated=Max('updated'),
+        items_updated=Max('menu_items__updated'),
+    )
+    return validator['app_updated'], validator['items_updated']
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Check the `If-None-Match` header of a request against the current ETag of the response
+    :param request: The request being handled
+    :param etag: The current ETag of the requested response
+    :return: A 304 response if the client already has the current response, otherwise None
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if header is None:
+        return None
+    # If-None-Match uses the weak comparison, so an ETag weakened by a proxy still matches
+    sent = {tag.strip().replace('W/', '', 1) for tag in header.split(',')}
+    if etag in sent or '*' in sent:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return None
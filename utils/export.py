@@ -0,0 +1,157 @@
+"""
+Exporting the whole catalog as NDJSON
+
+Every live App, Member Link, Menu Item and Menu Item User Link is written as one JSON object per line, with a `type`
+field naming the kind of record. Apps come first, then Member Links, then Menu Items ordered so that every Menu Item
+comes after its predecessor, then Menu Item User Links, so that the export can be loaded in a single pass.
+
+Records are read with server side cursors, `chunk_size` rows at a time, and lines are batched into chunks of about
+CHUNK_BYTES, so memory use does not depend on the size of the catalog. On PostgreSQL every section is read from one
+repeatable read snapshot, so a Menu Item User Link is never exported without its Menu Item.
+"""
+
+# stdlib
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Tuple
+# libs
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.db.models import QuerySet
+# local
+from app_manager.models import App, MemberLink, MenuItem, MenuItemUserLink
+
+
+__all__ = [
+    'accepts_gzip',
+    'chunks',
+    'gzip_chunks',
+    'records',
+]
+
+# The size of the chunks of output to yield, before compression
+CHUNK_BYTES = 64 * 1024
+# The rows to fetch from each server side cursor at a time
+CHUNK_SIZE = 2000
+
+
+def _sections() -> Iterator[Tuple[str, QuerySet]]:
+    """
+    The kinds of record in the export, in the order they are written
+    """
+    yield 'app', App.objects.values(
+        'id',
+        'action',
+        'description',
+        'icon_url',
+        'in_app_store',
+        'maintenance',
+        'name',
+        'online',
+        'private',
+    ).order_by('id')
+    yield 'member_link', MemberLink.objects.values(
+        'id',
+        'app_id',
+        'member_id',
+    ).order_by('id')
+    yield 'menu_item', MenuItem.objects.values(
+        'id',
+        'action',
+        'administrator_only',
+        'app_id',
+        'help',
+        'name',
+        'predecessor_id',
+        'public',
+        'self_managed',
+        'sequence',
+    ).order_by('app_id', 'depth', 'sequence', 'id')
+    yield 'menu_item_user_link', MenuItemUserLink.objects.values(
+        'id',
+        'menu_item_id',
+        'user_id',
+    ).order_by('id')
+
+
+def records(chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Read every record in the catalog, one section at a time through a server side cursor
+    :param chunk_size: The number of rows to fetch from the database at a time
+    :return: The records, each with a `type` naming the kind of record
+    """
+    # Choose the database before the transaction starts, as reads inside one are routed to the primary
+    db = router.db_for_read(App)
+    connection = connections[db]
+    # The isolation level can only be set at the start of a transaction. Inside an outer one, e.g. with
+    # ATOMIC_REQUESTS, the records are read in that transaction instead
+    snapshot = connection.vendor == 'postgresql' and not connection.in_atomic_block
+    with transaction.atomic(using=db):
+        if snapshot:
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        for kind, objs in _sections():
+            for record in objs.using(db).iterator(chunk_size=chunk_size):
+                record['type'] = kind
+                yield record
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Check if an `Accept-Encoding` header allows a gzip response, i.e. it gives gzip, or `*` when gzip is not listed, a
+    q-value above 0
+    :param accept_encoding: The value of the header
+    :return: A flag stating whether the response can be gzip compressed
+    """
+    qualities: Dict[str, float] = dict()
+    for entry in accept_encoding.split(','):
+        encoding, *params = (part.strip() for part in entry.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if len(encoding) > 0:
+            qualities[encoding.lower()] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def chunks(lines: Iterable[Dict[str, Any]], size: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Encode records as NDJSON, batching the lines into chunks of about the given size
+    :param lines: The records to encode
+    :param size: The size in bytes at which a chunk is yielded
+    :return: The encoded chunks
+    """
+    encoder = DjangoJSONEncoder(separators=(',', ':'), sort_keys=True)
+    batch = list()
+    length = 0
+    for line in lines:
+        data = f'{encoder.encode(line)}\n'.encode()
+        batch.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(batch)
+            batch = list()
+            length = 0
+    if len(batch) > 0:
+        yield b''.join(batch)
+
+
+def gzip_chunks(data: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Compress a stream of chunks into a single gzip stream without holding more than one chunk in memory
+    :param data: The chunks to compress
+    :param level: The zlib compression level
+    :return: The compressed chunks
+    """
+    # A wbits of 16 + MAX_WBITS writes a gzip header and trailer instead of a zlib one
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in data:
+        compressed = compressor.compress(chunk)
+        if len(compressed) > 0:
+            yield compressed
+    yield compressor.flush()
+
@@ -0,0 +1,277 @@
+"""
+Cache of the Membership API lookups made by permissions and controllers
+
+Checking that a User can read another User, or that a Member exists, takes a request to the Membership API. The
+answers rarely change, so they are kept in a bounded, per process LRU cache for a short time.
+
+Membership decides what a caller can read from their token, so entries are keyed by a hash of the token as well as the
+looked up id, and one caller's answer is never used for another caller. Failed lookups are cached for a shorter time
+than successful ones, so that a newly created User or Member becomes usable quickly. Server errors are never cached.
+
+Views can `prefetch_user` / `prefetch_member` to start a lookup on a small thread pool, and run work they would do
+anyway while the Membership round trip is in flight. A later `read_user` / `read_member` of the same record waits for
+that lookup instead of making its own request. Views never move database work ahead of their permission checks to do
+so, and only prefetch a lookup when there is database work to run before they need it.
+"""
+
+# stdlib
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+# libs
+from cloudcix.api.membership import Membership
+from django.conf import settings
+from rest_framework.request import Request
+
+
+__all__ = [
+    'clear',
+    'prefetch_member',
+    'prefetch_user',
+    'read_member',
+    'read_user',
+    'read_users',
+    'stats',
+]
+
+USER = 'user'
+MEMBER = 'member'
+# Users read through a list request. A User missing from a list page is not proof that a read of them would fail, so
+# these answers are kept apart from the ones that `read_user` uses
+USER_LIST = 'user_list'
+# The most Users to read from Membership in one list request
+LIST_CHUNK_SIZE = 100
+
+# Process wide hit / miss counters, tagged on the tracer spans of the requests that use the cache
+stats = {
+    'hits': 0,
+    'misses': 0,
+}
+
+_entries: 'OrderedDict[Hashable, Tuple[float, Optional[Dict[str, Any]]]]' = OrderedDict()
+_lock = threading.Lock()
+# Lookups started by a prefetch that have not finished yet
+_inflight: Dict[Hashable, 'Future[Optional[Dict[str, Any]]]'] = dict()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def clear():
+    """
+    Remove every cached lookup
+    """
+    with _lock:
+        _entries.clear()
+
+
+def _key(kind: str, token: str, pk: int) -> Tuple[str, str, int]:
+    """
+    Key a lookup by the caller's token, without keeping the token itself in memory longer than the request
+    """
+    return kind, hashlib.sha256(token.encode()).hexdigest(), pk
+
+
+def _get(key: Hashable) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Get a cached lookup if it has not expired, marking it as recently used
+    :return: A flag stating if the lookup was cached, and the cached content
+    """
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return False, None
+        expires, content = entry
+        if expires < time.monotonic():
+            del _entries[key]
+            return False, None
+        _entries.move_to_end(key)
+        return True, content
+
+
+def _set(key: Hashable, content: Optional[Dict[str, Any]]):
+    """
+    Cache a lookup, evicting the least recently used lookups once the cache is full
+    """
+    if content is None:
+        ttl = getattr(settings, 'APP_MANAGER_MEMBERSHIP_CACHE_NEGATIVE_TTL', 5)
+    else:
+        ttl = getattr(settings, 'APP_MANAGER_MEMBERSHIP_CACHE_TTL', 60)
+    size = getattr(settings, 'APP_MANAGER_MEMBERSHIP_CACHE_SIZE', 10000)
+    with _lock:
+        _entries[key] = (time.monotonic() + ttl, content)
+        _entries.move_to_end(key)
+        while len(_entries) > size:
+            _entries.popitem(last=False)
+
+
+def _tag(span: Any, hit: bool):
+    """
+    Tag the cache hit / miss counters on a span
+    """
+    if span is not None:
+        span.set_tag('membership_cache', 'hit' if hit else 'miss')
+        span.set_tag('membership_cache_hits', stats['hits'])
+        span.set_tag('membership_cache_misses', stats['misses'])
+
+
+def _fetch(kind: str, token: str, pk: int) -> Optional[Dict[str, Any]]:
+    """
+    Read a record from Membership and cache the answer
+    """
+    key = _key(kind, token, pk)
+    service = Membership.user if kind == USER else Membership.member
+    response = service.read(token=token, pk=pk)
+    if response.status_code == 200:
+        content = response.json()['content']
+        _set(key, content)
+        return content
+    if response.status_code < 500:
+        _set(key, None)
+    return None
+
+
+def _fetch_inflight(kind: str, token: str, pk: int) -> Optional[Dict[str, Any]]:
+    """
+    Run a prefetched lookup on the thread pool, removing it from the in flight lookups once it is cached
+    """
+    try:
+        return _fetch(kind, token, pk)
+    finally:
+        with _lock:
+            _inflight.pop(_key(kind, token, pk), None)
+
+
+def _prefetch(kind: str, request: Request, pk: int):
+    """
+    Start reading a record from Membership in the background, unless it is cached or already being read
+    """
+    global _executor
+    key = _key(kind, request.user.token, pk)
+    if _get(key)[0]:
+        return
+    with _lock:
+        if key in _inflight:
+            return
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'APP_MANAGER_MEMBERSHIP_WORKERS', 8),
+                thread_name_prefix='membership',
+            )
+        _inflight[key] = _executor.submit(_fetch_inflight, kind, request.user.token, pk)
+
+
+def _read(kind: str, request: Request, pk: int, span: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    Read a record from Membership as the requesting User, from the cache or a prefetch if possible
+    :param kind: Either USER or MEMBER
+    :param request: The request being handled
+    :param pk: The id of the record to read
+    :param span: The tracer span to tag the cache hit / miss counters on
+    :return: The content of the record, or None if the requesting User cannot read it
+    """
+    key = _key(kind, request.user.token, pk)
+    hit, content = _get(key)
+    if not hit:
+        with _lock:
+            future = _inflight.get(key)
+        if future is not None:
+            # Waiting for a prefetch makes no extra request, so it counts as a hit
+            hit, content = True, future.result()
+        else:
+            # A prefetch may have finished between reading the cache and the in flight lookups
+            hit, content = _get(key)
+
+    if hit:
+        stats['hits'] += 1
+    else:
+        stats['misses'] += 1
+        content = _fetch(kind, request.user.token, pk)
+
+    _tag(span, hit)
+    return content
+
+
+def prefetch_user(request: Request, user_id: int):
+    """
+    Start reading a User from Membership as the requesting User, so that a later `read_user` does not wait for the
+    whole round trip
+    :param request: The request being handled
+    :param user_id: The id of the User to read
+    """
+    _prefetch(USER, request, user_id)
+
+
+def prefetch_member(request: Request, member_id: int):
+    """
+    Start reading a Member from Membership as the requesting User, so that a later `read_member` does not wait for
+    the whole round trip
+    :param request: The request being handled
+    :param member_id: The id of the Member to read
+    """
+    _prefetch(MEMBER, request, member_id)
+
+
+def read_user(request: Request, user_id: int, span: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    Read a User from Membership as the requesting User
+    :param request: The request being handled
+    :param user_id: The id of the User to read
+    :param span: The tracer span to tag the cache hit / miss counters on
+    :return: The User, or None if the requesting User cannot read them
+    """
+    return _read(USER, request, user_id, span)
+
+
+def read_member(request: Request, member_id: int, span: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    Read a Member from Membership as the requesting User
+    :param request: The request being handled
+    :param member_id: The id of the Member to read
+    :param span: The tracer span to tag the cache hit / miss counters on
+    :return: The Member, or None if the requesting User cannot read it
+    """
+    return _read(MEMBER, request, member_id, span)
+
+
+def read_users(request: Request, user_ids: Iterable[int], span: Any = None) -> Dict[int, Optional[Dict[str, Any]]]:
+    """
+    Read many Users from Membership as the requesting User, with one list request for every LIST_CHUNK_SIZE Users
+    that are not cached, instead of one read request per User. The answers are cached apart from those of `read_user`
+    :param request: The request being handled
+    :param user_ids: The ids of the Users to read
+    :param span: The tracer span to tag the cache hit / miss counters on
+    :return: A map of each User id to the User, or to None if the requesting User cannot read them
+    """
+    users: Dict[int, Optional[Dict[str, Any]]] = dict()
+    missing = list()
+    for user_id in sorted(set(user_ids)):
+        # A User that `read_user` has already read is used as is
+        hit, content = _get(_key(USER, request.user.token, user_id))
+        if not hit or content is None:
+            hit, content = _get(_key(USER_LIST, request.user.token, user_id))
+        if hit:
+            users[user_id] = content
+        else:
+            missing.append(user_id)
+    stats['hits'] += len(users)
+    stats['misses'] += len(missing)
+
+    for start in range(0, len(missing), LIST_CHUNK_SIZE):
+        chunk = missing[start:start + LIST_CHUNK_SIZE]
+        response = Membership.user.list(
+            token=request.user.token,
+            params={'search[id__in]': chunk, 'limit': len(chunk)},
+        )
+        if response.status_code != 200:
+            # Nothing is known about these Users, so they are not cached
+            users.update((user_id, None) for user_id in chunk)
+            continue
+        found = {user['id']: user for user in response.json()['content']}
+        for user_id in chunk:
+            users[user_id] = found.get(user_id)
+            _set(_key(USER_LIST, request.user.token, user_id), users[user_id])
+
+    _tag(span, len(missing) == 0)
+    return users
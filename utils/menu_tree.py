@@ -0,0 +1,111 @@
+"""
+Building the tree of Menu Items in an App that a User can see
+
+The tree is read with a single recursive query that starts at the root Menu Items of the App and descends through the
+`predecessor` relation. Only Menu Items that the User can see are followed, so the children of a hidden Menu Item are
+hidden too. The rows come back in depth-first order with siblings ordered by `sequence`, so the nested structure is
+rebuilt in one pass.
+"""
+
+# stdlib
+from typing import Iterable, List
+# libs
+from rest_framework.request import Request
+# local
+from app_manager.models import MenuItem
+
+
+__all__ = [
+    'build_tree',
+    'visible_tree',
+]
+
+TREE_SQL = '''
+WITH RECURSIVE visible AS (
+    SELECT mi.*
+    FROM menu_item mi
+    WHERE mi.app_id = %s
+      AND mi.deleted IS NULL
+      AND {visible}
+), tree AS (
+    SELECT v.id, ARRAY[v.sequence, v.id] AS sort_path, ARRAY[v.id] AS id_path
+    FROM visible v
+    WHERE v.predecessor_id IS NULL
+    UNION ALL
+    SELECT v.id, t.sort_path || ARRAY[v.sequence, v.id], t.id_path || v.id
+    FROM visible v
+    JOIN tree t ON v.predecessor_id = t.id
+    -- Guard against cycles in the predecessor chain
+    WHERE NOT v.id = ANY(t.id_path)
+)
+SELECT v.*
+FROM tree t
+JOIN visible v ON v.id = t.id
+ORDER BY t.sort_path
+'''
+
+
+def _visible_predicate(request: Request, app_id: int):
+    """
+    Build the SQL condition that limits Menu Items to the ones the requesting User can see, with the same rules as the
+    Menu Item list;
+    - Public Menu Items are visible to everyone
+    - Otherwise the User must be the superuser, or their Member (or Member 0) must be linked to the App, and
+      - Menu Items that are not self managed are hidden from Users in Members that are not self managed
+      - Users who are not administrators cannot see administrator only Menu Items, and must have a User Link
+    :return: The SQL condition and its parameters
+    """
+    conditions = [
+        '(%s OR EXISTS ('
+        'SELECT 1 FROM member_link ml WHERE ml.app_id = %s AND ml.member_id IN (0, %s) AND ml.deleted IS NULL'
+        '))',
+    ]
+    params: List = [request.user.id == 1, app_id, request.user.member['id']]
+
+    if not request.user.member['self_managed']:
+        conditions.append('NOT mi.self_managed')
+
+    if not request.user.administrator:
+        conditions.append('NOT mi.administrator_only')
+        conditions.append(
+            'EXISTS ('
+            'SELECT 1 FROM menu_item_user_link ul '
+            'WHERE ul.menu_item_id = mi.id AND ul.user_id = %s AND ul.deleted IS NULL'
+            ')',
+        )
+        params.append(request.user.id)
+
+    return f'(mi.public OR ({" AND ".join(conditions)}))', params
+
+
+def build_tree(items: Iterable[MenuItem]) -> List[MenuItem]:
+    """
+    Nest Menu Items under their predecessors, by setting the `tree_children` of every item.
+    Items whose predecessor is not in `items` are dropped, along with their descendants
+    :param items: Menu Items in depth-first order, with siblings in the order they should be displayed
+    :return: The root Menu Items
+    """
+    roots: List[MenuItem] = list()
+    nodes = dict()
+    for item in items:
+        item.tree_children = list()
+        if item.predecessor_id is None:
+            roots.append(item)
+        elif item.predecessor_id in nodes:
+            nodes[item.predecessor_id].tree_children.append(item)
+        else:
+            continue
+        nodes[item.id] = item
+    return roots
+
+
+def visible_tree(request: Request, app_id: int) -> List[MenuItem]:
+    """
+    Read the tree of Menu Items in an App that the requesting User can see, in one query
+    :param request: The request being handled
+    :param app_id: The id of the App to read the Menu Items of
+    :return: The root Menu Items of the tree, each with their `tree_children` set
+    """
+    visible, params = _visible_predicate(request, app_id)
+    sql = TREE_SQL.format(visible=visible)
+    return build_tree(MenuItem.objects.raw(sql, [app_id, *params]))
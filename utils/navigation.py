@@ -0,0 +1,169 @@
+"""
+Reading every App a User can see, each with the tree of Menu Items they can see in it
+
+The visible Apps come from the User's cached entitlement, and the visible Menu Items of all of them are read in one
+query with the same rules as the Menu Item list, so the number of queries does not grow with the number of Apps.
+Built navigation is cached by the entitlement key, the self managed flag of the User's Member and a validator of the
+Apps and their Menu Items, so any change to what the User can see, or to the records themselves, builds it again.
+
+The validator is read on every request, including cache hits and 304s. It is one aggregate query over the visible Apps
+joined to their Menu Items, so its cost grows with the number of Menu Items the User's Apps contain. That is cheaper
+than building the navigation, but it is not free. Not every App and Menu Item write bumps an entitlement generation,
+e.g. App updates do not, so the entitlement key cannot stand in for the validator.
+"""
+
+# stdlib
+import hashlib
+from typing import Any, Dict, List, Optional, Set
+# libs
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.db.models import Count, Max, Q, QuerySet
+from rest_framework.request import Request
+# local
+from app_manager.models import App, MenuItem, MenuItemAccess
+from app_manager.utils.menu_tree import build_tree
+
+
+__all__ = [
+    'app_filters',
+    'build_navigation',
+    'cache_key',
+    'get_cached',
+    'set_cached',
+    'validator',
+]
+
+NAVIGATION_KEY = 'app_manager:navigation:{}'
+
+
+def app_filters(entitlement: Dict[str, Any], kw: Optional[Dict[str, Any]] = None) -> Q:
+    """
+    Build the filter for the Apps that a User is entitled to see
+    :param entitlement: The User's entitlement, from `app_manager.utils.entitlements.get_entitlement`
+    :param kw: Search filters to apply to the Apps the User is linked to, which are not applied to public Apps
+    :return: The filter to apply to App querysets
+    """
+    kw = dict() if kw is None else kw
+    app_ids: Optional[Set[int]] = None
+    if entitlement['member_app_ids'] is not None:
+        # Limit the Apps to those that the User's Member is linked to
+        app_ids = set(entitlement['member_app_ids'])
+        kw['online'] = True
+
+    if entitlement['user_app_ids'] is not None:
+        # Limit the user to apps that they have a UserLink with
+        if app_ids is None:
+            app_ids = set(entitlement['user_app_ids'])
+        else:
+            app_ids &= entitlement['user_app_ids']
+
+    if app_ids is not None:
+        if kw.get('id__in', False):
+            id_set = {int(i) for i in kw['id__in']}
+            kw['id__in'] = id_set & app_ids
+        else:
+            kw['id__in'] = app_ids
+
+    kw['deleted__isnull'] = True
+    return Q(**kw) | Q(id__in=entitlement['public_app_ids'])
+
+
+def _visible_apps(entitlement: Dict[str, Any], using: Optional[str] = None) -> QuerySet:
+    """
+    The Apps that a User is entitled to see
+    """
+    return App.objects.using(using).filter(app_filters(entitlement)).distinct()
+
+
+def validator(entitlement: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Summarise the Apps a User can see and their Menu Items in one query, to tell when built navigation is stale.
+    This runs on every navigation request, see the module docstring for its cost
+    """
+    return _visible_apps(entitlement).order_by().aggregate(
+        apps=Count('id', distinct=True),
+        app_updated=Max('updated'),
+        items=Count('menu_items'),
+        items_updated=Max('menu_items__updated'),
+    )
+
+
+def cache_key(request: Request, entitlement: Dict[str, Any], current: Dict[str, Any]) -> str:
+    """
+    Get the cache key for a User's navigation
+    :param request: The request being handled
+    :param entitlement: The User's entitlement
+    :param current: The current `validator` of the User's navigation
+    :return: The key, which changes whenever the User's navigation could have changed
+    """
+    # Menu Items that are not self managed are hidden from Members that are not, which the entitlement key does not
+    # depend on
+    self_managed = int(bool(request.user.member['self_managed']))
+    digest = hashlib.sha256(f'{entitlement["key"]}|{self_managed}|{sorted(current.items())}'.encode()).hexdigest()
+    return NAVIGATION_KEY.format(digest)
+
+
+def get_cached(key: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get a User's serialized navigation from the cache, or None if it has not been cached
+    """
+    return caches[getattr(settings, 'APP_MANAGER_CACHE', 'default')].get(key)
+
+
+def set_cached(key: str, data: List[Dict[str, Any]]):
+    """
+    Cache a User's serialized navigation for APP_MANAGER_NAVIGATION_CACHE_TTL seconds
+    """
+    caches[getattr(settings, 'APP_MANAGER_CACHE', 'default')].set(
+        key,
+        data,
+        getattr(settings, 'APP_MANAGER_NAVIGATION_CACHE_TTL', 60),
+    )
+
+
+def build_navigation(request: Request, entitlement: Dict[str, Any]) -> List[App]:
+    """
+    Read the Apps a User can see and the Menu Items they can see in each of them, in two queries.
+    A Menu Item is visible if it is public, or if;
+    - The User is the superuser, or their Member (or Member 0) is linked to its App, and
+    - Menu Items that are not self managed are hidden from Users in Members that are not self managed, and
+    - Users who are not administrators cannot see administrator only Menu Items, and must have a User Link
+    :param request: The request being handled
+    :param entitlement: The User's entitlement
+    :return: The visible Apps, ordered by name, each with the roots of its Menu Item tree as `menu_tree`
+    """
+    # Built navigation is cached under the current entitlement key and validator, so it is read from the primary,
+    # which can only be ahead of the state that the key was built from
+    db = router.db_for_write(App)
+    apps = list(_visible_apps(entitlement, db).order_by('name', 'id'))
+
+    restricted = Q()
+    if entitlement['member_app_ids'] is not None:
+        restricted &= Q(app_id__in=entitlement['member_app_ids'])
+    if not request.user.administrator:
+        # The flags are read from the copies in Menu Item Access, from the same indexed lookup as the User's links
+        access = MenuItemAccess.objects.using(db).filter(user_id=request.user.id, administrator_only=False)
+        if not request.user.member['self_managed']:
+            access = access.filter(self_managed=False)
+        restricted &= Q(id__in=access.values('menu_item_id'))
+    elif not request.user.member['self_managed']:
+        restricted &= Q(self_managed=False)
+    # Ordering by depth puts every Menu Item after its predecessor, and siblings in sequence order
+    items = MenuItem.objects.using(db).select_related(None).filter(
+        Q(public=True) | restricted,
+        app_id__in=[app.pk for app in apps],
+    ).order_by(
+        'app_id',
+        'depth',
+        'sequence',
+        'id',
+    )
+
+    items_by_app: Dict[int, List[MenuItem]] = {app.pk: list() for app in apps}
+    for item in items:
+        items_by_app[item.app_id].append(item)
+    for app in apps:
+        app.menu_tree = build_tree(items_by_app[app.pk])
+    return apps
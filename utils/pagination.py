@@ -0,0 +1,222 @@
+"""
+Pagination of the querysets of the list views
+
+Lists are paged with `page` and `limit` by default. Sending the `cursor` parameter opts in to keyset pagination, where
+the cursor encodes the order value and id of the last record of the previous page. Each page is then read with an
+indexed range condition instead of an OFFSET, so reading the whole list takes linear time.
+
+The `count` parameter controls how `total_records` is calculated;
+- exact: The default, a COUNT over the whole filtered queryset
+- estimate: The planner's row estimate for the queryset, which does not read any rows
+- none: No total is sent, only a `has_more` flag found by reading one record past the end of the page
+"""
+
+# stdlib
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
+# libs
+from cloudcix_rest.controllers import ControllerBase
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Model, Q, QuerySet
+from rest_framework.request import Request
+
+
+__all__ = [
+    'COUNT_ESTIMATE',
+    'COUNT_EXACT',
+    'COUNT_NONE',
+    'CountError',
+    'CursorError',
+    'decode_cursor',
+    'encode_cursor',
+    'estimate_count',
+    'paginate',
+]
+
+
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATE = 'estimate'
+COUNT_NONE = 'none'
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+
+class CountError(ValueError):
+    """
+    Raised when the count mode sent by the User is not valid
+    """
+    pass
+
+
+class CursorError(ValueError):
+    """
+    Raised when a cursor sent by the User cannot be used
+    """
+    pass
+
+
+def encode_cursor(order: str, value: Any, pk: int) -> str:
+    """
+    Encode the position of a record in a list ordered by `order` into an opaque cursor
+    :param order: The order of the list, as sent by the User
+    :param value: The value of the order field for the record
+    :param pk: The id of the record, used to break ties between records with the same order value
+    :return: A url safe cursor string
+    """
+    payload = json.dumps([order, value, pk], cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, order: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor created by `encode_cursor`
+    :param cursor: The cursor sent by the User
+    :param order: The order of the current request, which must match the order the cursor was created for
+    :raises CursorError: If the cursor is malformed or was created for a different order
+    :return: The order value and id of the record the cursor points to
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_order, value, pk = json.loads(payload)
+        pk = int(pk)
+    except (binascii.Error, TypeError, ValueError):
+        raise CursorError('Malformed cursor')
+    if cursor_order != order:
+        raise CursorError('The cursor was created for a different order')
+    return value, pk
+
+
+def _order_field(model: Model, order: str) -> str:
+    """
+    Get the name of the model field used by an order, which must be a concrete field for keyset pagination
+    :raises CursorError: If the order is not by a concrete field of the model
+    """
+    field = order.lstrip('-')
+    try:
+        model._meta.get_field(field)
+    except FieldDoesNotExist:
+        raise CursorError(f'Keyset pagination is not supported when ordering by {field}')
+    return field
+
+
+def estimate_count(objs: QuerySet) -> int:
+    """
+    Get the planner's estimate of the number of records in a queryset, without reading them.
+    Databases other than PostgreSQL fall back to an exact count
+    :param objs: The queryset to estimate the size of
+    :return: The estimated number of records
+    """
+    connection = connections[objs.db]
+    if connection.vendor != 'postgresql':
+        return objs.count()
+    sql, params = objs.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _cursor_page(objs: QuerySet, order: str, cursor: str, limit: int) -> Tuple[List[Model], Dict[str, Any]]:
+    """
+    Read a page of records after the given cursor
+    """
+    field = _order_field(objs.model, order)
+    descending = order.startswith('-')
+    tiebreak = '-id' if descending else 'id'
+
+    if len(cursor) > 0:
+        value, pk = decode_cursor(cursor, order)
+        after = 'lt' if descending else 'gt'
+        if field == 'id':
+            objs = objs.filter(**{f'id__{after}': pk})
+        else:
+            objs = objs.filter(
+                Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'id__{after}': pk}),
+            )
+    if field != 'id':
+        objs = objs.order_by(order, tiebreak)
+
+    # Read one extra record to find out if there is another page
+    records = list(objs[:limit + 1])
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_cursor(order, getattr(last, field), last.pk)
+
+    metadata = {
+        'cursor': cursor,
+        'has_more': next_cursor is not None,
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'order': order,
+    }
+    return records, metadata
+
+
+def _offset_page(
+        objs: QuerySet,
+        page: int,
+        limit: int,
+        count: str,
+) -> Tuple[Union[QuerySet, List[Model]], Optional[bool]]:
+    """
+    Read a page of records by offset. When no count is being sent, one extra record is read to find out if there is
+    another page
+    """
+    if count != COUNT_NONE:
+        return objs[page * limit:(page + 1) * limit], None
+    records = list(objs[page * limit:(page + 1) * limit + 1])
+    return records[:limit], len(records) > limit
+
+
+def paginate(
+        objs: QuerySet,
+        controller: ControllerBase,
+        request: Request,
+) -> Tuple[Union[QuerySet, List[Model]], Dict[str, Any]]:
+    """
+    Paginate the queryset of a list view, using keyset pagination if the `cursor` parameter was sent, and counting
+    the records as requested by the `count` parameter
+    :param objs: The filtered and ordered queryset of the list view
+    :param controller: The validated list controller, which holds the order, page and limit
+    :param request: The request being handled
+    :raises CountError: If the sent count mode is not valid
+    :raises CursorError: If the sent cursor is invalid, or cannot be used with the requested order
+    :return: The records of the requested page and the metadata to send with them
+    """
+    order = controller.cleaned_data['order']
+    page = controller.cleaned_data['page']
+    limit = controller.cleaned_data['limit']
+    count = request.GET.get('count', COUNT_EXACT)
+    if count not in COUNT_MODES:
+        raise CountError(f'Invalid count mode {count}')
+
+    total_records = None
+    if count == COUNT_EXACT:
+        total_records = objs.count()
+    elif count == COUNT_ESTIMATE:
+        total_records = estimate_count(objs)
+
+    if 'cursor' in request.GET:
+        records, metadata = _cursor_page(objs, order, request.GET['cursor'], limit)
+    else:
+        records, has_more = _offset_page(objs, page, limit, count)
+        metadata = {
+            'page': page,
+            'limit': limit,
+            'order': order,
+        }
+        if has_more is not None:
+            metadata['has_more'] = has_more
+
+    if total_records is not None:
+        metadata['total_records'] = total_records
+    if count == COUNT_ESTIMATE:
+        metadata['total_records_estimated'] = True
+    return records, metadata
@@ -0,0 +1,74 @@
+"""
+Sparse fieldsets and side-loading of Apps for Menu Item responses
+
+Sending `fields=id,name,sequence` limits each serialized Menu Item to the listed fields, and sending `include=app`
+replaces the App nested in every Menu Item with its `app_id`, and sends each App once in the `included` map of the
+response instead.
+"""
+
+# stdlib
+from typing import Any, Dict, Iterable
+# libs
+from rest_framework.request import Request
+# local
+from app_manager.models import App, MenuItem
+from app_manager.serializers import AppSerializer, MenuItemSerializer
+
+
+__all__ = [
+    'FieldsError',
+    'IncludeError',
+    'include_apps',
+    'parse_projection',
+]
+
+INCLUDE_APP = 'app'
+
+
+class FieldsError(ValueError):
+    """
+    Raised when the `fields` parameter names a field that does not exist
+    """
+    pass
+
+
+class IncludeError(ValueError):
+    """
+    Raised when the `include` parameter names something that cannot be side-loaded
+    """
+    pass
+
+
+def parse_projection(request: Request) -> Dict[str, Any]:
+    """
+    Parse the `fields` and `include` parameters of a request for Menu Items
+    :param request: The request being handled
+    :raises FieldsError: If an unknown field is requested
+    :raises IncludeError: If anything other than `app` is requested to be included
+    :return: The context to pass to the MenuItemSerializer
+    """
+    fields = None
+    if 'fields' in request.GET:
+        fields = frozenset(field.strip() for field in request.GET['fields'].split(',') if field.strip())
+        if len(fields - set(MenuItemSerializer.field_names())) > 0:
+            raise FieldsError('Unknown fields requested')
+
+    include = {item.strip() for item in request.GET.get('include', '').split(',') if item.strip()}
+    if len(include - {INCLUDE_APP}) > 0:
+        raise IncludeError('Unknown include requested')
+
+    return {
+        'fields': fields,
+        'include_app': INCLUDE_APP in include,
+    }
+
+
+def include_apps(objs: Iterable[MenuItem]) -> Dict[int, Dict[str, Any]]:
+    """
+    Serialize each distinct App of a list of Menu Items once, reading them in one query.
+    Deleted Apps are included, the same as when reading `obj.app`
+    :param objs: The Menu Items being sent
+    :return: The serialized Apps, by id
+    """
+    apps = App._base_manager.in_bulk({obj.app_id for obj in objs})
+    return {app['id']: app for app in AppSerializer(instance=list(apps.values()), many=True).data}
@@ -0,0 +1,148 @@
+"""
+Tagging tracer spans with the SQL queries run inside them
+
+`QueryTracer` wraps `settings.TRACER`. Every span it starts installs a `connection.execute_wrapper` on each database
+for as long as the span is open, and is tagged with the following when it finishes;
+- db.query_count: The number of statements run
+- db.time_ms: The total time spent running them
+- db.slowest_ms / db.slowest_statement: The slowest statement, with its literals replaced by `?`
+
+When APP_MANAGER_SLOW_QUERY_MS is set, the EXPLAIN output of the slowest SELECT slower than that is tagged as
+db.slowest_plan too. Spans opened inside another span count their queries towards both.
+"""
+
+# stdlib
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+# libs
+from django.conf import settings
+from django.db import connections, DatabaseError
+
+
+__all__ = [
+    'fingerprint',
+    'QueryTracer',
+]
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+IN_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+# Longest statement fingerprint and query plan to tag on a span
+MAX_TAG_LENGTH = 2000
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Reduce a SQL statement to its shape, so that the same statement with different parameters looks the same
+    :param sql: The SQL statement
+    :return: The statement with literals and parameters replaced by `?`, and lists of them collapsed to `(?)`
+    """
+    sql = LITERALS.sub('?', sql)
+    sql = IN_LISTS.sub('(?)', sql)
+    return WHITESPACE.sub(' ', sql).strip()[:MAX_TAG_LENGTH]
+
+
+class _QueryCapture:
+    """
+    An execute wrapper that times every statement run on a connection
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest: Optional[Dict[str, Any]] = None
+        self.explaining = False
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+        if self.explaining:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.total += elapsed
+            if self.slowest is None or elapsed > self.slowest['ms']:
+                self.slowest = {'ms': elapsed, 'sql': sql, 'params': params, 'many': many, 'context': context}
+
+    def explain(self, threshold: float) -> Optional[str]:
+        """
+        Get the plan of the slowest statement, if it is a SELECT that took longer than the threshold
+        """
+        slowest = self.slowest
+        if slowest is None or slowest['ms'] < threshold or slowest['many']:
+            return None
+        if not slowest['sql'].lstrip().upper().startswith('SELECT'):
+            return None
+        self.explaining = True
+        try:
+            with slowest['context']['connection'].cursor() as cursor:
+                cursor.execute(f'EXPLAIN {slowest["sql"]}', slowest['params'])
+                return '\n'.join(str(row[0]) for row in cursor.fetchall())[:MAX_TAG_LENGTH]
+        except DatabaseError:
+            return None
+        finally:
+            self.explaining = False
+
+
+class _QuerySpan:
+    """
+    Context manager around a span that captures the queries run while it is open
+    """
+
+    def __init__(self, span: Any):
+        self._span = span
+        self._capture = _QueryCapture()
+        self._wrappers: List[Any] = list()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._span, name)
+
+    def __enter__(self) -> Any:
+        span = self._span.__enter__()
+        for connection in connections.all():
+            wrapper = connection.execute_wrapper(self._capture)
+            wrapper.__enter__()
+            self._wrappers.append(wrapper)
+        return span
+
+    def __exit__(self, *exc_info: Any) -> Any:
+        for wrapper in reversed(self._wrappers):
+            wrapper.__exit__(*exc_info)
+        self._wrappers = list()
+
+        capture = self._capture
+        if capture.count > 0:
+            self._span.set_tag('db.query_count', capture.count)
+            self._span.set_tag('db.time_ms', round(capture.total, 3))
+            self._span.set_tag('db.slowest_ms', round(capture.slowest['ms'], 3))
+            self._span.set_tag('db.slowest_statement', fingerprint(capture.slowest['sql']))
+            threshold = getattr(settings, 'APP_MANAGER_SLOW_QUERY_MS', None)
+            if threshold is not None:
+                plan = capture.explain(threshold)
+                if plan is not None:
+                    self._span.set_tag('db.slowest_plan', plan)
+        return self._span.__exit__(*exc_info)
+
+
+class QueryTracer:
+    """
+    Wraps a tracer so that every span it starts is tagged with the queries run inside it
+    """
+
+    def __init__(self, tracer: Any):
+        self._tracer = tracer
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._tracer, name)
+
+    def start_span(self, *args: Any, **kwargs: Any) -> _QuerySpan:
+        """
+        Start a span on the wrapped tracer, which captures queries while it is used as a context manager
+        """
+        # The wrapped tracer only knows its own spans, so parents started by this tracer are unwrapped
+        if isinstance(kwargs.get('child_of'), _QuerySpan):
+            kwargs['child_of'] = kwargs['child_of']._span
+        return _QuerySpan(self._tracer.start_span(*args, **kwargs))
@@ -0,0 +1,120 @@
+"""
+Generating synthetic tenants for benchmarks
+
+Creates Apps with trees of Menu Items, Members linked to some of the Apps, and Users with Menu Item User Links, all
+from a seed so that the same arguments always produce the same data. Member 1 is the owner of the cloud and User 1 is
+the superuser, as in production, so the generated Members and Users start from 2.
+"""
+
+# stdlib
+import random
+from typing import Any, Dict, List
+# local
+from app_manager.models import App, MemberLink, MenuItem, MenuItemUserLink
+
+
+__all__ = [
+    'generate',
+]
+
+
+def _menu_items(app: App, count: int, depth: int, rng: random.Random) -> List[MenuItem]:
+    """
+    Create a tree of Menu Items in an App, filling each level of the tree in turn so that every level is used
+    """
+    items: Dict[str, MenuItem] = dict()
+    predecessor_temp_ids: Dict[str, Any] = dict()
+    levels: List[List[str]] = [list() for _ in range(depth)]
+    sequences: Dict[Any, int] = dict()
+    for index in range(count):
+        level = index % depth
+        parent = rng.choice(levels[level - 1]) if level > 0 else None
+        sequences[parent] = sequences.get(parent, 0) + 1
+        temp_id = str(index)
+        items[temp_id] = MenuItem(
+            action=f'/app/{app.pk}/item/{index}/',
+            administrator_only=rng.random() < 0.1,
+            app=app,
+            help='',
+            name=f'Item {index}',
+            public=rng.random() < 0.1,
+            self_managed=rng.random() < 0.8,
+            sequence=sequences[parent],
+        )
+        predecessor_temp_ids[temp_id] = parent
+        levels[level].append(temp_id)
+    return list(MenuItem.objects.bulk_create_tree(items, predecessor_temp_ids).values())
+
+
+def generate(
+        apps: int,
+        menu_items: int,
+        depth: int,
+        members: int,
+        users: int,
+        links_per_user: int,
+        seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Create a synthetic data set in the app_manager database
+    - Every other Member is self managed
+    - Each Member is linked to about half of the Apps, and the first App is a default App linked to Member 0
+    - Users are spread evenly over the Members, every fourth one is an administrator, and each one is linked to Menu
+      Items in the Apps their Member is linked to
+    :param apps: The number of Apps
+    :param menu_items: The number of Menu Items in each App
+    :param depth: The depth of the Menu Item tree in each App
+    :param members: The number of Members
+    :param users: The number of Users
+    :param links_per_user: The number of Menu Item User Links for each User, where they have access to that many
+    :param seed: The seed for the random choices
+    :return: A description of the generated Members and Users, for choosing which ones to make requests as
+    """
+    rng = random.Random(seed)
+    created_apps = App.objects.bulk_create([
+        App(
+            name=f'App {index}',
+            description='',
+            icon_url=f'/icons/app/{index}.png',
+            action=f'/app/{index}/',
+            online=True,
+        )
+        for index in range(apps)
+    ])
+
+    items_by_app: Dict[int, List[int]] = dict()
+    for app in created_apps:
+        items_by_app[app.pk] = [item.pk for item in _menu_items(app, menu_items, max(depth, 1), rng)]
+
+    member_ids = list(range(2, members + 2))
+    member_apps: Dict[int, List[int]] = {
+        member_id: [app.pk for index, app in enumerate(created_apps) if (index + member_id) % 2 == 0]
+        for member_id in member_ids
+    }
+    links = [MemberLink(app=app, member_id=0) for app in created_apps[:1]]
+    for member_id, app_ids in member_apps.items():
+        links.extend(MemberLink(app_id=app_id, member_id=member_id) for app_id in app_ids)
+    MemberLink.objects.bulk_create(links)
+
+    generated_users = list()
+    user_links = list()
+    for index in range(users):
+        member_id = member_ids[index % len(member_ids)]
+        user = {
+            'administrator': index % 4 == 0,
+            'id': index + 2,
+            'member': {'id': member_id, 'self_managed': member_id % 2 == 0},
+        }
+        generated_users.append(user)
+        app_ids = dict.fromkeys(member_apps[member_id] + [created_apps[0].pk])
+        available = [pk for app_id in app_ids for pk in items_by_app[app_id]]
+        for menu_item_id in rng.sample(available, min(links_per_user, len(available))):
+            user_links.append(MenuItemUserLink(menu_item_id=menu_item_id, user_id=user['id']))
+    MenuItemUserLink.objects.bulk_create(user_links)
+
+    return {
+        'apps': [app.pk for app in created_apps],
+        'member_apps': member_apps,
+        'menu_items': items_by_app,
+        'users': generated_users,
+    }
@@ -0,0 +1,57 @@
+"""
+Precompiled URL templates for the resources that are serialized in bulk
+
+`reverse` resolves the URL pattern on every call, which adds up when every record in a list needs its `uri`. Instead
+each URL is reversed once per script prefix with placeholder values, turned into a format string, and filled in with
+string formatting from then on.
+"""
+
+# stdlib
+from functools import lru_cache
+from typing import Tuple
+# libs
+from django.urls import get_script_prefix, reverse
+
+
+__all__ = [
+    'app_uri',
+    'menu_item_uri',
+]
+
+# Placeholder values for the url kwargs, which must match the `int` path converter and not appear anywhere else
+PLACEHOLDER = 918273645000
+
+
+@lru_cache(maxsize=None)
+def _template(name: str, kwargs: Tuple[str, ...], script_prefix: str) -> str:
+    """
+    Build a format string for a named URL
+    :param name: The name of the URL pattern
+    :param kwargs: The names of the kwargs of the URL pattern
+    :param script_prefix: The script prefix the URL is reversed with, only used as part of the cache key
+    :return: A format string with a `{kwarg}` replacement field for each kwarg
+    """
+    placeholders = {kwarg: str(PLACEHOLDER + index) for index, kwarg in enumerate(kwargs)}
+    url = reverse(name, kwargs=placeholders).replace('{', '{{').replace('}', '}}')
+    for kwarg, placeholder in placeholders.items():
+        url = url.replace(placeholder, f'{{{kwarg}}}')
+    return url
+
+
+def app_uri(pk: int) -> str:
+    """
+    Build the URL of the AppResource view for an App
+    :param pk: The id of the App
+    :return: The same URL that `reverse('app_resource', kwargs={'pk': pk})` returns
+    """
+    return _template('app_resource', ('pk',), get_script_prefix()).format(pk=pk)
+
+
+def menu_item_uri(app_id: int, pk: int) -> str:
+    """
+    Build the URL of the MenuItemResource view for a Menu Item
+    :param app_id: The id of the App that the Menu Item belongs to
+    :param pk: The id of the Menu Item
+    :return: The same URL that `reverse('menu_item_resource', kwargs={'app_id': app_id, 'pk': pk})` returns
+    """
+    return _template('menu_item_resource', ('app_id', 'pk'), get_script_prefix()).format(app_id=app_id, pk=pk)
@@ -1,7 +1,10 @@
 from .app import AppCollection, AppResource
+from .export import ExportResource
 from .member_link import MemberLinkCollection
-from .menu_item import MenuItemCollection, MenuItemResource
-from .menu_item_user_link import MenuItemUserLinkCollection
+from .menu_item import MenuItemBulkCollection, MenuItemCollection, MenuItemResource
+from .menu_item_user_link import MenuItemUserLinkBulkCollection, MenuItemUserLinkCollection
+from .menu_tree import MenuTreeResource
+from .navigation import NavigationResource
 
 
 __all__ = [
@@ -9,13 +12,24 @@ __all__ = [
     'AppCollection',
     'AppResource',
 
+    # Export
+    'ExportResource',
+
     # Member Link
     'MemberLinkCollection',
 
     # Menu Item
+    'MenuItemBulkCollection',
     'MenuItemCollection',
     'MenuItemResource',
 
     # Menu Item User Link
+    'MenuItemUserLinkBulkCollection',
     'MenuItemUserLinkCollection',
+
+    # Menu Tree
+    'MenuTreeResource',
+
+    # Navigation
+    'NavigationResource',
 ]
@@ -7,7 +7,6 @@ from cloudcix_rest.exceptions import Http400, Http404
 from cloudcix_rest.views import BaseView
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db.models import Q
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -17,9 +16,13 @@ from app_manager.controllers import (
     AppListController,
     AppUpdateController,
 )
-from app_manager.models import App, MemberLink, MenuItem, MenuItemUserLink
+from app_manager.models import App
 from app_manager.permissions.app import Permissions
 from app_manager.serializers.app import AppSerializer
+from app_manager.utils.entitlements import get_entitlement, invalidate_all
+from app_manager.utils.etags import make_etag, not_modified, queryset_validator
+from app_manager.utils.navigation import app_filters
+from app_manager.utils.pagination import CountError, CursorError, paginate
 
 
 __all__ = [
@@ -39,10 +42,21 @@ class AppCollection(BaseView):
 
         description: |
             Retrieve a list of App records that the requesting User is linked to.
+            Default Apps, i.e. Apps with a Member Link for Member 0, are listed for every Member.
+
+            Send the `cursor` parameter to page through the list by cursor instead of by `page`. Send an empty
+            `cursor` for the first page, and the `next_cursor` from the `_metadata` of each response for the next.
+
+            Send `count=estimate` to get an estimated `total_records`, or `count=none` to get a `has_more` flag instead
+            of `total_records`. Both avoid counting every matching record.
+
+            The response carries an `ETag`. Send it back in `If-None-Match` to get a 304 if the list has not changed.
 
         responses:
             200:
                 description: A list of App records, filtered and ordered by the User
+            304:
+                description: The list has not changed since the ETag sent in `If-None-Match`
             400: {}
         """
         tracer = settings.TRACER
@@ -52,60 +66,17 @@ class AppCollection(BaseView):
             # By validating the controller we generate the search filters
             controller.is_valid()
 
-        with tracer.start_span('ensure_default_apps', child_of=request.span):
-            if request.user.id != 1:
-                member_links = MemberLink.objects.filter(
-                    member_id__in=[0, request.user.member['id']],
-                )
-                default_app_ids = set()
-                user_app_ids = set()
-                for link in member_links:
-                    if link.member_id == 0:
-                        default_app_ids.add(link.app_id)
-                    else:
-                        user_app_ids.add(link.app_id)
-
-                new_links = list()
-                for missing_app_id in (default_app_ids - user_app_ids):
-                    new_links.append(MemberLink(
-                        app_id=missing_app_id,
-                        member_id=request.user.member['id'],
-                    ))
-                if len(new_links) > 0:
-                    MemberLink.objects.bulk_create(new_links)
-
-        with tracer.start_span('setting_search_filters', child_of=request.span):
-            kw = controller.cleaned_data['search']
-            if request.user.id != 1:
-                # Limit the Apps to those that the User's Member is linked to
-                kw.update({
-                    'member_links__member_id': request.user.member['id'],
-                    'member_links__deleted__isnull': True,
-                    'online': True,
-                })
-
-            if not request.user.administrator:
-                # Limit the user to apps that they have a UserLink with
-                links = set(MenuItemUserLink.objects.filter(
-                    user_id=request.user.id,
-                    menu_item__deleted__isnull=True,
-                ).values_list(
-                    'menu_item__app_id',
-                    flat=True,
-                ))
-                if kw.get('id__in', False):
-                    id_set = {int(i) for i in kw['id__in']}
-                    kw['id__in'] = id_set & links
-                else:
-                    kw['id__in'] = links
+        with tracer.start_span('setting_search_filters', child_of=request.span) as span:
+            entitlement = get_entitlement(request, span)
+            try:
+                search_filters = app_filters(entitlement, controller.cleaned_data['search'])
+            except (TypeError, ValueError):
+                return Http400(error_code='app_manager_app_list_001')
 
         with tracer.start_span('get_objects', child_of=request.span):
-            kw['deleted__isnull'] = True
-            public_app_ids = MenuItem.objects.filter(public=True).values_list('app_id')
-            is_public = Q(id__in=public_app_ids)
             try:
                 objs = App.objects.filter(
-                    Q(**kw) | is_public,
+                    search_filters,
                 ).exclude(
                     **controller.cleaned_data['exclude'],
                 ).order_by(
@@ -114,23 +85,28 @@ class AppCollection(BaseView):
             except (ValueError, ValidationError):
                 return Http400(error_code='app_manager_app_list_001')
 
+        with tracer.start_span('checking_etag', child_of=request.span):
+            try:
+                etag = make_etag(queryset_validator(objs), entitlement['key'], sorted(request.GET.lists()))
+            except (ValueError, ValidationError):
+                return Http400(error_code='app_manager_app_list_001')
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+
         with tracer.start_span('gathering_metadata', child_of=request.span):
-            page = controller.cleaned_data['page']
-            limit = controller.cleaned_data['limit']
-            total_records = objs.count()
-            metadata = {
-                'page': page,
-                'limit': limit,
-                'order': controller.cleaned_data['order'],
-                'total_records': total_records,
-            }
-            objs = objs[page * limit: (page + 1) * limit]
+            try:
+                objs, metadata = paginate(objs, controller, request)
+            except CountError:
+                return Http400(error_code='app_manager_app_list_003')
+            except CursorError:
+                return Http400(error_code='app_manager_app_list_002')
 
         with tracer.start_span('serializing_data', child_of=request.span) as span:
-            span.set_tag('num_objects', objs.count())
+            span.set_tag('num_objects', len(objs))
             data = AppSerializer(instance=objs, many=True).data
 
-        return Response({'content': data, '_metadata': metadata})
+        return Response({'content': data, '_metadata': metadata}, headers={'ETag': etag})
 
     def post(self, request: Request) -> Response:
         """
@@ -178,6 +154,8 @@ class AppResource(BaseView):
         description: |
             Attempt to read an App record by the given `pk`, returning a 404 if it does not exist
 
+            The response carries an `ETag`. Send it back in `If-None-Match` to get a 304 if the App has not changed.
+
         path_params:
             pk:
                 description: The id of the App record to be read
@@ -186,14 +164,20 @@ class AppResource(BaseView):
         responses:
             200:
                 description: App record was read successfully
+            304:
+                description: The App has not changed since the ETag sent in `If-None-Match`
             403: {}
             404: {}
         """
         tracer = settings.TRACER
 
         with tracer.start_span('retrieving_requested_object', child_of=request.span):
+            # The permission check is read with the App, so a missing App is a 404 and an inaccessible one a 403 from
+            # the same query
             try:
-                obj = App.objects.get(id=pk)
+                obj = App.objects.annotate(
+                    **Permissions.read_annotations(request),
+                ).get(id=pk)
             except App.DoesNotExist:
                 return Http404(error_code='app_manager_app_read_001')
 
@@ -202,10 +186,16 @@ class AppResource(BaseView):
             if err is not None:
                 return err
 
+        with tracer.start_span('checking_etag', child_of=request.span):
+            etag = make_etag(obj.pk, obj.updated)
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+
         with tracer.start_span('serializing_data', child_of=request.span):
             data = AppSerializer(instance=obj).data
 
-        return Response({'content': data})
+        return Response({'content': data}, headers={'ETag': etag})
 
     def put(self, request: Request, pk: int, partial: bool = False) -> Response:
         """
@@ -295,7 +285,8 @@ class AppResource(BaseView):
             except App.DoesNotExist:
                 return Http404(error_code='app_manager_app_delete_001')
 
-        with tracer.start_span('deleting_object', child_of=request.span):
-            obj.set_deleted()
+        with tracer.start_span('deleting_object', child_of=request.span) as span:
+            obj.set_deleted(span)
+            invalidate_all()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
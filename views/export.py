@@ -0,0 +1,62 @@
+"""
+Management for the catalog Export
+"""
+
+# libs
+from cloudcix_rest.views import BaseView
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.request import Request
+# local
+from app_manager.permissions.export import Permissions
+from app_manager.utils.export import accepts_gzip, chunks, gzip_chunks, records
+
+
+__all__ = [
+    'ExportResource',
+]
+
+
+class ExportResource(BaseView):
+    """
+    Handles methods regarding the export of the whole catalog, i.e. read
+    """
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        """
+        summary: Export every App, Member Link, Menu Item and Menu Item User Link
+
+        description: |
+            Stream the whole catalog as NDJSON, one record per line with a `type` of `app`, `member_link`, `menu_item`
+            or `menu_item_user_link`. Apps come first, then Member Links, then Menu Items with every Menu Item after
+            its predecessor, then Menu Item User Links.
+
+            The response is gzip compressed when the request's `Accept-Encoding` allows it. Only the superuser can
+            export the catalog.
+
+        responses:
+            200:
+                description: The catalog, as NDJSON
+            403: {}
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('checking_permissions', child_of=request.span):
+            err = Permissions.read(request)
+            if err is not None:
+                return err
+
+        with tracer.start_span('streaming_response', child_of=request.span) as span:
+            # The records are read while the response is sent, after this view has returned
+            stream = chunks(records())
+            compress = accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            if compress:
+                stream = gzip_chunks(stream)
+            span.set_tag('gzip', compress)
+            response = StreamingHttpResponse(stream, content_type='application/x-ndjson')
+            if compress:
+                response['Content-Encoding'] = 'gzip'
+            response['Vary'] = 'Accept-Encoding'
+            response['Content-Disposition'] = 'attachment; filename="app_manager_catalog.ndjson"'
+
+        return response
@@ -13,8 +13,11 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 # local
 from app_manager.controllers.member_link import MemberLinkCreateController
-from app_manager.models import App, MemberLink
+from app_manager.models import App, DefaultAppJob, MemberLink
 from app_manager.permissions.member_link import Permissions
+from app_manager.utils.default_apps import DEFAULT_MEMBER_ID, enqueue
+from app_manager.utils.entitlements import invalidate_member
+from app_manager.utils.membership import prefetch_member
 
 
 __all__ = [
@@ -47,16 +50,22 @@ class MemberLinkCollection(BaseView):
         """
         tracer = settings.TRACER
 
+        with tracer.start_span('prefetching_member', child_of=request.span):
+            # The Membership lookup of the controller runs while the App is read
+            member_id = MemberLinkCreateController.membership_lookup(request)
+            if member_id is not None:
+                prefetch_member(request, member_id)
+
+        with tracer.start_span('retrieving_requested_object', child_of=request.span):
+            obj = App.objects.filter(id=app_id).first()
+
         with tracer.start_span('validating_controller', child_of=request.span) as span:
             controller = MemberLinkCreateController(data=request.data, request=request, span=span)
             if not controller.is_valid():
                 return Http400(errors=controller.errors)
 
-        with tracer.start_span('retrieving_requested_object', child_of=request.span):
-            try:
-                obj = App.objects.get(id=app_id)
-            except App.DoesNotExist:
-                return Http404(error_code='app_manager_member_link_create_001')
+        if obj is None:
+            return Http404(error_code='app_manager_member_link_create_001')
 
         with tracer.start_span('checking_permissions', child_of=request.span):
             err = Permissions.create(request, obj, controller.cleaned_data['member_id'])
@@ -66,6 +75,11 @@ class MemberLinkCollection(BaseView):
         with tracer.start_span('saving_object', child_of=request.span):
             controller.instance.app = obj
             controller.instance.save()
+            invalidate_member(controller.instance.member_id)
+
+        if controller.instance.member_id == DEFAULT_MEMBER_ID:
+            with tracer.start_span('enqueue_default_app_job', child_of=request.span):
+                enqueue(obj.pk, DefaultAppJob.ACTION_PROVISION)
 
         return Response(status=status.HTTP_201_CREATED)
 
@@ -81,17 +95,31 @@ class MemberLinkCollection(BaseView):
               description: The id of the App that the Member no longer uses
               type: integer
 
+        query_params:
+            member_id:
+              description: |
+                  The id of the Member whose Member Link should be deleted, defaults to the requesting User's Member.
+                  Only the superuser can delete the Member Links of another Member.
+              type: integer
+
         responses:
             200:
                 description: Member Link record was deleted successfully
+            400: {}
             403: {}
         """
         tracer = settings.TRACER
 
         with tracer.start_span('retrieving_requested_object', child_of=request.span):
+            member_id = request.user.member['id']
+            if request.user.id == 1 and 'member_id' in request.GET:
+                try:
+                    member_id = int(request.GET['member_id'])
+                except ValueError:
+                    return Http400(error_code='app_manager_member_link_delete_101')
             try:
                 obj = MemberLink.objects.get(
-                    member_id=request.user.member['id'],
+                    member_id=member_id,
                     app_id=app_id,
                 )
             except MemberLink.DoesNotExist:
@@ -105,5 +133,10 @@ class MemberLinkCollection(BaseView):
         with tracer.start_span('setting_deleted_field', child_of=request.span):
             obj.deleted = datetime.utcnow()
             obj.save()
+            invalidate_member(obj.member_id)
+
+        if obj.member_id == DEFAULT_MEMBER_ID:
+            with tracer.start_span('enqueue_default_app_job', child_of=request.span):
+                enqueue(obj.app_id, DefaultAppJob.ACTION_REVOKE)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
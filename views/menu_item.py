@@ -9,12 +9,14 @@ from cloudcix_rest.exceptions import Http400, Http404
 from cloudcix_rest.views import BaseView
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.db import router, transaction
+from django.db.models import Exists, Q
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 # local
 from app_manager.controllers.menu_item import (
+    MenuItemBulkController,
     MenuItemCreateController,
     MenuItemListController,
     MenuItemUpdateController,
@@ -23,13 +25,18 @@ from app_manager.models import (
     App,
     MemberLink,
     MenuItem,
-    MenuItemUserLink,
+    MenuItemAccess,
 )
 from app_manager.permissions.menu_item import Permissions
 from app_manager.serializers.menu_item import MenuItemSerializer
+from app_manager.utils.entitlements import entitlement_key, invalidate_all
+from app_manager.utils.etags import app_validator, make_etag, not_modified, queryset_validator
+from app_manager.utils.pagination import CountError, CursorError, paginate
+from app_manager.utils.projection import FieldsError, IncludeError, include_apps, parse_projection
 
 
 __all__ = [
+    'MenuItemBulkCollection',
     'MenuItemCollection',
     'MenuItemResource',
 ]
@@ -47,6 +54,18 @@ class MenuItemCollection(BaseView):
         description: |
             Get a list of Menu Item records, filtered and ordered by the User
 
+            Send the `cursor` parameter to page through the list by cursor instead of by `page`. Send an empty
+            `cursor` for the first page, and the `next_cursor` from the `_metadata` of each response for the next.
+
+            Send `fields` as a comma separated list of field names to only receive those fields for each Menu Item.
+            Send `include=app` to receive the `app_id` of each Menu Item instead of its App, with each App sent once in
+            the `included` map of the response.
+
+            Send `count=estimate` to get an estimated `total_records`, or `count=none` to get a `has_more` flag instead
+            of `total_records`. Both avoid counting every matching record.
+
+            The response carries an `ETag`. Send it back in `If-None-Match` to get a 304 if the list has not changed.
+
         path_params:
             app_id:
               description: The id of the App that the Menu Items should belong to
@@ -55,6 +74,8 @@ class MenuItemCollection(BaseView):
         responses:
             200:
                 description: A list of Menu Items
+            304:
+                description: The list has not changed since the ETag sent in `If-None-Match`
             400: {}
             403: {}
         """
@@ -64,37 +85,53 @@ class MenuItemCollection(BaseView):
             controller = MenuItemListController(data=request.GET, request=request, span=span)
             # By validating the controller we generate the search filters
             controller.is_valid()
+            try:
+                projection = parse_projection(request)
+            except FieldsError:
+                return Http400(error_code='app_manager_menu_item_list_004')
+            except IncludeError:
+                return Http400(error_code='app_manager_menu_item_list_005')
 
         with tracer.start_span('setting_search_filters', child_of=request.span):
-            link = MemberLink.objects.filter(
-                app_id=app_id,
-                member_id=request.user.member['id'],
-            )
             kw = controller.cleaned_data['search']
             search_filters = Q(
                 public=True,
                 app_id=app_id,
             )
-            if request.user.id == 1 or link.exists():
-                if not request.user.member['self_managed']:
-                    kw['self_managed'] = False
-
-                if not request.user.administrator:
-                    kw['administrator_only'] = False
-                    links = MenuItemUserLink.objects.filter(
-                        user_id=request.user.id,
-                    ).distinct().values_list(
-                        'menu_item_id',
-                        flat=True,
-                    )
-                    if 'id__in' in kw:
-                        kw['id__in'] = set(kw['id__in']).intersection(links)
-                    else:
-                        kw['id__in'] = links
-                search_filters |= Q(
+            linked = Q()
+            if request.user.id != 1:
+                # The Member Link is checked in the same query as the list
+                linked = Q(Exists(MemberLink.objects.filter(
                     app_id=app_id,
-                    **kw,
+                    member_id__in=[0, request.user.member['id']],
+                )))
+
+            if not request.user.administrator:
+                # The Menu Items in this App that the User has a link to and can see, from one indexed lookup on the
+                # flags copied into Menu Item Access
+                links = MenuItemAccess.objects.filter(
+                    user_id=request.user.id,
+                    app_id=app_id,
+                    administrator_only=False,
+                )
+                if not request.user.member['self_managed']:
+                    links = links.filter(self_managed=False)
+                links = links.values_list(
+                    'menu_item_id',
+                    flat=True,
                 )
+                if 'id__in' in kw:
+                    kw['id__in'] = set(kw['id__in']).intersection(links)
+                else:
+                    kw['id__in'] = links
+            elif not request.user.member['self_managed']:
+                kw['self_managed'] = False
+
+            search_filters |= Q(
+                linked,
+                app_id=app_id,
+                **kw,
+            )
 
         with tracer.start_span('retrieving_requested_objects', child_of=request.span):
             order = controller.cleaned_data['order']
@@ -107,24 +144,39 @@ class MenuItemCollection(BaseView):
             except (ValueError, ValidationError):
                 return Http400(error_code='app_manager_menu_item_list_001')
 
+        with tracer.start_span('checking_etag', child_of=request.span):
+            try:
+                validator = queryset_validator(objs)
+            except (ValueError, ValidationError):
+                return Http400(error_code='app_manager_menu_item_list_001')
+            # The list also depends on whether the User's Member is self managed, which the entitlement key does not
+            etag = make_etag(
+                validator,
+                app_validator(app_id),
+                entitlement_key(request),
+                int(bool(request.user.member['self_managed'])),
+                sorted(request.GET.lists()),
+            )
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+
         with tracer.start_span('gathering_metadata', child_of=request.span):
-            total_records = objs.count()
-            page = controller.cleaned_data['page']
-            limit = controller.cleaned_data['limit']
-            # Pagination
-            objs = objs[page * limit:(page + 1) * limit]
-            metadata = {
-                'page': page,
-                'limit': limit,
-                'order': order,
-                'total_records': total_records,
-            }
+            try:
+                objs, metadata = paginate(objs, controller, request)
+            except CountError:
+                return Http400(error_code='app_manager_menu_item_list_003')
+            except CursorError:
+                return Http400(error_code='app_manager_menu_item_list_002')
 
         with tracer.start_span('serializing_data', child_of=request.span) as span:
             span.set_tag('num_objs', len(objs))
-            data = MenuItemSerializer(instance=objs, many=True).data
+            data = MenuItemSerializer(instance=objs, many=True, context=projection).data
+            response = {'content': data, '_metadata': metadata}
+            if projection['include_app']:
+                response['included'] = {'app': include_apps(objs)}
 
-        return Response({'content': data, '_metadata': metadata})
+        return Response(response, headers={'ETag': etag})
 
     def post(self, request: Request, app_id: int) -> Response:
         """
@@ -166,6 +218,8 @@ class MenuItemCollection(BaseView):
         with tracer.start_span('saving_object', child_of=request.span):
             controller.instance.app = app
             controller.instance.save()
+            if controller.instance.public:
+                invalidate_all()
 
         with tracer.start_span('serializing_data', child_of=request.span):
             data = MenuItemSerializer(instance=controller.instance).data
@@ -173,6 +227,85 @@ class MenuItemCollection(BaseView):
         return Response({'content': data}, status=status.HTTP_201_CREATED)
 
 
+class MenuItemBulkCollection(BaseView):
+    """
+    Handles creating and renumbering many Menu Item records of an App in one request
+    """
+
+    def post(self, request: Request, app_id: int) -> Response:
+        """
+        summary: Create and renumber Menu Item records in bulk
+
+        description: |
+            Create a list or tree of Menu Items, and change the `sequence` of existing Menu Items, in one transaction.
+            Each new Menu Item has a `temp_id`, which later Menu Items in the list can use as their
+            `predecessor_temp_id` to be created under it. Nothing is saved if any Menu Item is invalid.
+
+        path_params:
+            app_id:
+              description: The id of the App that the Menu Items belong to
+              type: integer
+
+        responses:
+            201:
+                description: |
+                    The Menu Items were created and renumbered successfully. The response contains the created Menu
+                    Items, the id of each one by `temp_id`, and the number of Menu Items that were renumbered.
+            400: {}
+            403: {}
+            404: {}
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('checking_permissions', child_of=request.span):
+            err = Permissions.bulk(request)
+            if err is not None:
+                return err
+
+        with tracer.start_span('retrieving_app', child_of=request.span):
+            try:
+                app = App.objects.get(id=app_id)
+            except App.DoesNotExist:
+                return Http404(error_code='app_manager_menu_item_bulk_001')
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            controller = MenuItemBulkController(data=request.data, request=request, span=span)
+            controller.kwargs = {'app_id': app_id}
+            if not controller.is_valid():
+                return Http400(errors=controller.errors)
+
+        with tracer.start_span('saving_objects', child_of=request.span) as span:
+            sequences = controller.cleaned_data['sequences']
+            menu_items = controller.cleaned_data['menu_items']
+            updated = datetime.utcnow()
+            with transaction.atomic(using=router.db_for_write(MenuItem)):
+                MenuItem.objects.bulk_update(
+                    [MenuItem(id=pk, sequence=sequence, updated=updated) for pk, sequence in sequences.items()],
+                    ['sequence', 'updated'],
+                )
+                MenuItem.objects.bulk_create_tree(menu_items, controller.cleaned_data['predecessor_temp_ids'])
+            span.set_tag('num_created', len(menu_items))
+            span.set_tag('num_renumbered', len(sequences))
+            if any(item.public for item in menu_items.values()):
+                invalidate_all()
+
+        with tracer.start_span('serializing_data', child_of=request.span):
+            for item in menu_items.values():
+                item.app = app
+            data = MenuItemSerializer(instance=menu_items.values(), many=True).data
+
+        return Response(
+            {
+                'content': {
+                    'ids': {temp_id: item.pk for temp_id, item in menu_items.items()},
+                    'menu_items': data,
+                    'renumbered': len(sequences),
+                },
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
 class MenuItemResource(BaseView):
     """
     Handles methods regarding Menu Item records that require an id to be specified, i.e. read, update, delete
@@ -185,6 +318,9 @@ class MenuItemResource(BaseView):
         description: |
             Attempt to read a Menu Item record by the given `pk`, returning a 404 if it does not exist
 
+            The response carries an `ETag`. Send it back in `If-None-Match` to get a 304 if the Menu Item has not
+            changed.
+
         path_params:
             pk:
                 description: The id of the Menu Item record to be read
@@ -196,14 +332,20 @@ class MenuItemResource(BaseView):
         responses:
             200:
                 description: Menu Item record was read successfully
+            304:
+                description: The Menu Item has not changed since the ETag sent in `If-None-Match`
             403: {}
             404: {}
         """
         tracer = settings.TRACER
 
         with tracer.start_span('retrieving_requested_object', child_of=request.span):
+            # The permission check is read with the Menu Item, so a missing Menu Item is a 404 and an inaccessible
+            # one a 403 from the same query
             try:
-                obj = MenuItem.objects.get(
+                obj = MenuItem.objects.annotate(
+                    **Permissions.read_annotations(request),
+                ).get(
                     id=pk,
                     app_id=app_id,
                 )
@@ -215,10 +357,17 @@ class MenuItemResource(BaseView):
             if err is not None:
                 return err
 
+        with tracer.start_span('checking_etag', child_of=request.span):
+            # The Menu Item is sent with its App and predecessor, so changes to either change the ETag
+            etag = make_etag(obj.pk, obj.updated, app_validator(app_id))
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+
         with tracer.start_span('serializing_data', child_of=request.span):
             data = MenuItemSerializer(instance=obj).data
 
-        return Response({'content': data})
+        return Response({'content': data}, headers={'ETag': etag})
 
     def put(self, request: Request, pk: int, app_id: int, partial: bool = False) -> Response:
         """
@@ -257,6 +406,9 @@ class MenuItemResource(BaseView):
                 )
             except MenuItem.DoesNotExist:
                 return Http404(error_code='app_manager_menu_item_update_001')
+            was_public = obj.public
+            old_subtree_path = obj.subtree_path
+            old_depth = obj.depth
 
         with tracer.start_span('validating_controller', child_of=request.span) as span:
             controller = MenuItemUpdateController(
@@ -270,8 +422,17 @@ class MenuItemResource(BaseView):
             if not controller.is_valid():
                 return Http400(errors=controller.errors)
 
-        with tracer.start_span('saving_object', child_of=request.span):
-            controller.instance.save()
+        with tracer.start_span('saving_object', child_of=request.span) as span:
+            with transaction.atomic(using=router.db_for_write(MenuItem)):
+                controller.instance.save()
+                if controller.instance.subtree_path != old_subtree_path:
+                    # The Menu Item was moved, so its descendants need their path and depth updated too
+                    span.set_tag('num_descendants_moved', controller.instance.move_descendants(
+                        old_subtree_path,
+                        old_depth,
+                    ))
+            if controller.instance.public != was_public:
+                invalidate_all()
 
         with tracer.start_span('serializing_data', child_of=request.span):
             data = MenuItemSerializer(instance=controller.instance).data
@@ -324,5 +485,6 @@ class MenuItemResource(BaseView):
         with tracer.start_span('deleting_object', child_of=request.span):
             obj.deleted = datetime.utcnow()
             obj.save()
+            invalidate_all()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -12,15 +12,20 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 # local
 from app_manager.controllers.menu_item_user_link import (
+    MenuItemUserLinkBulkController,
     MenuItemUserLinkListController,
     MenuItemUserLinkUpdateController,
 )
 from app_manager.models import MemberLink, MenuItem, MenuItemUserLink
 from app_manager.permissions.menu_item_user_link import Permissions
 from app_manager.serializers.menu_item import MenuItemSerializer
+from app_manager.utils.entitlements import invalidate_user, invalidate_users
+from app_manager.utils.pagination import CountError, CursorError, paginate
+from app_manager.utils.projection import FieldsError, IncludeError, include_apps, parse_projection
 
 
 __all__ = [
+    'MenuItemUserLinkBulkCollection',
     'MenuItemUserLinkCollection',
 ]
 
@@ -39,6 +44,16 @@ class MenuItemUserLinkCollection(BaseView):
         description: |
             Retrieve a list of Menu Item records where there are Menu Item User Links set up for the given User id
 
+            Send the `cursor` parameter to page through the list by cursor instead of by `page`. Send an empty
+            `cursor` for the first page, and the `next_cursor` from the `_metadata` of each response for the next.
+
+            Send `fields` as a comma separated list of field names to only receive those fields for each Menu Item.
+            Send `include=app` to receive the `app_id` of each Menu Item instead of its App, with each App sent once in
+            the `included` map of the response.
+
+            Send `count=estimate` to get an estimated `total_records`, or `count=none` to get a `has_more` flag instead
+            of `total_records`. Both avoid counting every matching record.
+
         path_params:
             user_id:
                 description: The id of the User to list Menu Items for
@@ -51,36 +66,43 @@ class MenuItemUserLinkCollection(BaseView):
         """
         tracer = settings.TRACER
 
-        with tracer.start_span('checking_permissions', child_of=request.span):
-            err = Permissions.list(request, user_id)
+        with tracer.start_span('checking_permissions', child_of=request.span) as span:
+            err = Permissions.list(request, user_id, span)
             if err is not None:
                 return err
 
+        with tracer.start_span('reading_user_links', child_of=request.span):
+            links = set(MenuItemUserLink.objects.filter(
+                user_id=user_id,
+            ).values_list(
+                'menu_item_id',
+                flat=True,
+            ).distinct())
+
         with tracer.start_span('validating_controller', child_of=request.span) as span:
             controller = MenuItemUserLinkListController(data=request.GET, request=request, span=span)
             # By validating the controller we generate the search filters
             controller.is_valid()
+            try:
+                projection = parse_projection(request)
+            except FieldsError:
+                return Http400(error_code='app_manager_menu_item_user_link_list_004')
+            except IncludeError:
+                return Http400(error_code='app_manager_menu_item_user_link_list_005')
 
         with tracer.start_span('setting_search_filters', child_of=request.span):
             kw = controller.cleaned_data['search']
 
             # Limit the results to the the Menu Items that user_id has access to
-            links = set(MenuItemUserLink.objects.filter(
-                user_id=user_id,
-            ).values_list(
-                'menu_item_id',
-                flat=True,
-            ).distinct())
-
             if 'id__in' in kw:
                 id_set = {int(i) for i in kw['id__in']}
                 kw['id__in'] = id_set & links
             else:
                 kw['id__in'] = links
 
-            # Limit the results to Apps where a Member Link exists for the User
+            # Limit the results to Apps where a Member Link exists for the User, or that are default Apps
             apps = MemberLink.objects.filter(
-                member_id=request.user.member['id'],
+                member_id__in=[0, request.user.member['id']],
             ).values_list(
                 'app_id',
                 flat=True,
@@ -100,29 +122,30 @@ class MenuItemUserLinkCollection(BaseView):
                 return Http400(error_code='app_manager_menu_item_user_link_list_001')
 
         with tracer.start_span('gathering_metadata', child_of=request.span):
-            total_records = objs.count()
-            page = controller.cleaned_data['page']
-            limit = controller.cleaned_data['limit']
-            metadata = {
-                'page': page,
-                'limit': limit,
-                'order': controller.cleaned_data['order'],
-                'total_records': total_records,
-            }
-            objs = objs[page * limit: (page + 1) * limit]
+            try:
+                objs, metadata = paginate(objs, controller, request)
+            except CountError:
+                return Http400(error_code='app_manager_menu_item_user_link_list_003')
+            except CursorError:
+                return Http400(error_code='app_manager_menu_item_user_link_list_002')
 
         with tracer.start_span('serializing_data', child_of=request.span) as span:
-            span.set_tag('num_objects', objs.count())
-            data = MenuItemSerializer(instance=objs, many=True).data
+            span.set_tag('num_objects', len(objs))
+            data = MenuItemSerializer(instance=objs, many=True, context=projection).data
+            response = {'content': data, '_metadata': metadata}
+            if projection['include_app']:
+                response['included'] = {'app': include_apps(objs)}
 
-        return Response({'content': data, '_metadata': metadata})
+        return Response(response)
 
     def put(self, request: Request, user_id: int, partial: bool = False) -> Response:
         """
         summary: Update the Menu Item Links for a User
 
         description: |
-            Update the details of a Menu Item User Link with data provided by the User
+            Update the details of a Menu Item User Link with data provided by the User.
+            The User is linked to exactly the sent `menu_item_ids`, and the number of links added and removed is
+            returned.
 
         path_params:
             user_id:
@@ -131,13 +154,14 @@ class MenuItemUserLinkCollection(BaseView):
 
         responses:
             200:
-                description: A list of Menu Item records, filtered and ordered by the User
+                description: The number of Menu Item User Links that were added and removed
             400: {}
+            403: {}
         """
         tracer = settings.TRACER
 
-        with tracer.start_span('checking_permissions', child_of=request.span):
-            err = Permissions.update(request, user_id)
+        with tracer.start_span('checking_permissions', child_of=request.span) as span:
+            err = Permissions.update(request, user_id, span)
             if err is not None:
                 return err
 
@@ -152,36 +176,59 @@ class MenuItemUserLinkCollection(BaseView):
             if not controller.is_valid():
                 return Http400(errors=controller.errors)
 
-        with tracer.start_span('updating_user_links', child_of=request.span):
-            menu_item_ids = controller.cleaned_data['menu_item_ids']
-            # Delete the Menu Items that were not requested by the user
-            MenuItemUserLink.objects.filter(
-                user_id=user_id,
-            ).exclude(
-                menu_item_id__in=menu_item_ids,
-            ).delete()
-
-            # Create any User Links that are in the requesting User's list but that don't exist yet
-            existing = MenuItemUserLink.objects.filter(
-                user_id=user_id,
-                menu_item__deleted__isnull=True,
-            ).values_list(
-                'menu_item_id',
-                flat=True,
+        with tracer.start_span('updating_user_links', child_of=request.span) as span:
+            # Delete the links to Menu Items that were not requested, and create the missing ones
+            added, removed = MenuItemUserLink.objects.replace_for_user(
+                user_id,
+                controller.cleaned_data['menu_item_ids'],
             )
-            to_create = MenuItem.objects.filter(
-                id__in=menu_item_ids,
-            ).exclude(
-                id__in=existing,
-            )
-            new_links = list()
-            for c in to_create:
-                new_links.append(
-                    MenuItemUserLink(
-                        user_id=user_id,
-                        menu_item=c,
-                    ),
-                )
-            MenuItemUserLink.objects.bulk_create(new_links)
+            span.set_tag('num_added', added)
+            span.set_tag('num_removed', removed)
+            if added > 0 or removed > 0:
+                invalidate_user(user_id)
+
+        return Response({'content': {'added': added, 'removed': removed}}, status=status.HTTP_200_OK)
+
+
+class MenuItemUserLinkBulkCollection(BaseView):
+    """
+    Handles changing the Menu Item User Links of many Users in one request
+    """
+
+    def put(self, request: Request) -> Response:
+        """
+        summary: Update the Menu Item Links for many Users
+
+        description: |
+            Change the Menu Item User Links of many Users in one transaction. `users` maps each User id to either the
+            exact `menu_item_ids` the User should be linked to, or lists of Menu Item ids to `add` to and `remove` from
+            their current links. Nothing is changed if any User or Menu Item is invalid.
+
+        responses:
+            200:
+                description: The number of Menu Item User Links that were added and removed
+            400: {}
+            403: {}
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('checking_permissions', child_of=request.span) as span:
+            err = Permissions.bulk(request, span)
+            if err is not None:
+                return err
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            controller = MenuItemUserLinkBulkController(data=request.data, request=request, span=span)
+            if not controller.is_valid():
+                return Http400(errors=controller.errors)
+
+        with tracer.start_span('updating_user_links', child_of=request.span) as span:
+            changes = controller.cleaned_data['users']
+            added, removed = MenuItemUserLink.objects.apply_links(**changes)
+            span.set_tag('num_users', sum(len(users) for users in changes.values()))
+            span.set_tag('num_added', added)
+            span.set_tag('num_removed', removed)
+            if added > 0 or removed > 0:
+                invalidate_users(user_id for users in changes.values() for user_id in users)
 
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response({'content': {'added': added, 'removed': removed}}, status=status.HTTP_200_OK)
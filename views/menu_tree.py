@@ -0,0 +1,52 @@
+"""
+Management for Menu Trees
+"""
+
+# libs
+from cloudcix_rest.views import BaseView
+from django.conf import settings
+from rest_framework.request import Request
+from rest_framework.response import Response
+# local
+from app_manager.serializers.menu_tree import MenuTreeSerializer
+from app_manager.utils.menu_tree import visible_tree
+
+
+__all__ = [
+    'MenuTreeResource',
+]
+
+
+class MenuTreeResource(BaseView):
+    """
+    Handles methods regarding the tree of Menu Items in an App, i.e. read
+    """
+
+    def get(self, request: Request, app_id: int) -> Response:
+        """
+        summary: Read the tree of Menu Items in an App
+
+        description: |
+            Read every Menu Item in an App that the requesting User can see, nested under their predecessors and
+            ordered by `sequence` at each level. The same rules as the Menu Item list decide which Menu Items are
+            visible, and the children of a Menu Item that is not visible are not included.
+
+        path_params:
+            app_id:
+              description: The id of the App to read the Menu Items of
+              type: integer
+
+        responses:
+            200:
+                description: The root Menu Items of the App, each with their children nested in them
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('retrieving_requested_objects', child_of=request.span) as span:
+            roots = visible_tree(request, app_id)
+            span.set_tag('num_roots', len(roots))
+
+        with tracer.start_span('serializing_data', child_of=request.span):
+            data = MenuTreeSerializer(instance=roots, many=True).data
+
+        return Response({'content': data})
@@ -0,0 +1,67 @@
+"""
+Management for Navigation
+"""
+
+# libs
+from cloudcix_rest.views import BaseView
+from django.conf import settings
+from rest_framework.request import Request
+from rest_framework.response import Response
+# local
+from app_manager.serializers.navigation import NavigationSerializer
+from app_manager.utils.entitlements import get_entitlement
+from app_manager.utils.etags import make_etag, not_modified
+from app_manager.utils.navigation import build_navigation, cache_key, get_cached, set_cached, validator
+
+
+__all__ = [
+    'NavigationResource',
+]
+
+
+class NavigationResource(BaseView):
+    """
+    Handles methods regarding the navigation of the requesting User, i.e. read
+    """
+
+    def get(self, request: Request) -> Response:
+        """
+        summary: Read the Apps and Menu Items that the requesting User can see
+
+        description: |
+            Read every App that the requesting User can see, each with the tree of Menu Items that they can see in it.
+            The same rules as the App list and Menu Item list decide what is visible, and the response contains the
+            same data as reading the App list and the Menu Item tree of every App in it, in a fixed number of queries.
+
+            The response carries an `ETag`. Send it back in `If-None-Match` to get a 304 if nothing has changed.
+
+        responses:
+            200:
+                description: The visible Apps, ordered by name, each with their `menu_tree`
+            304:
+                description: Nothing has changed since the ETag sent in `If-None-Match`
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('retrieving_entitlement', child_of=request.span) as span:
+            entitlement = get_entitlement(request, span)
+
+        with tracer.start_span('checking_cache', child_of=request.span) as span:
+            key = cache_key(request, entitlement, validator(entitlement))
+            etag = make_etag(key)
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+            data = get_cached(key)
+            span.set_tag('navigation_cache', 'miss' if data is None else 'hit')
+
+        if data is None:
+            with tracer.start_span('retrieving_requested_objects', child_of=request.span) as span:
+                apps = build_navigation(request, entitlement)
+                span.set_tag('num_apps', len(apps))
+
+            with tracer.start_span('serializing_data', child_of=request.span):
+                data = NavigationSerializer(instance=apps, many=True).data
+                set_cached(key, data)
+
+        return Response({'content': data}, headers={'ETag': etag})